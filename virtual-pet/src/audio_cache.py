@@ -0,0 +1,138 @@
+# Audio_cache.py
+# Background preprocessing for the music track.
+# The fade-in/fade-out and volume change are applied in large NumPy chunks while
+# streaming from the source WAV to the output, and the result is cached on disk
+# keyed by (source hash, fade_seconds, volume_scale), so later launches reuse it.
+# Import Future and the executor that runs jobs off the UI thread
+from concurrent.futures import Future, ThreadPoolExecutor
+# Import hashlib to hash the source file
+import hashlib
+# Import os for paths and atomic renames
+import os
+# Import tempfile to write the output atomically
+import tempfile
+# Import threading to create the shared executor once
+import threading
+# Import wave to read and write WAV files
+import wave
+# Import type hints for the public functions
+from typing import Optional
+
+# Import NumPy to scale a whole chunk of samples at once
+import numpy as np
+
+# Import the per-user cache folder shared with the sprite cache
+from sprite_cache import default_cache_dir
+
+# Frames read, scaled and written per step (a few hundred KB for CD-quality stereo)
+CHUNK_FRAMES = 65536
+# Bytes read per step while hashing the source
+HASH_BLOCK = 1 << 20
+# Sample dtype per sample width in bytes (24-bit samples are widened to int32)
+SAMPLE_TYPES = {1: np.uint8, 2: np.int16, 3: np.int32, 4: np.int32}
+
+# Single worker shared by every preprocessing job, created on first use
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+# Function to hash a file in blocks
+def file_hash(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Function to get the per-frame gain for frames [start, start + count) of a track
+def fade_envelope(start: int, count: int, total_frames: int, fade_frames: int, volume_scale: float) -> np.ndarray:
+    frames = np.arange(start, start + count, dtype=np.float64)
+    # Ramp up over the first fade_frames, down over the last, volume_scale in between
+    gain = np.minimum(frames / fade_frames, (total_frames - frames) / fade_frames)
+    return np.minimum(gain, 1.0) * volume_scale
+
+
+# Function to scale one chunk of raw frames by a per-frame gain
+def _scale_frames(data: bytes, sampwidth: int, nchannels: int, gain: np.ndarray) -> bytes:
+    if sampwidth == 3:
+        # Widen packed 24-bit samples to int32 (shifted up, then back down to keep the sign)
+        raw = np.frombuffer(data, np.uint8).reshape(-1, 3)
+        samples = (raw[:, 0].astype(np.int32) << 8 | raw[:, 1].astype(np.int32) << 16 | raw[:, 2].astype(np.int32) << 24) >> 8
+    else:
+        samples = np.frombuffer(data, SAMPLE_TYPES[sampwidth]).astype(np.int64)
+    # 8-bit WAV samples are unsigned around 128
+    if sampwidth == 1:
+        samples = samples - 128
+    bits = 8 * sampwidth
+    scaled = np.floor(samples.reshape(-1, nchannels) * gain[:, None]).astype(np.int64).ravel()
+    scaled = np.clip(scaled, -(1 << (bits - 1)), (1 << (bits - 1)) - 1)
+    if sampwidth == 1:
+        return (scaled + 128).astype(np.uint8).tobytes()
+    if sampwidth == 3:
+        return scaled.astype("<i4").view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    return scaled.astype(np.dtype(SAMPLE_TYPES[sampwidth]).newbyteorder("<")).tobytes()
+
+
+# Function to write a faded, volume-scaled copy of a WAV, streaming chunk by chunk
+def fade_wav(input_path: str, output_path: str, fade_seconds: float = 3, volume_scale: float = 1.0,
+             chunk_frames: int = CHUNK_FRAMES) -> bool:
+    """Returns False (writing nothing) if the track is too short to fade."""
+    volume_scale = max(0.0, min(volume_scale, 1.0))
+    with wave.open(input_path, "rb") as source:
+        params = source.getparams()
+        total_frames = params.nframes
+        fade_frames = min(int(params.framerate * fade_seconds), max(0, total_frames // 2))
+        if fade_frames <= 0 or params.sampwidth not in SAMPLE_TYPES:
+            return False
+        with wave.open(output_path, "wb") as target:
+            target.setparams(params)
+            position = 0
+            while position < total_frames:
+                data = source.readframes(chunk_frames)
+                count = len(data) // (params.sampwidth * params.nchannels)
+                if count == 0:
+                    break
+                gain = fade_envelope(position, count, total_frames, fade_frames, volume_scale)
+                target.writeframes(_scale_frames(data, params.sampwidth, params.nchannels, gain))
+                position += count
+    return True
+
+
+# Function to get the faded track from the cache, building it first if needed
+def cached_faded_wav(input_path: str, fade_seconds: float = 3, volume_scale: float = 1.0,
+                     cache_dir: Optional[str] = None) -> Optional[str]:
+    """Returns the path of the processed WAV, the source itself if it is too short to fade, or None on error."""
+    cache_dir = cache_dir or default_cache_dir("audio")
+    try:
+        key = hashlib.sha1(f"{file_hash(input_path)}:{fade_seconds}:{volume_scale}".encode("utf-8")).hexdigest()[:16]
+        stem = os.path.splitext(os.path.basename(input_path))[0]
+        output_path = os.path.join(cache_dir, f"{stem}-{key}.wav")
+        if os.path.exists(output_path):
+            return output_path
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write next to the final file and rename, so a half-written track is never reused
+        fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            if not fade_wav(input_path, temp_path, fade_seconds, volume_scale):
+                os.unlink(temp_path)
+                return input_path
+            os.replace(temp_path, output_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        return output_path
+    except (OSError, EOFError, wave.Error):
+        return None
+
+
+# Function to build the faded track on the background worker; the Future holds cached_faded_wav's result
+def prepare_faded_wav(input_path: str, fade_seconds: float = 3, volume_scale: float = 1.0,
+                      cache_dir: Optional[str] = None) -> Future:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio-cache")
+    return _executor.submit(cached_faded_wav, input_path, fade_seconds, volume_scale, cache_dir)
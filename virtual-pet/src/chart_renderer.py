@@ -0,0 +1,347 @@
+import tkinter as tk  # canvas widget type
+import zlib  # stable hash for symbols without a theme color
+from array import array  # days and prices behind each drawn line
+from typing import Dict, List, Mapping, Optional, Tuple  # type hints
+import numpy as np  # compares drawn points with a compacted history
+from downsample import DownsampleCache  # level-of-detail stage
+
+
+# Colors for symbols the theme does not name (listed part-way through a game).
+FALLBACK_COLORS = ("#34d399", "#f97316", "#38bdf8", "#e879f9", "#facc15", "#fb7185", "#4ade80", "#c084fc")
+
+
+class ChartRenderer:
+    """
+    Persistent renderer for the market chart canvas.
+    Canvas items are created once and moved with canvas.coords. Price bounds
+    are tracked incrementally, and the chart is only rescaled when the bounds
+    change or the canvas is resized. When the history compacts old points into
+    coarser tiers, only the points that changed are replaced.
+    """
+
+    PAD = 40  # space around the plot area
+    GRID_LINES = 4  # dashed horizontal gridlines
+    LEGEND_STEP = 14  # vertical distance between legend rows
+
+    def __init__(self, canvas: tk.Canvas, colors: Mapping[str, str], text_color: str, axis_color: str, grid_color: str,
+                 downsampler: Optional[DownsampleCache] = None):
+        # Canvas and theme colors.
+        self.canvas = canvas
+        # Caps each series at about one point per horizontal pixel.
+        self.downsampler = downsampler or DownsampleCache()
+        self.colors = colors
+        self.text_color = text_color
+        self.axis_color = axis_color
+        self.grid_color = grid_color
+
+        # Static items (axes, gridlines, labels) keyed by role.
+        self._static: Dict[str, int] = {}
+        self._grid: List[int] = []
+        # Per-symbol items: price line, legend swatch and legend label.
+        self._lines: Dict[str, int] = {}
+        self._legend: Dict[str, tuple] = {}
+        # Scaled coordinates already pushed to each line, and the (days, prices) behind them.
+        self._coords: Dict[str, List[float]] = {}
+        self._drawn: Dict[str, Tuple[array, array]] = {}
+        # True when the lines show a downsampled series (compactions then need a full redraw).
+        self._downsampled = False
+        # Last text shown on each label, to skip no-op itemconfigure calls.
+        self._label_text: Dict[str, str] = {}
+
+        # Current scale: data bounds and canvas size.
+        self._size = None
+        self._min_day = None
+        self._max_day = None
+        self._x_limit = None
+        self._min_price = None
+        self._max_price = None
+        # Price range used for scaling (a little wider than the data).
+        self._y_low = None
+        self._y_high = None
+        # History (by lineage, so copies of one game's history match) and state seen at the last render.
+        self._history = None
+        self._compactions = None
+        self._last_day = None
+
+        # Counters to see how often the cheap path is taken.
+        self.full_redraws = 0
+        self.incremental_updates = 0
+
+    def invalidate(self):
+        # Force a full rescale on the next render.
+        self._history = None
+
+    def render(self, history):
+        # Draw the latest history, doing as little canvas work as possible.
+        symbols = list(history.keys())
+        if not symbols or not any(len(history[symbol]) for symbol in symbols):
+            return
+        width = self.canvas.winfo_width() or 800
+        height = self.canvas.winfo_height() or 400
+
+        resized = (width, height) != self._size
+        listed = self._sync_items(symbols)
+        if resized or listed:
+            self._size = (width, height)
+            self._layout_static(symbols)
+
+        # A new size, symbol list or history needs a full rescale.
+        if resized or listed or getattr(history, "lineage", history) is not self._history:
+            self._full_redraw(history, symbols)
+            return
+        # Old points were merged into coarser tiers: patch the changed points in place.
+        if getattr(history, "compactions", None) != self._compactions:
+            if not self._patch_compacted(history, symbols):
+                self._full_redraw(history, symbols)
+            return
+
+        # Collect only the points added since the last render.
+        new_points = {symbol: self._points_after(history[symbol], self._last_day) for symbol in symbols}
+        fresh = [point for points in new_points.values() for point in points]
+        if not fresh:
+            return
+        max_day = max(day for day, _ in fresh)
+        low = min(price for _, price in fresh)
+        high = max(price for _, price in fresh)
+        # Rescale when the new points fall outside the scaled area.
+        if max_day > self._x_limit or low < self._y_low or high > self._y_high:
+            self._full_redraw(history, symbols)
+            return
+
+        # Too many appended points for the width: downsample again.
+        limit = 2 * self._max_points()
+        if any(len(self._coords[symbol]) // 2 + len(new_points[symbol]) > limit for symbol in symbols):
+            self._full_redraw(history, symbols)
+            return
+
+        # Same scale: track the running bounds and extend each line in place.
+        self._max_day = max(self._max_day, max_day)
+        if low < self._min_price:
+            self._min_price = low
+            self._set_label("min", f"Min ${low:.2f}")
+        if high > self._max_price:
+            self._max_price = high
+            self._set_label("max", f"Max ${high:.2f}")
+        self._last_day = self._max_day
+        for symbol, points in new_points.items():
+            coords = self._coords[symbol]
+            drawn_days, drawn_prices = self._drawn[symbol]
+            for day, price in points:
+                coords.extend((self._x(day), self._y(price)))
+                drawn_days.append(day)
+                drawn_prices.append(price)
+            self._push_coords(symbol)
+        self._set_label("day", f"Day {self._max_day}")
+        self.incremental_updates += 1
+
+    def _patch_compacted(self, history, symbols) -> bool:
+        # Replace only the points the compaction changed: points leaving the full-resolution
+        # ring, the tier buckets they were merged into, and tier points that were dropped.
+        # Returns False when the visible bounds moved and a full redraw is needed instead.
+        if self._downsampled:
+            return False
+        limit = self._max_points()
+        changes = {}
+        min_day = max_day = low = high = None
+        for symbol in symbols:
+            view = history[symbol]
+            if not hasattr(view, "columns"):
+                return False
+            day_column, price_column = view.columns()
+            drawn_days, drawn_prices = self._drawn[symbol]
+            if not day_column or not drawn_days or len(day_column) > limit:
+                return False
+            days = np.frombuffer(day_column, dtype=np.int64)
+            prices = np.frombuffer(price_column, dtype=np.float64)
+            old_days = np.frombuffer(drawn_days, dtype=np.int64)
+            old_prices = np.frombuffer(drawn_prices, dtype=np.float64)
+            # Points after the last drawn day are new; the ones before it may have changed.
+            cut = int(np.searchsorted(days, self._last_day, side="right"))
+            shared = min(len(old_days), cut)
+            # Unchanged points at the start (older tiers) and at the end (full-resolution ring).
+            head = (old_days[:shared] == days[:shared]) & (old_prices[:shared] == prices[:shared])
+            start = shared if head.all() else int(np.argmin(head))
+            tail = (old_days[len(old_days) - shared:] == days[cut - shared:cut]) & (
+                old_prices[len(old_prices) - shared:] == prices[cut - shared:cut]
+            )
+            differs = np.flatnonzero(~tail)
+            kept = shared - (int(differs[-1]) + 1 if len(differs) else 0)
+            kept = min(kept, shared - start)
+            changes[symbol] = (day_column, price_column, start, len(old_days) - kept, cut - kept, cut)
+            min_day = int(days[0]) if min_day is None else min(min_day, int(days[0]))
+            max_day = int(days[-1]) if max_day is None else max(max_day, int(days[-1]))
+            low = float(prices.min()) if low is None else min(low, float(prices.min()))
+            high = float(prices.max()) if high is None else max(high, float(prices.max()))
+
+        # The left edge or the price range moved out of the current scale.
+        if min_day != self._min_day or max_day > self._x_limit or low < self._y_low or high > self._y_high:
+            return False
+
+        for symbol, (day_column, price_column, start, old_end, new_end, cut) in changes.items():
+            coords = self._coords[symbol]
+            middle = [value for day, price in zip(day_column[start:new_end], price_column[start:new_end])
+                      for value in (self._x(day), self._y(price))]
+            fresh = [value for day, price in zip(day_column[cut:], price_column[cut:])
+                     for value in (self._x(day), self._y(price))]
+            self._coords[symbol] = coords[:2 * start] + middle + coords[2 * old_end:] + fresh
+            self._drawn[symbol] = (day_column, price_column)
+            self._push_coords(symbol)
+
+        # Bounds follow the data that is left (the scale itself stays put).
+        self._min_price = low
+        self._max_price = high
+        self._max_day = max_day
+        self._last_day = max_day
+        self._compactions = history.compactions
+        self._set_label("max", f"Max ${high:.2f}")
+        self._set_label("min", f"Min ${low:.2f}")
+        self._set_label("day", f"Day {max_day}")
+        self.incremental_updates += 1
+        return True
+
+    def _points_after(self, view, last_day) -> list:
+        # Walk back from the newest point until reaching already drawn days.
+        points = []
+        index = len(view) - 1
+        while index >= 0:
+            day, price = view[index]
+            if last_day is not None and day <= last_day:
+                break
+            points.append((day, price))
+            index -= 1
+        points.reverse()
+        return points
+
+    def _max_points(self) -> int:
+        # Number of horizontal pixels in the plot area.
+        width, _height = self._size
+        return max(2, int(width - 2 * self.PAD))
+
+    def _full_redraw(self, history, symbols):
+        # Downsample each series to the plot width and rebuild every line's coordinates.
+        version = getattr(history, "compactions", None)
+        series = {
+            symbol: self.downsampler.points(symbol, history[symbol], self._max_points(), version)
+            for symbol in symbols
+        }
+        all_points = [point for points in series.values() for point in points]
+        self._min_day = min(day for day, _ in all_points)
+        self._max_day = max(day for day, _ in all_points)
+        self._min_price = min(price for _, price in all_points)
+        self._max_price = max(price for _, price in all_points)
+        # Leave room on the right so new days can be appended without rescaling.
+        span = self._max_day - self._min_day
+        self._x_limit = self._max_day + max(10, span // 4)
+        # Same for prices: a little headroom above and below the data.
+        margin = (self._max_price - self._min_price) * 0.1
+        self._y_low = max(0.0, self._min_price - margin)
+        self._y_high = self._max_price + margin
+
+        for symbol, points in series.items():
+            coords = self._coords[symbol] = []
+            for day, price in points:
+                coords.extend((self._x(day), self._y(price)))
+            self._drawn[symbol] = (array("q", (day for day, _ in points)), array("d", (price for _, price in points)))
+            self._push_coords(symbol)
+        self._downsampled = any(len(points) < len(history[symbol]) for symbol, points in series.items())
+
+        self._set_label("max", f"Max ${self._max_price:.2f}")
+        self._set_label("min", f"Min ${self._min_price:.2f}")
+        self._set_label("day", f"Day {self._max_day}")
+        self._history = getattr(history, "lineage", history)
+        self._compactions = getattr(history, "compactions", None)
+        self._last_day = self._max_day
+        self.full_redraws += 1
+
+    def _x(self, day) -> float:
+        # Map a day onto the horizontal plot area.
+        width, _height = self._size
+        if self._x_limit == self._min_day:
+            return self.PAD
+        return self.PAD + (day - self._min_day) / (self._x_limit - self._min_day) * (width - 2 * self.PAD)
+
+    def _y(self, price) -> float:
+        # Map a price onto the vertical plot area.
+        _width, height = self._size
+        if self._y_high == self._y_low:
+            return height - self.PAD
+        return height - self.PAD - (price - self._y_low) / (self._y_high - self._y_low) * (height - 2 * self.PAD)
+
+    def _push_coords(self, symbol: str):
+        # Move the existing line item; hide it until it has two points.
+        coords = self._coords[symbol]
+        item = self._lines[symbol]
+        if len(coords) >= 4:
+            self.canvas.coords(item, *coords)
+            self.canvas.itemconfigure(item, state="normal")
+        else:
+            self.canvas.itemconfigure(item, state="hidden")
+
+    def _set_label(self, key: str, text: str):
+        # Only touch the canvas when the label text changes.
+        if self._label_text.get(key) != text:
+            self.canvas.itemconfigure(self._static[key], text=text)
+            self._label_text[key] = text
+
+    def _sync_items(self, symbols: List[str]) -> bool:
+        # Create static items once, and line/legend items for new symbols.
+        # Returns True when the set of symbols changed.
+        canvas = self.canvas
+        if not self._static:
+            self._static["x_axis"] = canvas.create_line(0, 0, 0, 0, fill=self.axis_color)
+            self._static["y_axis"] = canvas.create_line(0, 0, 0, 0, fill=self.axis_color)
+            self._grid = [canvas.create_line(0, 0, 0, 0, fill=self.grid_color, dash=(2, 2)) for _ in range(self.GRID_LINES)]
+            self._static["max"] = canvas.create_text(0, 0, text="", fill=self.text_color, anchor="w", font=("Consolas", 10))
+            self._static["min"] = canvas.create_text(0, 0, text="", fill=self.text_color, anchor="w", font=("Consolas", 10))
+            self._static["day"] = canvas.create_text(0, 0, text="", fill=self.text_color, anchor="e", font=("Consolas", 10))
+
+        changed = False
+        for symbol in symbols:
+            if symbol in self._lines:
+                continue
+            color = self._color(symbol)
+            self._lines[symbol] = canvas.create_line(0, 0, 0, 0, fill=color, width=2, smooth=True, state="hidden")
+            self._legend[symbol] = (
+                canvas.create_rectangle(0, 0, 0, 0, fill=color, outline=color),
+                canvas.create_text(0, 0, text=symbol, fill=self.text_color, anchor="w", font=("Consolas", 9)),
+            )
+            self._coords[symbol] = []
+            changed = True
+        # Drop items for symbols that are no longer in the history.
+        for symbol in [s for s in self._lines if s not in symbols]:
+            canvas.delete(self._lines.pop(symbol), *self._legend.pop(symbol))
+            self._coords.pop(symbol, None)
+            self._drawn.pop(symbol, None)
+            changed = True
+        return changed
+
+    def _color(self, symbol: str) -> str:
+        # Theme color if there is one, otherwise a stable pick from the fallback palette.
+        if symbol in self.colors:
+            return self.colors[symbol]
+        return FALLBACK_COLORS[zlib.crc32(symbol.encode("utf-8")) % len(FALLBACK_COLORS)]
+
+    def _layout_static(self, symbols: List[str]):
+        # Position axes, gridlines, labels and legend for the current size.
+        canvas = self.canvas
+        width, height = self._size
+        pad = self.PAD
+        canvas.coords(self._static["x_axis"], pad, height - pad, width - pad, height - pad)
+        canvas.coords(self._static["y_axis"], pad, pad, pad, height - pad)
+        for i, item in enumerate(self._grid, start=1):
+            y = pad + (height - 2 * pad) * i / (self.GRID_LINES + 1)
+            canvas.coords(item, pad, y, width - pad, y)
+        canvas.coords(self._static["max"], pad, pad - 10)
+        canvas.coords(self._static["min"], pad, height - pad + 10)
+        canvas.coords(self._static["day"], width - pad, height - pad + 10)
+        for idx, symbol in enumerate(symbols):
+            legend_y = pad + self.LEGEND_STEP * idx
+            swatch, label = self._legend[symbol]
+            canvas.coords(swatch, width - pad - 140, legend_y, width - pad - 125, legend_y + 10)
+            canvas.coords(label, width - pad - 115, legend_y + 5)
+
+    def bounds(self) -> Optional[tuple]:
+        # Current data bounds as (min_day, max_day, min_price, max_price).
+        if self._min_day is None:
+            return None
+        return self._min_day, self._max_day, self._min_price, self._max_price
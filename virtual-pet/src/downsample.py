@@ -0,0 +1,135 @@
+# Downsample.py
+# Import OrderedDict to keep the cache in least-recently-used order
+from collections import OrderedDict
+# Import NumPy for fast bucket math over long price series
+import numpy as np
+# Import type hints for the public functions
+from typing import List, Optional, Sequence, Tuple
+
+
+# Function to keep the lowest and highest price in each pixel column
+def min_max_downsample(days: np.ndarray, prices: np.ndarray, buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-pixel min/max downsampling. Days are split into `buckets` equal-width
+    columns; each column keeps its lowest and highest point, so every spike and
+    dip survives. The first and last points are always kept.
+    Returns at most 2 * buckets + 2 points.
+    """
+    # Short series are drawn as they are
+    count = len(days)
+    if buckets <= 0 or count <= 2 * buckets + 2:
+        return days, prices
+    # Start index of each column (empty columns collapse together)
+    edges = np.linspace(days[0], days[-1], buckets + 1)[1:-1]
+    starts = np.unique(np.concatenate(([0], np.searchsorted(days, edges, side="left"))))
+    ends = np.append(starts[1:], count)
+    # Sort by (column, price) so each column's min comes first and its max last
+    column_ids = np.repeat(np.arange(len(starts)), ends - starts)
+    order = np.lexsort((prices, column_ids))
+    lows = order[starts]
+    highs = order[ends - 1]
+    # Keep the chosen points in time order
+    keep = np.unique(np.concatenate(([0, count - 1], lows, highs)))
+    return days[keep], prices[keep]
+
+
+# Function to pick the most shape-defining point in each bucket
+def lttb_downsample(days: np.ndarray, prices: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets downsampling to `threshold` points.
+    Each bucket keeps the point that forms the largest triangle with the
+    previously kept point and the average of the next bucket.
+    """
+    # Short series (or tiny thresholds) are drawn as they are
+    count = len(days)
+    if threshold >= count or threshold < 3:
+        return days, prices
+    x = days.astype(np.float64)
+    y = prices.astype(np.float64)
+    # Width of each bucket, not counting the fixed first and last points
+    every = (count - 2) / (threshold - 2)
+    keep = [0]
+    anchor = 0
+    for bucket in range(threshold - 2):
+        # Average of the next bucket is the third corner of the triangle
+        next_start = int((bucket + 1) * every) + 1
+        next_end = min(int((bucket + 2) * every) + 1, count)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        # Pick the point in this bucket with the largest triangle area
+        start = int(bucket * every) + 1
+        end = int((bucket + 1) * every) + 1
+        areas = np.abs(
+            (x[anchor] - avg_x) * (y[start:end] - y[anchor])
+            - (x[anchor] - x[start:end]) * (avg_y - y[anchor])
+        )
+        anchor = start + int(np.argmax(areas))
+        keep.append(anchor)
+    keep.append(count - 1)
+    return days[keep], prices[keep]
+
+
+# Define a cache of downsampled series keyed by (history, symbol, width, range)
+class DownsampleCache:
+    """
+    Level-of-detail stage between StockMarket.price_history() and the canvas.
+    Series longer than `max_points` are reduced with min/max or LTTB, and the
+    result is cached so repeated redraws of the same range cost O(pixels).
+    """
+
+    # Supported algorithms
+    METHODS = {"minmax": min_max_downsample, "lttb": lttb_downsample}
+
+    # Constructor that picks the algorithm and the cache size
+    def __init__(self, method: str = "minmax", max_entries: int = 64):
+        # Validate the algorithm name
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown downsampling method: {method}")
+        self.method = method
+        self.max_entries = max_entries
+        # Cached point lists in least-recently-used order
+        self._cache: "OrderedDict[tuple, List[Tuple[int, float]]]" = OrderedDict()
+        # Counters to check how well the cache works
+        self.hits = 0
+        self.misses = 0
+
+    # Method to get at most about `max_points` points for one symbol's history
+    def points(self, symbol: str, view: Sequence[Tuple[int, float]], max_points: int, version: Optional[int] = None) -> List[Tuple[int, float]]:
+        # Short series need no downsampling (and no cache entry)
+        length = len(view)
+        if length <= max_points:
+            return list(view)
+        # The history's lineage, range, length and version identify the data exactly;
+        # plain sequences have no lineage, so they are downsampled without caching
+        lineage = getattr(view, "lineage", None)
+        key = (lineage, symbol, max_points, view[0][0], view[-1][0], length, version)
+        cached = self._cache.get(key) if lineage is not None else None
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return cached
+
+        # Pull the columns out of the history (fast path for PriceHistory views)
+        if hasattr(view, "columns"):
+            day_column, price_column = view.columns()
+            days = np.frombuffer(day_column, dtype=np.int64)
+            prices = np.frombuffer(price_column, dtype=np.float64)
+        else:
+            days = np.fromiter((day for day, _ in view), dtype=np.int64, count=length)
+            prices = np.fromiter((price for _, price in view), dtype=np.float64, count=length)
+
+        # Min/max keeps two points per column, so use half as many columns
+        if self.method == "minmax":
+            days, prices = min_max_downsample(days, prices, max(1, max_points // 2 - 1))
+        else:
+            days, prices = lttb_downsample(days, prices, max_points)
+        result = list(zip(days.tolist(), prices.tolist()))
+
+        # Store the result and drop the least recently used entry if needed
+        self.misses += 1
+        if lineage is None:
+            return result
+        self._cache[key] = result
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return result
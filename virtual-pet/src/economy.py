@@ -1,6 +1,65 @@
 # Economy.py
 # Import the defaultdict class from collections module to create a dictionary with default integer values
 from collections import defaultdict
+# Import Enum for the typed failure reasons
+from enum import Enum
+# Import NamedTuple to describe budgets and transaction results
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# Import the transaction ledger that records every spend and earning
+from ledger import EARN, SPEND, TransactionLedger
+
+# Predefined spending categories every Economy starts with
+EXPENSE_CATEGORIES = ("food", "clothing", "entertainment", "toys", "vet", "grooming", "investments", "other")
+# Ledger category for earnings that do not name one
+INCOME_CATEGORY = "income"
+
+
+# Define a spending limit for one category over a rolling number of days
+class Budget(NamedTuple):
+    limit: float
+    period_days: int = 30
+
+
+# Reasons a spend or earning can be refused
+class FailureReason(Enum):
+    UNKNOWN_CATEGORY = "unknown category"
+    INSUFFICIENT_FUNDS = "insufficient funds"
+    OVER_BUDGET = "over budget"
+    NON_POSITIVE_AMOUNT = "non-positive amount"
+
+
+# Define the outcome of one spend or earning (truthy when it went through)
+class TransactionResult(NamedTuple):
+    ok: bool
+    kind: str
+    category: str
+    amount: float
+    # Balance after the call, and why it failed (None on success)
+    balance: float
+    reason: Optional[FailureReason] = None
+
+    # Results work in `if economy.spend(...)` like the old bool return
+    def __bool__(self) -> bool:
+        return self.ok
+
+    # Human-readable description of the result
+    @property
+    def message(self) -> str:
+        if self.ok:
+            verb = "Spent" if self.kind == "spend" else "Earned"
+            return f"{verb} {self.amount} on {self.category}. Current balance: {self.balance}"
+        if self.reason is FailureReason.NON_POSITIVE_AMOUNT:
+            return "Earning amount must be positive."
+        if self.reason is FailureReason.OVER_BUDGET:
+            return f"Cannot spend {self.amount} on {self.category}. Over the {self.category} budget."
+        return f"Cannot spend {self.amount} on {self.category}. Current balance: {self.balance}"
+
+
+# Listener called with every TransactionResult
+TransactionListener = Callable[[TransactionResult], None]
+
+
 # Define the Economy class to manage money and spending in the virtual pet game
 class Economy:
     # Constructor that initializes the Economy with an optional starting balance (default 1000)
@@ -10,35 +69,101 @@ class Economy:
         # Create a defaultdict that automatically initializes missing keys with 0
         self.expenses = defaultdict(int)
         # Initialize predefined expense categories with 0 values
-        for category in ["food", "clothing", "entertainment", "toys", "vet", "grooming", "investments", "other"]:
+        for category in EXPENSE_CATEGORIES:
             # Set each category's initial expense to 0
             self.expenses[category] = 0
+        # Game day used to date ledger entries (advanced by advance_day)
+        self.day = 0
+        # Every transaction, with per-category running totals for windowed queries
+        self.ledger = TransactionLedger()
+        # Spending limits by category
+        self.budgets: Dict[str, Budget] = {}
+        # Functions told about every transaction (nothing is printed unless one is added)
+        self.listeners: List[TransactionListener] = []
 
     # Method to spend money on a specific category if sufficient balance exists
-    def spend(self, category: str, amount: int) -> bool:
-        # Check if the category exists in expenses AND if the amount is within the current balance
-        if category in self.expenses and amount <= self.balance:
+    def spend(self, category: str, amount: int) -> TransactionResult:
+        # Work out why the spend cannot go through, if it cannot
+        reason = None
+        if category not in self.expenses:
+            reason = FailureReason.UNKNOWN_CATEGORY
+        elif amount > self.balance:
+            reason = FailureReason.INSUFFICIENT_FUNDS
+        elif category in self.budgets:
+            # Refuse spending that would go over the category's budget
+            budget = self.budgets[category]
+            if self.spent(category, budget.period_days) + amount > budget.limit:
+                reason = FailureReason.OVER_BUDGET
+        if reason is None:
             # Add the amount to the category's total spending
             self.expenses[category] += amount
             # Subtract the amount from the overall balance
             self.balance -= amount
-            # Return True to indicate the spending was successful
-            return True
-        # Print an error message if the spending failed
-        print(f"Cannot spend {amount} on {category}. Current balance: {self.balance}")
-        # Return False to indicate the spending was unsuccessful
-        return False
+            # Record the transaction in the ledger
+            self.ledger.record(self.day, category, amount, SPEND)
+        return self._result(reason is None, "spend", category, amount, reason)
 
     # Method to add money to the balance from earnings
-    def earn(self, amount:int):
+    def earn(self, amount:int, category: str = INCOME_CATEGORY) -> TransactionResult:
         # Check if the earned amount is positive
         if amount > 0:
             # Add the earned amount to the current balance
             self.balance += amount
-        # If the amount is not positive, display an error message
-        else:
-            print("Earning amount must be positive.")
-            
+            # Record where the money came from in the ledger
+            self.ledger.record(self.day, category, amount, EARN)
+            return self._result(True, "earn", category, amount)
+        # Refuse non-positive earnings
+        return self._result(False, "earn", category, amount, FailureReason.NON_POSITIVE_AMOUNT)
+
+    # Method to build a result and pass it to the listeners
+    def _result(self, ok: bool, kind: str, category: str, amount: float, reason: Optional[FailureReason] = None) -> TransactionResult:
+        result = TransactionResult(ok, kind, category, amount, self.balance, reason)
+        for listener in self.listeners:
+            listener(result)
+        return result
+
+    # Method to register a function called with every TransactionResult
+    def add_listener(self, listener: TransactionListener):
+        self.listeners.append(listener)
+
+    # Method to unregister a listener added with add_listener
+    def remove_listener(self, listener: TransactionListener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    # Method to move the economy's calendar forward (dates new ledger entries)
+    def advance_day(self, days: int = 1):
+        self.day += days
+
+    # Method to total spending on a category over the last `days` days (all time when None)
+    def spent(self, category: str, days: Optional[int] = None) -> float:
+        start = None if days is None else self.day - days + 1
+        return self.ledger.total(category, start, self.day, SPEND)
+
+    # Method to total earnings (from one category, or all) over the last `days` days
+    def earned(self, category: Optional[str] = None, days: Optional[int] = None) -> float:
+        start = None if days is None else self.day - days + 1
+        if category is None:
+            return self.ledger.total_all(start, self.day, EARN)
+        return self.ledger.total(category, start, self.day, EARN)
+
+    # Method to limit spending on a category to `limit` per rolling `period_days`
+    def set_budget(self, category: str, limit: float, period_days: int = 30):
+        if limit < 0 or period_days <= 0:
+            raise ValueError("Budget limit must be non-negative and the period positive.")
+        self.budgets[category] = Budget(limit, period_days)
+
+    # Method to remove a category's budget; returns False if it had none
+    def clear_budget(self, category: str) -> bool:
+        return self.budgets.pop(category, None) is not None
+
+    # Method to get how much can still be spent on a category this period (None without a budget)
+    def budget_remaining(self, category: str) -> Optional[float]:
+        budget = self.budgets.get(category)
+        if budget is None:
+            return None
+        return max(0.0, budget.limit - self.spent(category, budget.period_days))
+
     # Method to retrieve the current balance
     def get_balance(self):
         # Return the current balance value
@@ -51,11 +176,35 @@ class Economy:
     
     # Method to print a detailed report of balance and expenses
     def report(self):
-        # Print the current balance
-        print(f"Current Balance: {self.balance}")
-        # Print a header for the expenses breakdown section
-        print("Expenses Breakdown:")
+        ConsoleReporter().report(self)
+
+
+# Define the opt-in console adapter: prints failed transactions and reports
+class ConsoleReporter:
+    """
+    Listener that writes failed spends and earnings to the console, as
+    Economy used to do on every failure. Add it with
+    economy.add_listener(ConsoleReporter()) where console output is wanted;
+    `write` defaults to print.
+    """
+
+    # Constructor that picks the output function and whether successes are shown too
+    def __init__(self, write: Callable[[str], None] = print, show_success: bool = False):
+        self.write = write
+        self.show_success = show_success
+
+    # Listener entry point
+    def __call__(self, result: TransactionResult):
+        if self.show_success or not result.ok:
+            self.write(result.message)
+
+    # Method to write the balance and the expenses breakdown
+    def report(self, economy: Economy):
+        # Write the current balance
+        self.write(f"Current Balance: {economy.balance}")
+        # Write a header for the expenses breakdown section
+        self.write("Expenses Breakdown:")
         # Loop through each category and its spending amount
-        for category, amount in self.expenses.items():
-            # Print each category with its total spending, indented for readability
-            print(f"  {category}: {amount}")
+        for category, amount in economy.expenses.items():
+            # Write each category with its total spending, indented for readability
+            self.write(f"  {category}: {amount}")
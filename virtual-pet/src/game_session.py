@@ -0,0 +1,226 @@
+# Game_session.py
+# Import random for the scripted player's own random stream
+import random
+# Import type hints for callbacks and return values
+from typing import Callable, Dict, Optional, Tuple, Union
+
+# Import the pet model and its stat profiles
+from pet import Pet, intern_profile, petStats
+# Import the Economy class that tracks money
+from economy import Economy
+# Import the market simulator that shares the Economy balance
+from stock_market import StockMarket
+
+# Default stat profiles for each selectable species (shared by every pet of the species)
+PET_PROFILES: Dict[str, petStats] = {
+    "dog": intern_profile(petStats("dog", 40, 80, 70, 90)),
+    "cat": intern_profile(petStats("cat", 80, 70, 60, 80)),
+    "guinea pig": intern_profile(petStats("guinea pig", 60, 75, 65, 70, 90)),
+}
+
+# Cost of each paid care action
+FEED_COST = 10
+PLAY_COST = 5
+SHOWER_COST = 8
+
+# Scripted player: chance per day to skip care, chance per day to look at the market,
+# and money kept back for care before investing
+SKIP_CARE_CHANCE = 0.1
+TRADE_CHANCE = 0.25
+CARE_RESERVE = 150
+
+
+# Function to look up the stat profile for a species name
+def profile_for(species: str) -> petStats:
+    # Use the known profile, or default stats for an unknown species
+    return PET_PROFILES.get(species.lower()) or intern_profile(species)
+
+
+# Define the core game state and actions, shared by the GUI and headless runners
+class GameSession:
+    """
+    Owns the Pet, Economy and StockMarket for one game and applies the
+    player's actions to them. Nothing here touches Tkinter or the clock,
+    so sessions can run as fast as the CPU allows.
+    """
+
+    # Constructor that creates the three models for a new game
+    def __init__(self, name: str, species: Union[petStats, str] = "dog", starting_balance: int = 1000, seed: Optional[int] = None):
+        # Pick the stat profile for the species (or use the given profile)
+        profile = species if isinstance(species, petStats) else profile_for(species)
+        # Create the pet, the money tracker and the market
+        self.pet = Pet(name, profile)
+        self.economy = Economy(starting_balance)
+        self.stock_market = StockMarket(self.economy, seed)
+        # Number of days this session has advanced
+        self.day = 0
+        # True once the pet reaches a loss condition
+        self.game_over = False
+
+    # Build a session around models that already exist (a loaded save or a recovered journal)
+    @classmethod
+    def from_models(cls, pet: Pet, economy: Economy, stock_market: StockMarket) -> "GameSession":
+        # Skip __init__ so no fresh models (or market random draws) are created
+        session = cls.__new__(cls)
+        session.pet = pet
+        session.economy = economy
+        session.stock_market = stock_market
+        # Every session day ticks the market once, so the market day is the session day
+        session.day = stock_market.day
+        session.game_over = False
+        return session
+
+    # Feed action: spend money and reduce hunger
+    def feed(self) -> bool:
+        # Only feed the pet if the food can be paid for
+        if self.economy.spend("food", FEED_COST):
+            self.pet.feed(20)
+            return True
+        return False
+
+    # Play action: spend money and raise happiness
+    def play(self) -> bool:
+        # Only play if the toys can be paid for
+        if self.economy.spend("toys", PLAY_COST):
+            self.pet.play(10)
+            return True
+        return False
+
+    # Sleep action: restore energy without spending
+    def sleep(self) -> bool:
+        self.pet.sleep(5)
+        return True
+
+    # Bath action: spend money and improve cleanliness
+    def shower(self) -> bool:
+        # Only bathe the pet if grooming can be paid for
+        if self.economy.spend("grooming", SHOWER_COST):
+            self.pet.shower(5)
+            return True
+        return False
+
+    # Buy shares through the market
+    def buy_stock(self, symbol: str, shares: int) -> Tuple[bool, str]:
+        return self.stock_market.buy(symbol, shares)
+
+    # Sell shares through the market
+    def sell_stock(self, symbol: str, shares: int) -> Tuple[bool, str]:
+        return self.stock_market.sell(symbol, shares)
+
+    # Place a resting limit, stop-loss or take-profit order
+    def place_order(self, symbol: str, kind: str, shares: int, trigger: float) -> Tuple[bool, str]:
+        return self.stock_market.place_order(symbol, kind, shares, trigger)
+
+    # Cancel a resting order by its number
+    def cancel_order(self, order_id: int) -> Tuple[bool, str]:
+        return self.stock_market.cancel_order(order_id)
+
+    # Advance the game by one day: the market moves, then the pet's stats decay
+    def advance_day(self):
+        # Move market prices first, like the GUI tick always has
+        self.stock_market.tick()
+        # Age the pet and degrade its stats
+        self.pet.pass_time(1)
+        # Date the next ledger entries with the new day
+        self.economy.advance_day()
+        # Count the day
+        self.day += 1
+
+    # Advance a batch of days (one frame at high speed), stopping early once the pet is lost
+    def advance_days(self, days: int) -> int:
+        """Returns how many days actually ran."""
+        for run in range(1, days + 1):
+            self.advance_day()
+            if self.check_game_over():
+                return run
+        return days
+
+    # Check whether the pet has reached a loss condition
+    def check_game_over(self) -> bool:
+        # Record the result so callers can read it later
+        self.game_over = self.pet.detectLoss()
+        return self.game_over
+
+    # Method to summarize the session's outcome
+    def summary(self) -> dict:
+        # Collect the numbers balancing studies care about
+        return {
+            "days": self.day,
+            "last_death_reason": self.pet.last_death_reason,
+            "balance": self.economy.balance,
+            "realized_profit": self.stock_market.realized_profit,
+            "expenses": dict(self.economy.expenses),
+            "max_drawdown": self.stock_market.analytics.max_drawdown,
+            "volatility": self.stock_market.analytics.volatility,
+        }
+
+
+# Scripted care policy: top up any stat that is getting low, if money allows
+def threshold_care_policy(session: GameSession):
+    # Shortcuts for the pet, its stat caps and the wallet
+    pet = session.pet
+    caps = pet.pet_profile
+    economy = session.economy
+    # Feed before hunger gets near the "hungry" state (dogs have a low cap, so use half of it)
+    if pet.hunger < max(35, caps.hunger // 2) and economy.balance >= FEED_COST:
+        session.feed()
+    # Sleep when energy is low
+    if pet.energy < 40:
+        session.sleep()
+    # Bathe when the pet is getting dirty
+    if pet.cleanliness < 40 and economy.balance >= SHOWER_COST:
+        session.shower()
+    # Play when happiness drops
+    if pet.happiness < 40 and economy.balance >= PLAY_COST:
+        session.play()
+
+
+# Function to build a seeded scripted player: threshold care with missed days, plus small trades
+def scripted_player_policy(seed: Optional[int] = None) -> Callable[[GameSession], None]:
+    """
+    Returns a policy for run_session. Every choice is drawn from
+    random.Random(seed), so one seed always plays the same game and different
+    seeds give different games (missed care, trades, profits and losses).
+    """
+    rng = random.Random(seed)
+
+    # The policy itself, called once per day
+    def policy(session: GameSession):
+        # Some days the player does not look after the pet
+        if rng.random() >= SKIP_CARE_CHANCE:
+            threshold_care_policy(session)
+        # Most days the player does not look at the market either
+        if rng.random() >= TRADE_CHANCE:
+            return
+        market = session.stock_market
+        symbol = rng.choice(market.symbols)
+        shares = market.holdings[symbol]
+        if shares:
+            # Sell after a 20% gain or loss against the average cost, or on a whim
+            change = market.prices[symbol] / market.average_cost(symbol) - 1
+            if abs(change) >= 0.2 or rng.random() < 0.2:
+                session.sell_stock(symbol, shares)
+        else:
+            # Invest a random slice of the money above the care reserve
+            budget = (session.economy.balance - CARE_RESERVE) * rng.uniform(0.1, 0.5)
+            count = int(budget // market.prices[symbol])
+            if count > 0:
+                session.buy_stock(symbol, count)
+
+    return policy
+
+
+# Function to run one session for up to `days` days with a care policy
+def run_session(session: GameSession, days: int, policy: Callable[[GameSession], None] = threshold_care_policy) -> GameSession:
+    # Play one day at a time: the policy acts, then time moves on
+    for _ in range(days):
+        # Let the policy take its actions for the day
+        policy(session)
+        if session.check_game_over():
+            break
+        # Advance the pet and the market
+        session.advance_day()
+        if session.check_game_over():
+            break
+    # Return the session so callers can read its summary
+    return session
@@ -0,0 +1,66 @@
+# Headless.py
+# Command-line runner for simulations without Tkinter:
+#     cd virtual-pet/src
+#     python -m headless --sessions 100 --days 365 --seed 1
+# Import argparse to read command-line options
+import argparse
+# Import random to derive one seed per session
+import random
+# Import time to measure how fast sessions run
+import time
+# Import Counter to tally how pets were lost
+from collections import Counter
+# Import type hints for the argument list
+from typing import List, Optional
+
+# Import the session core and the scripted player
+from game_session import PET_PROFILES, GameSession, run_session, scripted_player_policy
+
+
+# Function to build the command-line parser
+def build_parser() -> argparse.ArgumentParser:
+    # Describe the runner and its options
+    parser = argparse.ArgumentParser(description="Run virtual pet sessions without the GUI.")
+    parser.add_argument("--sessions", type=int, default=100, help="number of sessions to run")
+    parser.add_argument("--days", type=int, default=365, help="maximum days per session")
+    parser.add_argument("--species", default="dog", choices=sorted(PET_PROFILES), help="pet species")
+    parser.add_argument("--balance", type=int, default=1000, help="starting balance")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for repeatable runs")
+    return parser
+
+
+# Function to run many sessions back to back and print a summary
+def main(argv: Optional[List[str]] = None) -> int:
+    # Read the options
+    args = build_parser().parse_args(argv)
+    # Each session's market and player have their own random streams; derive their seeds from the run seed
+    seeds = random.Random(args.seed)
+
+    # Run every session as fast as possible (no tick delay)
+    started = time.perf_counter()
+    summaries = []
+    for index in range(args.sessions):
+        session_seed = seeds.getrandbits(64)
+        session = GameSession(f"pet-{index}", args.species, args.balance, session_seed)
+        summaries.append(run_session(session, args.days, scripted_player_policy(session_seed)).summary())
+    elapsed = time.perf_counter() - started
+
+    # Print aggregate results
+    total_days = sum(summary["days"] for summary in summaries)
+    reasons = Counter(summary["last_death_reason"] or "survived" for summary in summaries)
+    print(f"Sessions:        {len(summaries)}")
+    print(f"Simulated days:  {total_days} ({total_days / elapsed if elapsed else 0:,.0f} days/s)")
+    print(f"Average days:    {total_days / max(1, len(summaries)):.1f}")
+    print(f"Average balance: ${sum(summary['balance'] for summary in summaries) / max(1, len(summaries)):,.2f}")
+    print(f"Avg drawdown:    {sum(summary['max_drawdown'] for summary in summaries) / max(1, len(summaries)):.1%} max, "
+          f"volatility {sum(summary['volatility'] for summary in summaries) / max(1, len(summaries)):.2%}/day")
+    print("Outcomes:")
+    for reason, count in reasons.most_common():
+        print(f"  {reason:<26} {count}")
+    print(f"Elapsed:         {elapsed:.2f}s")
+    return 0
+
+
+# Run the CLI when executed with `python -m headless`
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,345 @@
+# Journal.py
+# Append-only write-ahead journal for crash-safe autosave.
+# Every state-changing call on the pet, economy and market is appended as a
+# small binary record; a full snapshot (save_game's binary format) is written
+# every `snapshot_every` records and the log behind it is dropped.
+# Recovery loads the newest snapshot and replays the records written after it.
+# Import functools to keep the wrapped methods' names
+import functools
+# Import inspect to record keyword and default arguments in positional order
+import inspect
+# Import os for low-level appends, fsync and cleaning up old files
+import os
+# Import struct to pack record frames and arguments
+import struct
+# Import time for the fsync interval
+import time
+# Import zlib for the per-record checksum that detects a torn final write
+import zlib
+# Import type hints for the public methods
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Import the models and the snapshot format
+from economy import Economy, TransactionResult
+from pet import Pet
+from save_game import SavedGame, atomic_write, decode_game, encode_game
+from stock_market import StockMarket
+
+# Every frame starts with the payload length and its CRC32
+FRAME = struct.Struct("<HI")
+# Record payload: the operation code, then tagged arguments
+OP = struct.Struct("<B")
+INT = struct.Struct("<q")
+FLOAT = struct.Struct("<d")
+STR_LEN = struct.Struct("<H")
+
+# Journaled methods: (model, method) -> operation code
+OPERATIONS: Dict[Tuple[str, str], int] = {
+    ("economy", "spend"): 1,
+    ("economy", "earn"): 2,
+    ("pet", "feed"): 3,
+    ("pet", "play"): 4,
+    ("pet", "sleep"): 5,
+    ("pet", "shower"): 6,
+    ("pet", "pass_time"): 7,
+    ("market", "tick"): 8,
+    ("market", "buy"): 9,
+    ("market", "sell"): 10,
+    ("market", "list_symbol"): 11,
+    ("market", "delist_symbol"): 12,
+    ("market", "place_order"): 13,
+    ("market", "cancel_order"): 14,
+    ("economy", "advance_day"): 15,
+    ("economy", "set_budget"): 16,
+    ("economy", "clear_budget"): 17,
+}
+# Reverse lookup used when replaying
+OPERATION_NAMES = {code: key for key, code in OPERATIONS.items()}
+
+
+# Function to pack call arguments as tagged values (i = int64, d = double, s = UTF-8 string, b = bool, n = None)
+def pack_args(args) -> bytes:
+    parts = []
+    for value in args:
+        if value is None:
+            parts.append(b"n")
+        elif isinstance(value, bool):
+            parts.append(b"b" + (b"\x01" if value else b"\x00"))
+        elif isinstance(value, int) or hasattr(value, "__index__"):
+            # NumPy integers count as ints too
+            parts.append(b"i" + INT.pack(int(value)))
+        elif isinstance(value, float):
+            parts.append(b"d" + FLOAT.pack(value))
+        elif isinstance(value, str):
+            encoded = value.encode("utf-8")
+            parts.append(b"s" + STR_LEN.pack(len(encoded)) + encoded)
+        else:
+            raise TypeError(f"cannot journal argument of type {type(value).__name__}")
+    return b"".join(parts)
+
+
+# Function to unpack tagged values written by pack_args
+def unpack_args(payload: bytes, offset: int = 0) -> list:
+    values = []
+    while offset < len(payload):
+        tag = payload[offset:offset + 1]
+        offset += 1
+        if tag == b"n":
+            values.append(None)
+        elif tag == b"b":
+            values.append(payload[offset] == 1)
+            offset += 1
+        elif tag == b"i":
+            values.append(INT.unpack_from(payload, offset)[0])
+            offset += INT.size
+        elif tag == b"d":
+            values.append(FLOAT.unpack_from(payload, offset)[0])
+            offset += FLOAT.size
+        elif tag == b"s":
+            (length,) = STR_LEN.unpack_from(payload, offset)
+            offset += STR_LEN.size
+            values.append(payload[offset:offset + length].decode("utf-8"))
+            offset += length
+        else:
+            raise ValueError(f"unknown argument tag {tag!r}")
+    return values
+
+
+# Function to tell whether a call left the models unchanged (failed spend, buy or sell)
+def _failed(result) -> bool:
+    if result is False or isinstance(result, TransactionResult):
+        return not result
+    return isinstance(result, tuple) and len(result) == 2 and result[0] is False
+
+
+# Function to replay a recorded market tick from the snapshot's random stream
+def _replay_tick(market: StockMarket, args: list):
+    # The record holds the day the tick reached; a mismatch means the log does not fit the snapshot
+    market.tick()
+    if market.day != args[0]:
+        raise ValueError(f"journal tick for day {args[0]} replayed as day {market.day}")
+
+
+# Function to read every intact record from a journal file; stops at the first torn or corrupt frame
+def read_records(path: str) -> Tuple[List[Tuple[int, list]], int]:
+    """Return the decoded (op, args) records and the byte length of the intact prefix."""
+    with open(path, "rb") as handle:
+        data = handle.read()
+    records = []
+    offset = 0
+    while offset + FRAME.size <= len(data):
+        length, checksum = FRAME.unpack_from(data, offset)
+        start = offset + FRAME.size
+        payload = data[start:start + length]
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            break
+        (op,) = OP.unpack_from(payload)
+        records.append((op, unpack_args(payload, OP.size)))
+        offset = start + length
+    return records, offset
+
+
+# Function to replay records onto freshly loaded models
+def replay(game: SavedGame, records: List[Tuple[int, list]]):
+    # Map model names to the restored objects
+    targets = {"pet": game.pet, "economy": game.economy, "market": game.market}
+    for op, args in records:
+        model, method = OPERATION_NAMES[op]
+        if model == "market" and method == "tick":
+            _replay_tick(game.market, args)
+        else:
+            getattr(targets[model], method)(*args)
+
+
+# Define the journal that records calls and writes periodic snapshots
+class GameJournal:
+    """
+    Write-ahead journal for one game, stored in `directory` as
+    snapshot-<generation>.bin files and a journal-<generation>.log holding
+    the records written after that snapshot.
+
+    Records reach the OS on every call; fsync runs after `fsync_every`
+    records or `fsync_interval` seconds, whichever comes first (0 / None turn
+    either trigger off), so the disk cost per tick stays bounded.
+    A new snapshot is written every `snapshot_every` records and the older
+    snapshot and log are deleted.
+    """
+
+    # Constructor that stores the settings; call attach() to start journaling
+    def __init__(self, directory: str, snapshot_every: int = 5000, fsync_every: int = 64, fsync_interval: Optional[float] = 1.0):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        # Models being journaled
+        self.pet: Optional[Pet] = None
+        self.economy: Optional[Economy] = None
+        self.market: Optional[StockMarket] = None
+        # Current generation and its open log file descriptor
+        self.generation = 0
+        self._fd: Optional[int] = None
+        # Records since the last snapshot and since the last fsync
+        self.records_since_snapshot = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        # Depth of journaled calls in progress (market.buy calls economy.spend)
+        self._depth = 0
+        # Original classes of slotted models whose class was swapped by attach()
+        self._classes: Dict[str, type] = {}
+        # Counters to check the cost of journaling
+        self.records_written = 0
+        self.fsyncs = 0
+        self.snapshots = 0
+
+    # Method to start journaling the given models (writes a first snapshot)
+    def attach(self, pet: Pet, economy: Economy, market: StockMarket):
+        # Continue after any generation already on disk
+        os.makedirs(self.directory, exist_ok=True)
+        existing = self._generations("snapshot-", ".bin")
+        self.generation = existing[-1] if existing else 0
+        self.pet, self.economy, self.market = pet, economy, market
+        # Wrap the journaled methods on these instances only
+        for model in ("pet", "economy", "market"):
+            target = getattr(self, model)
+            wrapped = {
+                method: self._wrap(target, getattr(target, method), model, method, op)
+                for (owner, method), op in OPERATIONS.items() if owner == model
+            }
+            if hasattr(target, "__dict__"):
+                target.__dict__.update(wrapped)
+            else:
+                # Slotted models (Pet) have no instance dict: give this one instance a subclass holding the wrappers
+                cls = type(target)
+                self._classes[model] = cls
+                namespace = {"__slots__": (), **{method: staticmethod(function) for method, function in wrapped.items()}}
+                target.__class__ = type(cls.__name__, (cls,), namespace)
+        # Start from a snapshot so recovery never needs anything older
+        self.snapshot()
+
+    # Method to stop journaling: restore the original methods and close the log
+    def detach(self):
+        # Make everything written so far durable
+        self.close()
+        for model, method in OPERATIONS:
+            target = getattr(self, model)
+            if target is not None and hasattr(target, "__dict__"):
+                target.__dict__.pop(method, None)
+        for model, cls in self._classes.items():
+            getattr(self, model).__class__ = cls
+        self._classes.clear()
+        self.pet = self.economy = self.market = None
+
+    # Method to wrap one bound method so successful outermost calls are recorded
+    def _wrap(self, target, bound: Callable, model: str, method: str, op: int) -> Callable:
+        signature = inspect.signature(bound)
+
+        @functools.wraps(bound)
+        def journaled(*args, **kwargs):
+            # Calls made from inside another journaled call are replayed by that call
+            self._depth += 1
+            try:
+                result = bound(*args, **kwargs)
+            finally:
+                self._depth -= 1
+            if self._depth == 0 and not _failed(result):
+                if model == "market" and method == "tick":
+                    # The market's own random stream is in the snapshot, so the day is enough
+                    values = [target.day]
+                else:
+                    arguments = signature.bind(*args, **kwargs)
+                    arguments.apply_defaults()
+                    values = list(arguments.args)
+                self._append(op, values)
+            return result
+        return journaled
+
+    # Method to append one record and apply the fsync and snapshot policies
+    def _append(self, op: int, values: list):
+        payload = OP.pack(op) + pack_args(values)
+        os.write(self._fd, FRAME.pack(len(payload), zlib.crc32(payload)) + payload)
+        self.records_written += 1
+        self.records_since_snapshot += 1
+        self._unsynced += 1
+        # Snapshot (which also syncs) or fsync when a batch is full or old enough
+        if self.snapshot_every and self.records_since_snapshot >= self.snapshot_every:
+            self.snapshot()
+        elif (self.fsync_every and self._unsynced >= self.fsync_every) or (
+            self.fsync_interval is not None and time.monotonic() - self._last_sync >= self.fsync_interval
+        ):
+            self.sync()
+
+    # Method to force buffered records to disk
+    def sync(self):
+        if self._fd is not None and self._unsynced:
+            os.fsync(self._fd)
+            self.fsyncs += 1
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    # Method to write a snapshot of the current state and compact the log behind it
+    def snapshot(self):
+        # Write the snapshot for the next generation atomically
+        generation = self.generation + 1
+        atomic_write(self._path("snapshot-", generation, ".bin"), encode_game(self.pet, self.economy, self.market, binary=True))
+        # Switch to a fresh log; recovery replays only the log of the newest snapshot
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = os.open(self._path("journal-", generation, ".log"), os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+        self.generation = generation
+        self.records_since_snapshot = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self.snapshots += 1
+        # Everything older is now covered by the snapshot
+        for old in self._generations("snapshot-", ".bin"):
+            if old < generation:
+                self._remove(self._path("snapshot-", old, ".bin"))
+        for old in self._generations("journal-", ".log"):
+            if old < generation:
+                self._remove(self._path("journal-", old, ".log"))
+
+    # Method to sync and close the log
+    def close(self):
+        if self._fd is not None:
+            self.sync()
+            os.close(self._fd)
+            self._fd = None
+
+    # Function to rebuild the game from the newest snapshot and its log
+    @staticmethod
+    def recover(directory: str) -> SavedGame:
+        """Load the newest snapshot in `directory` and replay the intact records after it."""
+        journal = GameJournal(directory)
+        generations = journal._generations("snapshot-", ".bin")
+        if not generations:
+            raise FileNotFoundError(f"no snapshot in {directory}")
+        generation = generations[-1]
+        with open(journal._path("snapshot-", generation, ".bin"), "rb") as handle:
+            game = decode_game(handle.read())
+        log_path = journal._path("journal-", generation, ".log")
+        if os.path.exists(log_path):
+            records, _length = read_records(log_path)
+            replay(game, records)
+        return game
+
+    # Method to list the generations of files with a prefix and suffix, oldest first
+    def _generations(self, prefix: str, suffix: str) -> List[int]:
+        found = []
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix) and name.endswith(suffix):
+                number = name[len(prefix):-len(suffix)]
+                if number.isdigit():
+                    found.append(int(number))
+        return sorted(found)
+
+    # Method to build the path of a snapshot or log file
+    def _path(self, prefix: str, generation: int, suffix: str) -> str:
+        return os.path.join(self.directory, f"{prefix}{generation:06d}{suffix}")
+
+    # Method to delete a file that may already be gone
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,235 @@
+# Ledger.py
+# Append-only transaction ledger behind Economy.
+# Import array for compact, typed columns
+from array import array
+# Import bisect to answer windowed queries in O(log n)
+from bisect import bisect_right
+# Import type hints for the public methods
+from typing import Dict, List, Optional, Tuple
+
+# Transaction kinds stored in the kind column
+SPEND = 0
+EARN = 1
+KIND_NAMES = ("spend", "earn")
+
+
+# Define the ledger: one row per transaction plus per-category prefix sums
+class TransactionLedger:
+    """
+    Transactions are stored as four parallel arrays (day, category code,
+    amount, kind), so a row costs about 25 bytes instead of a tuple of
+    Python objects. For every (category, kind) pair the ledger also keeps the
+    transaction days and a running total, so "spent on food in days a..b"
+    is two binary searches.
+
+    Rows older than `detail_days` are rolled up every `rollup_days` days:
+    each category's rows in an older `rollup_days` bucket become one row on
+    the bucket's last day. Rows older than `archive_days` are merged further,
+    into a single row per category and kind, so the ledger's size stays
+    bounded however long the game runs. Windowed queries that start inside a
+    rolled-up bucket or the archive are answered at that resolution; totals
+    stay exact.
+    """
+
+    # Constructor that sets the roll-up policy (detail_days=None keeps every row,
+    # archive_days=None keeps every bucket)
+    def __init__(self, detail_days: Optional[int] = 365, rollup_days: int = 30, archive_days: Optional[int] = 1825):
+        if detail_days is not None and archive_days is not None and archive_days < detail_days:
+            raise ValueError("archive_days must not be shorter than detail_days")
+        self.detail_days = detail_days
+        self.rollup_days = rollup_days
+        self.archive_days = archive_days
+        # Category names and their codes in the category column
+        self.categories: List[str] = []
+        self._codes: Dict[str, int] = {}
+        # Row columns
+        self.days = array("q")
+        self.codes = array("H")
+        self.amounts = array("d")
+        self.kinds = array("B")
+        # Per (category code, kind): transaction days and running totals
+        self._prefix_days: Dict[Tuple[int, int], array] = {}
+        self._prefix_totals: Dict[Tuple[int, int], array] = {}
+        # Rows before this index are already rolled up, and per (code, kind) the
+        # number of prefix entries already at bucket resolution; day of the last roll-up
+        self._rolled_rows = 0
+        self._rolled_prefix: Dict[Tuple[int, int], int] = {}
+        self._last_rollup_day = 0
+
+    # Method to get (or create) the code for a category name
+    def code(self, category: str) -> int:
+        code = self._codes.get(category)
+        if code is None:
+            code = self._codes[category] = len(self.categories)
+            self.categories.append(category)
+        return code
+
+    # Method to record one transaction
+    def record(self, day: int, category: str, amount: float, kind: int = SPEND):
+        # Days never go backwards, which keeps every column sorted by day
+        if self.days and day < self.days[-1]:
+            raise ValueError("ledger days must not go backwards")
+        code = self.code(category)
+        self.days.append(day)
+        self.codes.append(code)
+        self.amounts.append(amount)
+        self.kinds.append(kind)
+        # Extend the running total for this category and kind
+        key = (code, kind)
+        days = self._prefix_days.get(key)
+        if days is None:
+            days = self._prefix_days[key] = array("q")
+            self._prefix_totals[key] = array("d")
+        totals = self._prefix_totals[key]
+        days.append(day)
+        totals.append((totals[-1] if totals else 0.0) + amount)
+        # Roll up old rows once per roll-up period
+        if self.detail_days is not None and day - self._last_rollup_day >= self.rollup_days:
+            self.rollup(day)
+
+    # Method to total one category's transactions of a kind between two days (inclusive)
+    def total(self, category: str, start_day: Optional[int] = None, end_day: Optional[int] = None, kind: int = SPEND) -> float:
+        code = self._codes.get(category)
+        if code is None or (code, kind) not in self._prefix_days:
+            return 0.0
+        return self._window(self._prefix_days[(code, kind)], self._prefix_totals[(code, kind)], start_day, end_day)
+
+    # Method to total every category's transactions of a kind between two days (inclusive)
+    def total_all(self, start_day: Optional[int] = None, end_day: Optional[int] = None, kind: int = SPEND) -> float:
+        return sum(
+            self._window(days, self._prefix_totals[key], start_day, end_day)
+            for key, days in self._prefix_days.items()
+            if key[1] == kind
+        )
+
+    # Running-total difference across [start_day, end_day] with two binary searches
+    @staticmethod
+    def _window(days: array, totals: array, start_day: Optional[int], end_day: Optional[int]) -> float:
+        end = len(days) if end_day is None else bisect_right(days, end_day)
+        start = 0 if start_day is None else bisect_right(days, start_day - 1)
+        if end <= start:
+            return 0.0
+        return totals[end - 1] - (totals[start - 1] if start else 0.0)
+
+    # Method to merge rows older than the detail window into one row per category, kind and bucket
+    def rollup(self, day: int):
+        self._last_rollup_day = day
+        # Cut at a bucket boundary so no bucket is split across two roll-ups
+        cutoff = (day - self.detail_days) // self.rollup_days * self.rollup_days
+        # Rows to merge: everything between the last roll-up and the cutoff
+        end = bisect_right(self.days, cutoff - 1, lo=self._rolled_rows)
+        if end <= self._rolled_rows:
+            return
+        merged: Dict[tuple, list] = {}
+        for index in range(self._rolled_rows, end):
+            key = (self.days[index] // self.rollup_days, self.codes[index], self.kinds[index])
+            row = merged.get(key)
+            if row is None:
+                merged[key] = [self.days[index], self.amounts[index]]
+            else:
+                row[0] = self.days[index]
+                row[1] += self.amounts[index]
+        # Rebuild the columns: rolled rows in day order, then the untouched rows
+        rows = sorted((last_day, code, amount, kind) for (_bucket, code, kind), (last_day, amount) in merged.items())
+        self.days[self._rolled_rows:end] = array("q", [row[0] for row in rows])
+        self.codes[self._rolled_rows:end] = array("H", [row[1] for row in rows])
+        self.amounts[self._rolled_rows:end] = array("d", [row[2] for row in rows])
+        self.kinds[self._rolled_rows:end] = array("B", [row[3] for row in rows])
+        self._rolled_rows += len(rows)
+        # Keep only the last running total per bucket in the prefix arrays too,
+        # starting after the entries earlier roll-ups already merged
+        for key, days in self._prefix_days.items():
+            totals = self._prefix_totals[key]
+            rolled = self._rolled_prefix.get(key, 0)
+            old_end = bisect_right(days, cutoff - 1, lo=rolled)
+            keep_days, keep_totals = array("q"), array("d")
+            for index in range(rolled, old_end):
+                if keep_days and keep_days[-1] // self.rollup_days == days[index] // self.rollup_days:
+                    keep_days[-1] = days[index]
+                    keep_totals[-1] = totals[index]
+                else:
+                    keep_days.append(days[index])
+                    keep_totals.append(totals[index])
+            days[rolled:old_end] = keep_days
+            totals[rolled:old_end] = keep_totals
+            self._rolled_prefix[key] = rolled + len(keep_days)
+        if self.archive_days is not None:
+            self._archive((day - self.archive_days) // self.rollup_days * self.rollup_days)
+
+    # Method to merge everything before `cutoff` into one row and one prefix entry per category and kind
+    def _archive(self, cutoff: int):
+        # Old rows are the earlier archive rows plus the buckets that aged past the cutoff
+        end = bisect_right(self.days, cutoff - 1, 0, self._rolled_rows)
+        merged: Dict[tuple, list] = {}
+        for index in range(end):
+            key = (self.codes[index], self.kinds[index])
+            row = merged.get(key)
+            if row is None:
+                merged[key] = [self.days[index], self.amounts[index]]
+            else:
+                row[0] = self.days[index]
+                row[1] += self.amounts[index]
+        if len(merged) < end:
+            rows = sorted((last_day, code, amount, kind) for (code, kind), (last_day, amount) in merged.items())
+            self.days[:end] = array("q", [row[0] for row in rows])
+            self.codes[:end] = array("H", [row[1] for row in rows])
+            self.amounts[:end] = array("d", [row[2] for row in rows])
+            self.kinds[:end] = array("B", [row[3] for row in rows])
+            self._rolled_rows -= end - len(rows)
+        # The running total at the last archived entry covers everything before it
+        for key, days in self._prefix_days.items():
+            old_end = bisect_right(days, cutoff - 1, 0, self._rolled_prefix.get(key, 0))
+            if old_end > 1:
+                totals = self._prefix_totals[key]
+                days[:old_end] = array("q", [days[old_end - 1]])
+                totals[:old_end] = array("d", [totals[old_end - 1]])
+                self._rolled_prefix[key] -= old_end - 1
+
+    # Number of rows stored
+    def __len__(self) -> int:
+        return len(self.days)
+
+    # Method to list rows as (day, category, amount, kind name), oldest first
+    def rows(self, start_day: Optional[int] = None) -> List[tuple]:
+        start = 0 if start_day is None else bisect_right(self.days, start_day - 1)
+        return [
+            (self.days[i], self.categories[self.codes[i]], self.amounts[i], KIND_NAMES[self.kinds[i]])
+            for i in range(start, len(self.days))
+        ]
+
+    # Method to export the ledger as plain data (for saves)
+    def to_dict(self) -> dict:
+        return {
+            "detail_days": self.detail_days,
+            "rollup_days": self.rollup_days,
+            "categories": list(self.categories),
+            "days": self.days.tolist(),
+            "codes": self.codes.tolist(),
+            "amounts": self.amounts.tolist(),
+            "kinds": self.kinds.tolist(),
+            "prefix": [[code, kind, self._prefix_days[(code, kind)].tolist(), self._prefix_totals[(code, kind)].tolist()]
+                       for code, kind in self._prefix_days],
+            "archive_days": self.archive_days,
+            "rolled_rows": self._rolled_rows,
+            "rolled_prefix": [[code, kind, rolled] for (code, kind), rolled in self._rolled_prefix.items()],
+            "last_rollup_day": self._last_rollup_day,
+        }
+
+    # Build a ledger from exported data (the inverse of to_dict)
+    @classmethod
+    def from_dict(cls, data: dict) -> "TransactionLedger":
+        # Ledgers saved before the archive tier existed keep every bucket
+        ledger = cls(data["detail_days"], data["rollup_days"], data.get("archive_days"))
+        for category in data["categories"]:
+            ledger.code(category)
+        ledger.days = array("q", data["days"])
+        ledger.codes = array("H", data["codes"])
+        ledger.amounts = array("d", data["amounts"])
+        ledger.kinds = array("B", data["kinds"])
+        for code, kind, days, totals in data["prefix"]:
+            ledger._prefix_days[(code, kind)] = array("q", days)
+            ledger._prefix_totals[(code, kind)] = array("d", totals)
+        ledger._rolled_rows = data["rolled_rows"]
+        ledger._rolled_prefix = {(code, kind): rolled for code, kind, rolled in data.get("rolled_prefix", [])}
+        ledger._last_rollup_day = data["last_rollup_day"]
+        return ledger
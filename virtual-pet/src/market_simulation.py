@@ -0,0 +1,77 @@
+# Market_simulation.py
+# Import NumPy for array math and the Generator random number streams
+import numpy as np
+# Import type hints for the optional inputs and return values
+from typing import Mapping, Optional, Union
+
+# Import the live market model, its starting prices and its vectorized daily move
+from stock_market import STARTING_PRICES, StockMarket, move_prices
+
+
+# Alias kept for callers of the old name: the daily move for arrays of any shape
+# now lives in stock_market.move_prices, shared with StockMarket.tick
+step_prices = move_prices
+
+
+# Function to run many independent market paths at once
+def simulate_paths(
+    paths: int,
+    days: int,
+    seed: Optional[int] = None,
+    prices: Optional[Mapping[str, float]] = None,
+    momentum: Optional[Union[Mapping[str, float], np.ndarray]] = None,
+    return_momentum: bool = False,
+    dtype=np.float64,
+):
+    """
+    Monte Carlo version of StockMarket.tick over P paths x S symbols x D days.
+
+    Returns a price tensor shaped (paths, symbols, days + 1); column 0 holds the
+    starting prices, like the (0, price) entry in StockMarket.history. Symbols
+    follow the order of `prices` (STARTING_PRICES by default). With
+    return_momentum=True a momentum tensor of the same shape is returned too.
+    """
+    # Validate the tensor dimensions
+    if paths <= 0 or days < 0:
+        raise ValueError("paths must be positive and days must not be negative")
+    # One Generator drives the whole batch
+    rng = np.random.default_rng(seed)
+    # Use the market's starting prices when none are given
+    prices = dict(STARTING_PRICES if prices is None else prices)
+    symbols = list(prices)
+
+    # Every path starts from the same prices
+    current = np.tile(np.array([prices[symbol] for symbol in symbols], dtype=np.float64), (paths, 1))
+    # Draw starting momentum per path like StockMarket.__init__, unless it is given
+    if momentum is None:
+        current_momentum = rng.uniform(-0.02, 0.03, (paths, len(symbols)))
+    elif isinstance(momentum, np.ndarray):
+        current_momentum = np.broadcast_to(momentum.astype(np.float64), (paths, len(symbols))).copy()
+    else:
+        current_momentum = np.tile(np.array([momentum[symbol] for symbol in symbols], dtype=np.float64), (paths, 1))
+
+    # Preallocate the output tensors
+    price_tensor = np.empty((paths, len(symbols), days + 1), dtype=dtype)
+    price_tensor[:, :, 0] = current
+    momentum_tensor = None
+    if return_momentum:
+        momentum_tensor = np.empty((paths, len(symbols), days + 1), dtype=dtype)
+        momentum_tensor[:, :, 0] = current_momentum
+
+    # Step all paths and symbols one day at a time
+    for day in range(1, days + 1):
+        current, current_momentum = move_prices(current, current_momentum, rng)
+        price_tensor[:, :, day] = current
+        if momentum_tensor is not None:
+            momentum_tensor[:, :, day] = current_momentum
+
+    # Return prices, plus momentum when requested
+    if return_momentum:
+        return price_tensor, momentum_tensor
+    return price_tensor
+
+
+# Function to run paths that start from a live market's current prices and momentum
+def simulate_from_market(market: StockMarket, paths: int, days: int, seed: Optional[int] = None, **kwargs):
+    # Reuse the market's prices and momentum as the starting point of every path
+    return simulate_paths(paths, days, seed=seed, prices=market.prices, momentum=market.momentum, **kwargs)
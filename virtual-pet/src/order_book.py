@@ -0,0 +1,177 @@
+# Order_book.py
+# Resting limit, stop-loss and take-profit orders for StockMarket.
+# Import heapq for the per-symbol priority queues
+import heapq
+# Import dataclass to describe one order
+from dataclasses import dataclass
+# Import type hints for the public methods
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+# Only import StockMarket for type hints (it imports this module)
+if TYPE_CHECKING:
+    from stock_market import StockMarket
+
+# Order kinds: which way the price must move to trigger, and which side fills
+ORDER_KINDS: Dict[str, tuple] = {
+    # Buy once the price falls to the limit or below
+    "limit_buy": ("down", "buy"),
+    # Sell once the price rises to the limit or above
+    "limit_sell": ("up", "sell"),
+    # Sell to cut losses once the price falls to the stop or below
+    "stop_loss": ("down", "sell"),
+    # Sell to lock in gains once the price rises to the target or above
+    "take_profit": ("up", "sell"),
+}
+
+
+# Define one resting order
+@dataclass
+class Order:
+    # Number used to cancel the order (increases by one per order)
+    order_id: int
+    # Symbol, kind (see ORDER_KINDS), share count and trigger price
+    symbol: str
+    kind: str
+    shares: int
+    trigger: float
+    # Market day the order was placed
+    day_placed: int
+    # "open", "filled", "rejected" or "cancelled"
+    status: str = "open"
+    # Shares, price and day of the fill, once filled
+    filled_shares: int = 0
+    fill_price: Optional[float] = None
+    fill_day: Optional[int] = None
+    # Trade message (or the reason a fill was rejected)
+    message: str = ""
+
+    # Whether the order is still resting in the book
+    @property
+    def is_open(self) -> bool:
+        return self.status == "open"
+
+
+# Define the order book: two heaps per symbol keyed by trigger price
+class OrderBook:
+    """
+    Per-symbol priority queues of resting orders. Orders that trigger on a
+    rise sit in a min-heap by trigger price, orders that trigger on a fall in
+    a max-heap, so each tick only looks at the top of each heap and pops the
+    orders that triggered. Placing an order is O(log n); cancelled orders are
+    dropped lazily when they reach the top.
+    Fills go through StockMarket.buy/sell at the current price, so they spend
+    and earn through the Economy and update the cost basis and realized
+    profit exactly like manual trades.
+    """
+
+    # Constructor that links the book to its market
+    def __init__(self, market: "StockMarket"):
+        self.market = market
+        # Open orders by id, and the id the next order gets
+        self.orders: Dict[int, Order] = {}
+        self.next_id = 1
+        # Heaps per symbol: rising triggers as (trigger, id), falling as (-trigger, id)
+        self._up: Dict[str, list] = {}
+        self._down: Dict[str, list] = {}
+
+    # Method to add a resting order; returns the new order
+    def place(self, symbol: str, kind: str, shares: int, trigger: float) -> Order:
+        symbol = symbol.upper()
+        # Validate the order before it rests
+        if kind not in ORDER_KINDS:
+            raise ValueError(f"Unknown order kind: {kind}")
+        if symbol not in self.market.prices:
+            raise ValueError("Unknown symbol.")
+        if shares <= 0 or trigger <= 0:
+            raise ValueError("Shares and trigger price must be positive.")
+        # Store the order and push it onto the heap for its direction
+        order = Order(self.next_id, symbol, kind, int(shares), float(trigger), self.market.day)
+        self.next_id += 1
+        self.orders[order.order_id] = order
+        self._push(order)
+        return order
+
+    # Method to cancel an open order; returns False if it is not open
+    def cancel(self, order_id: int) -> bool:
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return False
+        # The heap entry is skipped when it reaches the top
+        order.status = "cancelled"
+        return True
+
+    # Method to cancel every open order for a symbol (used when it is delisted)
+    def cancel_symbol(self, symbol: str):
+        for order in [order for order in self.orders.values() if order.symbol == symbol]:
+            self.cancel(order.order_id)
+        self._up.pop(symbol, None)
+        self._down.pop(symbol, None)
+
+    # Method to fill every order triggered by the current prices; returns the orders it closed
+    def match(self) -> List[Order]:
+        closed = []
+        market = self.market
+        # Only symbols with resting orders are visited, and only their triggered orders are popped
+        for direction, heaps in (("down", self._down), ("up", self._up)):
+            for symbol in [symbol for symbol, heap in heaps.items() if heap]:
+                heap = heaps[symbol]
+                price = market.prices[symbol]
+                while heap:
+                    key, order_id = heap[0]
+                    trigger = -key if direction == "down" else key
+                    # Skip cancelled orders; stop at the first order that has not triggered
+                    if order_id not in self.orders:
+                        heapq.heappop(heap)
+                        continue
+                    if (direction == "down" and price > trigger) or (direction == "up" and price < trigger):
+                        break
+                    heapq.heappop(heap)
+                    closed.append(self._fill(self.orders.pop(order_id), price))
+        return closed
+
+    # Method to fill one triggered order through the market at the current price
+    def _fill(self, order: Order, price: float) -> Order:
+        # Sell orders protect a position, so they sell what is still held (up to the order size)
+        if ORDER_KINDS[order.kind][1] == "buy":
+            shares = order.shares
+            success, message = self.market.buy(order.symbol, shares)
+        else:
+            shares = min(order.shares, self.market.holdings.get(order.symbol, 0)) or order.shares
+            success, message = self.market.sell(order.symbol, shares)
+        order.status = "filled" if success else "rejected"
+        order.message = message
+        if success:
+            order.filled_shares = shares
+            order.fill_price = price
+            order.fill_day = self.market.day
+        return order
+
+    # Method to push an order onto the heap for its trigger direction
+    def _push(self, order: Order):
+        direction = ORDER_KINDS[order.kind][0]
+        if direction == "down":
+            heapq.heappush(self._down.setdefault(order.symbol, []), (-order.trigger, order.order_id))
+        else:
+            heapq.heappush(self._up.setdefault(order.symbol, []), (order.trigger, order.order_id))
+
+    # Method to list open orders, oldest first
+    def open_orders(self, symbol: Optional[str] = None) -> List[Order]:
+        return [order for order in self.orders.values() if symbol is None or order.symbol == symbol.upper()]
+
+    # Method to export open orders as plain data (for saves)
+    def to_list(self) -> List[dict]:
+        return [
+            {"order_id": o.order_id, "symbol": o.symbol, "kind": o.kind, "shares": o.shares, "trigger": o.trigger, "day_placed": o.day_placed}
+            for o in self.orders.values()
+        ]
+
+    # Method to restore open orders exported by to_list
+    def load_list(self, orders: List[dict], next_id: int):
+        self.orders.clear()
+        self._up.clear()
+        self._down.clear()
+        for data in orders:
+            order = Order(**data)
+            self.orders[order.order_id] = order
+            self._push(order)
+        self.next_id = next_id
@@ -1,11 +1,14 @@
 # Pet.py
 # Import dataclass decorator to create lightweight data container classes
 from dataclasses import dataclass
+# Import bisect to find which band between thresholds a stat is in
+from bisect import bisect_right
 # Import type hints for optional and union types
-from typing import Union
+from typing import Callable, Dict, List, NamedTuple, Optional, Union
 
 # Define a dataclass that holds the base stats for a pet species
-@dataclass
+# (frozen so one profile can be shared by every pet of the species)
+@dataclass(frozen=True, slots=True)
 class petStats:
     # The type/species name of the pet (e.g., "dog", "cat")
     type: str
@@ -20,25 +23,53 @@ class petStats:
     # The maximum cleanliness level for this pet species (default 100)
     cleanliness: int = 100
 
+# Shared profile objects, one per distinct set of stats
+_INTERNED_PROFILES: Dict[petStats, petStats] = {}
+
+# Function to return the shared profile equal to `profile` (species names get default caps)
+def intern_profile(profile: Union[petStats, str]) -> petStats:
+    if not isinstance(profile, petStats):
+        profile = petStats(profile.lower())
+    return _INTERNED_PROFILES.setdefault(profile, profile)
+
+# Stat values where the emotional state, the health penalty or a loss condition
+# changes, in ascending order. A stat is below a threshold when value < threshold
+# (so "hunger <= 5" is the threshold 6 and "happiness > 70" is 71)
+STAT_THRESHOLDS: Dict[str, tuple] = {
+    "hunger": (6, 20, 30),
+    "happiness": (1, 30, 71),
+    "health": (1, 30),
+    "energy": (6, 30),
+    "cleanliness": (1, 20, 30),
+}
+
+# Define one change reported to a pet's subscribers
+class PetEvent(NamedTuple):
+    # "state" (emotional state changed), "threshold" (a stat crossed a value in
+    # STAT_THRESHOLDS) or "loss" (a loss condition fired; new is the reason)
+    kind: str
+    old: object
+    new: object
+    # Threshold events: the stat and the threshold value it crossed
+    stat: str = ""
+    threshold: Optional[int] = None
+
+# Subscriber called with every PetEvent
+PetListener = Callable[[PetEvent], None]
+
 # Define the Pet class to represent an individual virtual pet instance
 class Pet:
+    # Fixed attribute layout: no per-pet __dict__
+    __slots__ = ("name", "pet_profile", "hunger", "happiness", "health", "energy", "cleanliness",
+                 "age_days", "sad_streak", "last_death_reason", "_listeners", "_state", "_seen")
+
     # Constructor that initializes a pet with name, type, age, and optional UI flag
     def __init__(self, name: str, pet_type: Union[petStats, str], age_days: int = 0):
         # Store the pet's name
         self.name = name
 
-        # Check if pet_type is already a petStats object or if it's a string species name
-        if isinstance(pet_type, petStats):
-            # Use the provided petStats profile directly
-            self.pet_profile = pet_type
-        else:
-            # Create a new petStats with default values using the string as the species type
-            self.pet_profile = petStats(pet_type.lower())
-
-        # Keep compatibility with code that expects pet_type to expose stat caps
-        self.pet_type = self.pet_profile
-        # Store the species/type name for easy access
-        self.species = self.pet_profile.type
+        # Share one profile per species (a string species name gets default values)
+        self.pet_profile = intern_profile(pet_type)
 
         # Initialize hunger stat to the maximum value from the pet profile
         self.hunger = 1 * self.pet_profile.hunger
@@ -56,7 +87,67 @@ class Pet:
         self.sad_streak = 0
         # Store the reason for the pet's death/loss condition
         self.last_death_reason = ""
+        # Event subscribers, and the state and stats they were last told about
+        self._init_events()
+
+    # Method to start with no subscribers (PetRow views call this instead of __init__)
+    def _init_events(self):
+        self._listeners: Optional[List[PetListener]] = None
+        self._state = ""
+        self._seen = ()
+
+    # Method to register a function called with a PetEvent whenever a boundary is crossed
+    def subscribe(self, listener: PetListener) -> PetListener:
+        if self._listeners is None:
+            self._listeners = []
+            # Later events compare against the state right now
+            self._state = self.get_emotional_state()
+            self._seen = tuple(getattr(self, stat) for stat in STAT_THRESHOLDS)
+        self._listeners.append(listener)
+        return listener
+
+    # Method to unregister a subscriber added with subscribe
+    def unsubscribe(self, listener: PetListener):
+        if self._listeners and listener in self._listeners:
+            self._listeners.remove(listener)
+        if not self._listeners:
+            self._listeners = None
+
+    # Method to tell subscribers about any state change or threshold crossing since the last call
+    def _publish(self, state: str):
+        # A stat that moved into another band between thresholds crossed at least one
+        values = tuple(getattr(self, stat) for stat in STAT_THRESHOLDS)
+        if values != self._seen:
+            for (stat, thresholds), old, new in zip(STAT_THRESHOLDS.items(), self._seen, values):
+                old_band, new_band = bisect_right(thresholds, old), bisect_right(thresholds, new)
+                if old_band == new_band:
+                    continue
+                # Report every threshold between the two bands, in the order the stat crossed them
+                crossed = thresholds[old_band:new_band] if new_band > old_band else reversed(thresholds[new_band:old_band])
+                for threshold in crossed:
+                    self._emit(PetEvent("threshold", old, new, stat, threshold))
+            self._seen = values
+        if state != self._state:
+            old, self._state = self._state, state
+            self._emit(PetEvent("state", old, state))
+        # Actions can trigger a loss too (a bath can make the sad streak too long)
+        self.detectLoss()
+
+    # Method to pass one event to every subscriber
+    def _emit(self, event: PetEvent):
+        for listener in list(self._listeners or ()):
+            listener(event)
         
+    # Keep compatibility with code that expects pet_type to expose stat caps
+    @property
+    def pet_type(self) -> petStats:
+        return self.pet_profile
+
+    # The species/type name for easy access
+    @property
+    def species(self) -> str:
+        return self.pet_profile.type
+
     # Method to ensure all stats stay within valid bounds (0 to max)
     def clamp_stats(self):
         # Get the max stat values from the pet's profile
@@ -75,7 +166,10 @@ class Pet:
         self.age_days = max(0, self.age_days)
         
     # Method to advance time by a specified number of days, degrading stats
-    def pass_time(self, days=1):
+    def pass_time(self, days=1, fast_forward=False):
+        # Jump straight to the final state when asked (same result as the loop below)
+        if fast_forward and self._fast_forward(days):
+            return
         # Loop through each day to advance
         for _ in range(days):
             # Increment the pet's age by 1 day
@@ -100,7 +194,106 @@ class Pet:
             # Check if the pet has reached a loss condition; break if true
             if self.detectLoss():
                 break
-                
+
+    # Method to jump straight to the state pass_time(days) would reach, without the daily loop
+    def _fast_forward(self, days) -> bool:
+        """
+        Closed-form version of the pass_time loop. Every stat falls by a fixed
+        amount per day, so the day each threshold is crossed can be computed
+        directly. Returns False (and changes nothing) if a stat is not an int,
+        so the caller can fall back to the per-day loop.
+        """
+        # Get the max stat values from the pet's profile
+        caps = self.pet_profile
+        # The closed form relies on exact integer arithmetic
+        values = (self.hunger, self.happiness, self.health, self.energy, self.cleanliness, self.age_days, self.sad_streak,
+                  caps.hunger, caps.happiness, caps.health, caps.energy, caps.cleanliness, days)
+        if not all(isinstance(value, int) for value in values):
+            return False
+        # The loop does nothing for zero or negative days
+        if days <= 0:
+            return True
+
+        # Value of each decaying stat after day 1 (it then drops by 2 per day, floored at 0)
+        hunger_start = max(0, min(caps.hunger, self.hunger - 2))
+        happiness_start = max(0, min(caps.happiness, self.happiness - 2))
+        energy_start = max(0, min(caps.energy, self.energy - 2))
+        cleanliness_start = max(0, min(caps.cleanliness, self.cleanliness - 2))
+
+        # Day the health penalty starts: the unclamped value drops below 20 on that day
+        def penalty_day(value, start):
+            # Day 1 compares the raw value minus 2
+            if value - 2 < 20:
+                return 1
+            # Later days compare the previous day's clamped value minus 2
+            return _first_day_at_or_below(start, 2, 21) + 1
+        health_penalty_day = min(penalty_day(self.hunger, hunger_start), penalty_day(self.cleanliness, cleanliness_start))
+
+        # Health is only clamped before the penalty starts, then drops by 5 per day
+        health_clamped = max(0, min(caps.health, self.health))
+        if health_penalty_day == 1:
+            health_start = max(0, min(caps.health, self.health - 5))
+        else:
+            health_start = max(0, health_clamped - 5)
+
+        # First day health is at or below a threshold
+        def health_day(threshold):
+            if health_penalty_day > 1 and health_clamped <= threshold:
+                return 1
+            return health_penalty_day - 1 + _first_day_at_or_below(health_start, 5, threshold)
+
+        # Health on a given day (1-based)
+        def health_on(day):
+            if day < health_penalty_day:
+                return health_clamped
+            return max(0, health_start - 5 * (day - health_penalty_day))
+
+        # The pet is "sad" from the day happiness drops below 30 until any stat checked before it does
+        sad_from = _first_day_at_or_below(happiness_start, 2, 29)
+        sad_until = min(
+            health_day(29),
+            _first_day_at_or_below(hunger_start, 2, 29),
+            _first_day_at_or_below(energy_start, 2, 29),
+            _first_day_at_or_below(cleanliness_start, 2, 29),
+        )
+        # Day the sad streak reaches 3 (a streak already running continues on day 1)
+        sad_loss_day = days + 1
+        if sad_from < sad_until:
+            streak_day = max(1, 3 - self.sad_streak) if sad_from == 1 else sad_from + 2
+            if streak_day < sad_until:
+                sad_loss_day = streak_day
+
+        # The loop stops on the first day any detectLoss condition holds
+        loss_day = min(
+            health_day(0),
+            _first_day_at_or_below(hunger_start, 2, 5),
+            _first_day_at_or_below(energy_start, 2, 5),
+            _first_day_at_or_below(happiness_start, 2, 0),
+            _first_day_at_or_below(cleanliness_start, 2, 0),
+            sad_loss_day,
+        )
+        final_day = min(days, loss_day)
+
+        # Jump every stat to its value on the final day
+        self.hunger = max(0, hunger_start - 2 * (final_day - 1))
+        self.happiness = max(0, happiness_start - 2 * (final_day - 1))
+        self.energy = max(0, energy_start - 2 * (final_day - 1))
+        self.cleanliness = max(0, cleanliness_start - 2 * (final_day - 1))
+        self.health = health_on(final_day)
+        # Age goes up by one per day and is clamped at 0 every day
+        self.age_days = max(final_day - 1, self.age_days + final_day)
+        # Sad streak counts the sad days that run up to the final day
+        if sad_from <= final_day < sad_until:
+            self.sad_streak = self.sad_streak + final_day if sad_from == 1 else final_day - sad_from + 1
+        else:
+            self.sad_streak = 0
+        # Record the loss reason for the final day, exactly as the loop does
+        self.detectLoss()
+        # Subscribers hear about the jump as a whole
+        if self._listeners:
+            self._publish(self.get_emotional_state())
+        return True
+
     # Method to determine the pet's current emotional state based on stats
     def get_emotional_state(self):
         # If health is critically low, the pet is sick
@@ -184,6 +377,9 @@ class Pet:
         # Otherwise, reset the sad streak to 0
         else:
             self.sad_streak = 0
+        # Tell subscribers what changed (nothing to do without any)
+        if self._listeners:
+            self._publish(state)
 
     # Method to detect if the pet has reached a loss condition
     def detectLoss(self) -> bool:
@@ -211,6 +407,10 @@ class Pet:
         elif self.sad_streak >= 3:
             reason = "Stayed sad for too long."
 
+        # Tell subscribers when a (new) loss condition fires
+        if reason and reason != self.last_death_reason and self._listeners:
+            old, self.last_death_reason = self.last_death_reason, reason
+            self._emit(PetEvent("loss", old, reason))
         # Store the death reason in the instance variable
         self.last_death_reason = reason
 
@@ -220,3 +420,11 @@ class Pet:
 
         # Return True to indicate a loss condition was detected
         return True
+
+# Helper to find the first day a stat that drops by `step` per day is at or below `threshold`
+def _first_day_at_or_below(start: int, step: int, threshold: int) -> int:
+    # `start` is the value on day 1; the stat is floored at 0, which never matters for threshold >= 0
+    if start <= threshold:
+        return 1
+    # Ceiling division gives how many more days the drop takes
+    return -(-(start - threshold) // step) + 1
@@ -0,0 +1,245 @@
+# Pet_population.py
+# Import NumPy to keep every pet's stats in flat arrays that update together
+import numpy as np
+# Import type hints for sequences of pets and profiles
+from typing import List, Optional, Sequence, Union
+
+# Import the single-pet model and its stat profile dataclass
+from pet import Pet, intern_profile, petStats
+
+# Names of the stats that decay over time, in the same order as petStats
+STAT_NAMES = ("hunger", "happiness", "health", "energy", "cleanliness")
+
+# Loss reasons in the same priority order that Pet.detectLoss checks them
+# (index 0 means "no loss condition")
+LOSS_REASONS = (
+    "",
+    "Health collapsed.",
+    "Hunger fell too low.",
+    "Energy fell too low.",
+    "Happiness hit zero.",
+    "Cleanliness hit zero.",
+    "Stayed sad for too long.",
+)
+
+
+# Define a batch engine that advances many pets at once
+class PetPopulation:
+    """
+    Struct-of-arrays store for many pets.
+    pass_time gives the same result, pet for pet, as calling Pet.pass_time
+    on each pet, but every day is one set of array operations for all pets.
+    """
+
+    # Constructor that builds empty arrays for N pets from their stat profiles
+    def __init__(self, profiles: Sequence[Union[petStats, str]], names: Optional[Sequence[str]] = None):
+        # Turn species strings into default petStats profiles like Pet does (shared per species)
+        self.profiles: List[petStats] = [intern_profile(profile) for profile in profiles]
+        # Store a name per pet (defaults to an empty name)
+        self.names = list(names) if names is not None else [""] * len(self.profiles)
+        # Make sure there is exactly one name per profile
+        if len(self.names) != len(self.profiles):
+            raise ValueError("names and profiles must have the same length")
+
+        # Build a (N, 5) array of per-pet stat caps from the profiles
+        self.caps = np.array(
+            [[getattr(profile, stat) for stat in STAT_NAMES] for profile in self.profiles],
+            dtype=np.int64,
+        ).reshape(len(self.profiles), len(STAT_NAMES))
+        # Every pet starts with its stats at the profile maximum, like Pet.__init__
+        self.stats = self.caps.copy()
+        # Track age in days per pet
+        self.age_days = np.zeros(len(self.profiles), dtype=np.int64)
+        # Track consecutive sad updates per pet
+        self.sad_streak = np.zeros(len(self.profiles), dtype=np.int64)
+        # Store the loss reason as an index into LOSS_REASONS
+        self.loss_code = np.zeros(len(self.profiles), dtype=np.int8)
+
+    # Build a population from existing Pet objects, copying their current state
+    @classmethod
+    def from_pets(cls, pets: Sequence[Pet]) -> "PetPopulation":
+        # Create the arrays using each pet's own profile
+        population = cls([pet.pet_profile for pet in pets], [pet.name for pet in pets])
+        # Copy every pet's current stats into the arrays
+        for i, pet in enumerate(pets):
+            population.stats[i] = [getattr(pet, stat) for stat in STAT_NAMES]
+            population.age_days[i] = pet.age_days
+            population.sad_streak[i] = pet.sad_streak
+            population.loss_code[i] = LOSS_REASONS.index(pet.last_death_reason) if pet.last_death_reason in LOSS_REASONS else 0
+        # Return the filled population
+        return population
+
+    # Number of pets in the population
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    # Method to return one stat column as a view into the stats array
+    def stat(self, name: str) -> np.ndarray:
+        # Return the column for the requested stat
+        return self.stats[:, STAT_NAMES.index(name)]
+
+    # Method to compute every pet's emotional state as an array of strings
+    def emotional_states(self) -> np.ndarray:
+        # Unpack stat columns for readability
+        hunger, happiness, health, energy, cleanliness = self.stats.T
+        # Mirror the if-chain in Pet.get_emotional_state (first match wins)
+        return np.select(
+            [health < 30, hunger < 30, energy < 30, cleanliness < 30, happiness < 30, happiness > 70],
+            ["sick", "hungry", "tired", "dirty", "sad", "happy"],
+            default="neutral",
+        )
+
+    # Method to return the loss reason string for each pet
+    def last_death_reasons(self) -> List[str]:
+        return [LOSS_REASONS[code] for code in self.loss_code]
+
+    # Method to advance every pet by a number of days in one call
+    def pass_time(self, days: int = 1) -> np.ndarray:
+        """
+        Advance all pets by `days`. A pet stops on the day its loss
+        condition fires, exactly like the break in Pet.pass_time.
+        Returns a boolean array marking pets that hit a loss condition.
+        """
+        # Pets that are still being advanced during this call
+        active = np.ones(len(self), dtype=bool)
+        # Pets that hit a loss condition during this call
+        lost = np.zeros(len(self), dtype=bool)
+        # Nothing to do for an empty population or a non-positive day count
+        if days <= 0 or len(self) == 0:
+            return lost
+
+        # Decay per day for hunger, happiness, health, energy, cleanliness
+        decay = np.array([2, 2, 0, 2, 2], dtype=np.int64)
+        # Loop over days, not pets; each step updates the whole active set
+        for _ in range(days):
+            # Work only on the rows that are still active
+            rows = np.flatnonzero(active)
+            if rows.size == 0:
+                break
+            stats = self.stats[rows] - decay
+            # Health drops by 5 when hunger or cleanliness is below 20 (before clamping)
+            penalty = (stats[:, 0] < 20) | (stats[:, 4] < 20)
+            stats[penalty, 2] -= 5
+            # Clamp all stats to 0..cap, like Pet.clamp_stats
+            np.clip(stats, 0, self.caps[rows], out=stats)
+            self.stats[rows] = stats
+            # Advance age and keep it non-negative
+            self.age_days[rows] = np.maximum(0, self.age_days[rows] + 1)
+
+            # Update the sad streak: "sad" only when no earlier state in the chain matched
+            hunger, happiness, health, energy, cleanliness = stats.T
+            sad = (health >= 30) & (hunger >= 30) & (energy >= 30) & (cleanliness >= 30) & (happiness < 30)
+            self.sad_streak[rows] = np.where(sad, self.sad_streak[rows] + 1, 0)
+
+            # Evaluate loss conditions in Pet.detectLoss priority order
+            code = np.select(
+                [
+                    health <= 0,
+                    hunger <= 5,
+                    energy <= 5,
+                    happiness <= 0,
+                    cleanliness <= 0,
+                    self.sad_streak[rows] >= 3,
+                ],
+                [1, 2, 3, 4, 5, 6],
+                default=0,
+            )
+            self.loss_code[rows] = code
+            # Pets whose loss fired stop advancing for the rest of this call
+            fired = rows[code > 0]
+            lost[fired] = True
+            active[fired] = False
+        # Return which pets hit a loss condition
+        return lost
+
+    # Method to get a Pet whose attributes read and write row `index` directly
+    def view(self, index: int) -> "PetRow":
+        return PetRow(self, index)
+
+    # Method to copy one row back into a Pet object
+    def to_pet(self, index: int) -> Pet:
+        # Create a pet with the same name and profile
+        pet = Pet(self.names[index], self.profiles[index])
+        # Copy stats, age, sad streak and loss reason
+        self.write_back(index, pet)
+        # Return the rebuilt pet
+        return pet
+
+    # Method to write one row's state into an existing Pet object
+    def write_back(self, index: int, pet: Pet):
+        # Copy each stat as a plain int
+        for column, stat in enumerate(STAT_NAMES):
+            setattr(pet, stat, int(self.stats[index, column]))
+        # Copy age, sad streak and loss reason
+        pet.age_days = int(self.age_days[index])
+        pet.sad_streak = int(self.sad_streak[index])
+        pet.last_death_reason = LOSS_REASONS[self.loss_code[index]]
+
+
+# Helper to build a property that reads and writes one stat column of a population row
+def _stat_column(column: int) -> property:
+    def get(self) -> int:
+        return int(self._population.stats[self._row, column])
+
+    def set(self, value: int):
+        self._population.stats[self._row, column] = value
+    return property(get, set)
+
+
+# Helper to build a property that reads and writes one per-pet array of a population
+def _row_array(name: str) -> property:
+    def get(self) -> int:
+        return int(getattr(self._population, name)[self._row])
+
+    def set(self, value: int):
+        getattr(self._population, name)[self._row] = value
+    return property(get, set)
+
+
+# Define a Pet that is a view onto one row of a PetPopulation
+class PetRow(Pet):
+    """
+    A Pet that stores nothing itself: every stat, the age, the sad streak and
+    the loss reason live in the population's arrays, so a million resident
+    pets cost a few bytes per stat. The full Pet method API (feed, play,
+    sleep, shower, pass_time, get_emotional_state, detectLoss) works on the row.
+    """
+
+    __slots__ = ("_population", "_row")
+
+    # Constructor that points the view at row `index`
+    def __init__(self, population: PetPopulation, index: int):
+        self._population = population
+        self._row = index
+        self._init_events()
+
+    # Name and profile come from the population's lists
+    @property
+    def name(self) -> str:
+        return self._population.names[self._row]
+
+    @name.setter
+    def name(self, value: str):
+        self._population.names[self._row] = value
+
+    @property
+    def pet_profile(self) -> petStats:
+        return self._population.profiles[self._row]
+
+    # Stats, age and sad streak read from and write to the arrays
+    hunger = _stat_column(0)
+    happiness = _stat_column(1)
+    health = _stat_column(2)
+    energy = _stat_column(3)
+    cleanliness = _stat_column(4)
+    age_days = _row_array("age_days")
+    sad_streak = _row_array("sad_streak")
+
+    # The loss reason is kept as its index in LOSS_REASONS
+    @property
+    def last_death_reason(self) -> str:
+        return LOSS_REASONS[self._population.loss_code[self._row]]
+
+    @last_death_reason.setter
+    def last_death_reason(self, value: str):
+        self._population.loss_code[self._row] = LOSS_REASONS.index(value) if value in LOSS_REASONS else 0
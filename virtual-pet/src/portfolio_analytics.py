@@ -0,0 +1,205 @@
+# Portfolio_analytics.py
+# Running portfolio and risk numbers, updated as the market ticks and trades fill.
+# Import deque for the rolling window of daily returns
+from collections import deque
+# Import math for the square root in the volatility
+import math
+# Import type hints for the public methods
+from typing import TYPE_CHECKING, Dict, Optional
+
+# Import NumPy for per-symbol return arrays
+import numpy as np
+
+# Only import StockMarket for type hints (it creates this object)
+if TYPE_CHECKING:
+    from stock_market import StockMarket
+
+
+# Define the analytics kept alongside a StockMarket
+class PortfolioAnalytics:
+    """
+    Incremental portfolio analytics for one market.
+
+    Risk is measured on the investments alone. Each day's return is the change
+    in the holdings' market value from the price move, so buys, sells and care
+    spending are cash flows, not gains or losses (a time-weighted return).
+    `growth` compounds those returns: what 1 invested on day 0 is worth now.
+    on_tick() is O(1) and on_fill() one dot product; per-symbol returns cost
+    one array division when they are read:
+    - portfolio value and realized / unrealized P/L come from the market's
+      running totals
+    - peak growth and maximum drawdown are updated on every tick
+    - volatility is the standard deviation of the last `window` daily
+      returns, kept with a windowed Welford update (no rescan of history)
+    - per-symbol daily returns and returns since listing are array-aligned
+      with StockMarket.symbols
+    """
+
+    # Constructor that starts every statistic from the market's current state
+    def __init__(self, market: "StockMarket", window: int = 30):
+        self.market = market
+        self.window = window
+        # Compounded daily returns, their highest value, and the largest fall from it (fraction of the peak)
+        self.growth = 1.0
+        self.peak_growth = 1.0
+        self.max_drawdown = 0.0
+        # Rolling window of daily returns with its running mean and sum of squares
+        self._returns: deque = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+        # Holdings value after the last price move or trade (what the next move applies to)
+        self._last_value = market._value
+        # Per-symbol prices at listing and on the previous day, aligned with market.symbols
+        # (returns are only divided out when asked for, so a tick just swaps references)
+        self._base_prices = market._prices.copy()
+        self._previous_prices = self._today_prices = market._prices
+        # Number of days recorded
+        self.days = 0
+
+    # Method to update the statistics after the market moved one day (before any orders fill)
+    def on_tick(self):
+        # Keep yesterday's price array; tick() replaces market._prices with a new array each day
+        self._previous_prices = self._today_prices
+        self._today_prices = self.market._prices
+        # Only the price move counts; days with nothing held have no return
+        value = self.market._value
+        if self._last_value > 0:
+            daily = value / self._last_value - 1.0
+            self._add_return(daily)
+            self.growth *= 1.0 + daily
+            self._update_drawdown()
+        self._last_value = value
+        self.days += 1
+
+    # Method to note a trade: money moved in or out, so the next return starts from the new value
+    def on_fill(self):
+        # Recompute instead of reading the running total, which can keep rounding dust after a full sale
+        market = self.market
+        self._last_value = float(market._shares @ market._prices)
+
+    # Method to add a newly listed symbol (aligned with StockMarket.list_symbol)
+    def on_list(self, price: float):
+        self._base_prices = np.append(self._base_prices, price)
+        self._previous_prices = np.append(self._previous_prices, price)
+        self._today_prices = self.market._prices
+
+    # Method to drop a delisted symbol at `index`
+    def on_delist(self, index: int):
+        self._base_prices = np.delete(self._base_prices, index)
+        self._previous_prices = np.delete(self._previous_prices, index)
+        self._today_prices = self.market._prices
+
+    # Method to track the growth peak and the largest drawdown from it
+    def _update_drawdown(self):
+        if self.growth > self.peak_growth:
+            self.peak_growth = self.growth
+        else:
+            self.max_drawdown = max(self.max_drawdown, self.drawdown)
+
+    # Method to push one return into the window (Welford update, removing the oldest when full)
+    def _add_return(self, value: float):
+        self._returns.append(value)
+        if len(self._returns) > self.window:
+            # Replace the oldest value: the count stays the same
+            old = self._returns.popleft()
+            old_mean = self._mean
+            self._mean += (value - old) / len(self._returns)
+            self._m2 += (value - old) * (value - self._mean + old - old_mean)
+        else:
+            delta = value - self._mean
+            self._mean += delta / len(self._returns)
+            self._m2 += delta * (value - self._mean)
+        # Rounding can leave a tiny negative sum of squares
+        self._m2 = max(0.0, self._m2)
+
+    # Current drawdown from the growth peak (fraction of the peak)
+    @property
+    def drawdown(self) -> float:
+        return max(0.0, (self.peak_growth - self.growth) / self.peak_growth)
+
+    # Time-weighted return on the investments since day 0
+    @property
+    def total_return(self) -> float:
+        return self.growth - 1.0
+
+    # Standard deviation of the daily returns in the window
+    @property
+    def volatility(self) -> float:
+        count = len(self._returns)
+        return math.sqrt(self._m2 / (count - 1)) if count > 1 else 0.0
+
+    # Market value of all holdings
+    @property
+    def portfolio_value(self) -> float:
+        return self.market.portfolio_value()
+
+    # Profit or loss on open positions
+    @property
+    def unrealized_profit(self) -> float:
+        return self.market.unrealized_profit()
+
+    # Profit or loss from completed sales
+    @property
+    def realized_profit(self) -> float:
+        return round(self.market.realized_profit, 2)
+
+    # Realized plus unrealized profit
+    @property
+    def total_profit(self) -> float:
+        return self.market.total_profit()
+
+    # Latest daily return per symbol, aligned with market.symbols
+    @property
+    def daily_returns(self) -> np.ndarray:
+        return self._today_prices / self._previous_prices - 1.0
+
+    # Method to get each symbol's latest daily return and return since listing
+    def symbol_returns(self) -> Dict[str, tuple]:
+        totals = self.market._prices / self._base_prices - 1.0
+        return dict(zip(self.market.symbols, zip(self.daily_returns.tolist(), totals.tolist())))
+
+    # Method to collect the headline numbers (for the Economy tab and headless summaries)
+    def summary(self) -> dict:
+        return {
+            "portfolio_value": self.portfolio_value,
+            "realized_profit": self.realized_profit,
+            "unrealized_profit": self.unrealized_profit,
+            "total_profit": self.total_profit,
+            "total_return": self.total_return,
+            "drawdown": self.drawdown,
+            "max_drawdown": self.max_drawdown,
+            "volatility": self.volatility,
+        }
+
+    # Method to export the running state as plain data (for saves)
+    def to_dict(self) -> dict:
+        return {
+            "window": self.window,
+            "growth": self.growth,
+            "peak_growth": self.peak_growth,
+            "max_drawdown": self.max_drawdown,
+            "returns": list(self._returns),
+            "last_value": self._last_value,
+            "base_prices": self._base_prices.tolist(),
+            "days": self.days,
+        }
+
+    # Method to restore state exported by to_dict
+    def load_dict(self, data: Optional[dict]):
+        if not data:
+            return
+        self.window = data["window"]
+        self.growth = data["growth"]
+        self.peak_growth = data["peak_growth"]
+        self.max_drawdown = data["max_drawdown"]
+        self._last_value = data["last_value"]
+        self.days = data["days"]
+        # Rebuild the window statistics from the saved returns
+        self._returns.clear()
+        self._mean = 0.0
+        self._m2 = 0.0
+        for value in data["returns"]:
+            self._add_return(value)
+        if len(data["base_prices"]) == len(self.market.symbols):
+            self._base_prices = np.array(data["base_prices"], dtype=np.float64)
+        self._previous_prices = self._today_prices = self.market._prices
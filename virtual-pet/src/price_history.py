@@ -0,0 +1,397 @@
+# Price_history.py
+# Import bisect_left to find the first point of a symbol listed part-way through
+from bisect import bisect_left
+# Import islice to skip those hidden points while iterating
+from itertools import islice
+# Import array for compact, typed columns (8 bytes per price instead of a tuple per point)
+from array import array
+# Import Mapping so the store can stand in for the old {symbol: [(day, price), ...]} dict
+from collections.abc import Mapping
+# Import dataclass to describe the retention policy
+from dataclasses import dataclass
+# Import type hints for the public methods
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+
+# Define how much price history to keep and how to shrink older data
+@dataclass(frozen=True)
+class RetentionPolicy:
+    # Number of most recent days kept at full resolution (None keeps everything)
+    recent_days: Optional[int] = 365
+    # Older tiers as (factor, capacity): each point averages `factor` points of the
+    # level above, and the tier holds at most `capacity` points
+    tiers: Tuple[Tuple[int, int], ...] = ((7, 260), (4, 130))
+
+
+# Default policy: one year daily, five years weekly, ten years four-weekly
+DEFAULT_RETENTION = RetentionPolicy()
+
+
+# Define one level of the store: a ring buffer with a shared day column and one price column per symbol
+class _Level:
+    # Constructor that preallocates the ring buffer
+    def __init__(self, symbols: List[str], capacity: Optional[int], factor: int = 1):
+        # Maximum number of points (None means grow without limit)
+        self.capacity = capacity
+        # Number of points from the level above that are averaged into one point here
+        self.factor = factor
+        # Preallocate fixed-size columns for bounded levels, empty ones otherwise
+        size = capacity or 0
+        self.days = array("q", [0]) * size
+        self.columns: Dict[str, array] = {symbol: array("d", [0.0]) * size for symbol in symbols}
+        # Index of the oldest point and number of points stored
+        self.start = 0
+        self.size = 0
+        # Running sums for the bucket that is still being filled from the level above
+        self.pending_count = 0
+        self.pending_day = 0
+        self.pending_sums: Dict[str, float] = {symbol: 0.0 for symbol in symbols}
+
+    # Method to add one point; returns the evicted (day, prices) point if the ring was full
+    def push(self, day: int, prices: Dict[str, float]):
+        # Unbounded levels simply grow
+        if self.capacity is None:
+            self.days.append(day)
+            for symbol, column in self.columns.items():
+                column.append(prices[symbol])
+            self.size += 1
+            return None
+        # Bounded levels overwrite the oldest slot once they are full
+        evicted = None
+        if self.size == self.capacity:
+            evicted = (self.days[self.start], {symbol: column[self.start] for symbol, column in self.columns.items()})
+            slot = self.start
+            self.start = (self.start + 1) % self.capacity
+        else:
+            slot = (self.start + self.size) % self.capacity
+            self.size += 1
+        # Write the new point into the slot
+        self.days[slot] = day
+        for symbol, column in self.columns.items():
+            column[slot] = prices[symbol]
+        return evicted
+
+    # Method to fold a point evicted from the level above into the pending bucket
+    def accumulate(self, day: int, prices: Dict[str, float]):
+        # Add the point to the running sums
+        self.pending_count += 1
+        self.pending_day = day
+        for symbol in self.pending_sums:
+            self.pending_sums[symbol] += prices[symbol]
+        # Not enough points for a full bucket yet
+        if self.pending_count < self.factor:
+            return None
+        # Emit the bucket average as one point and start a new bucket
+        average = {symbol: total / self.pending_count for symbol, total in self.pending_sums.items()}
+        self.pending_count = 0
+        for symbol in self.pending_sums:
+            self.pending_sums[symbol] = 0.0
+        return self.push(day, average)
+
+    # Method to list the points of one symbol, oldest first, including the partial bucket
+    def points(self, symbol: str) -> Iterator[Tuple[int, float]]:
+        # Walk the ring buffer in chronological order
+        column = self.columns[symbol]
+        capacity = self.capacity or self.size
+        for offset in range(self.size):
+            slot = (self.start + offset) % capacity
+            yield self.days[slot], column[slot]
+        # The partial bucket is newer than the ring but older than the level above
+        if self.pending_count:
+            yield self.pending_day, self.pending_sums[symbol] / self.pending_count
+
+    # Method to get the point at a position in chronological order
+    def point(self, symbol: str, position: int) -> Tuple[int, float]:
+        # Positions past the ring refer to the partial bucket
+        if position == self.size:
+            return self.pending_day, self.pending_sums[symbol] / self.pending_count
+        capacity = self.capacity or self.size
+        slot = (self.start + position) % capacity
+        return self.days[slot], self.columns[symbol][slot]
+
+    # Method to copy a ring-ordered column into `target`, oldest first (at most two C-speed slices)
+    def copy_ring(self, source: array, target: array):
+        if self.capacity is None or self.start + self.size <= self.capacity:
+            target.extend(source[self.start:self.start + self.size])
+        else:
+            wrap = self.start + self.size - self.capacity
+            target.extend(source[self.start:])
+            target.extend(source[:wrap])
+
+    # Method to copy one symbol's points into day and price arrays, oldest first
+    def extend_columns(self, symbol: str, days: array, prices: array):
+        # Copy the ring buffer without building tuples
+        self.copy_ring(self.days, days)
+        self.copy_ring(self.columns[symbol], prices)
+        # Add the partial bucket last, like points() does
+        if self.pending_count:
+            days.append(self.pending_day)
+            prices.append(self.pending_sums[symbol] / self.pending_count)
+
+    # Method to get the day at a position in chronological order
+    def day_at(self, position: int) -> int:
+        # Positions past the ring refer to the partial bucket
+        if position == self.size:
+            return self.pending_day
+        capacity = self.capacity or self.size
+        return self.days[(self.start + position) % capacity]
+
+    # Method to add a price column, filling existing slots with `fill`
+    def add_column(self, symbol: str, fill: float):
+        self.columns[symbol] = array("d", [fill]) * len(self.days)
+        self.pending_sums[symbol] = fill * self.pending_count
+
+    # Method to drop a price column
+    def remove_column(self, symbol: str):
+        del self.columns[symbol]
+        del self.pending_sums[symbol]
+
+    # Number of points this level shows, including the partial bucket
+    def __len__(self) -> int:
+        return self.size + (1 if self.pending_count else 0)
+
+
+# Define a lightweight read-only view that iterates as (day, price) pairs
+class HistoryView:
+    # Constructor that remembers the store and the symbol
+    def __init__(self, store: "PriceHistory", symbol: str):
+        self._store = store
+        self._symbol = symbol
+
+    # Identity token shared by the store and its copies (see PriceHistory.copy)
+    @property
+    def lineage(self) -> object:
+        return self._store.lineage
+
+    # Iterate over (day, price) pairs from oldest to newest
+    def __iter__(self) -> Iterator[Tuple[int, float]]:
+        # Coarsest (oldest) tier first, full-resolution data last
+        points = (point for level in reversed(self._store._levels) for point in level.points(self._symbol))
+        yield from islice(points, self._hidden(), None)
+
+    # Number of points across all tiers
+    def __len__(self) -> int:
+        return sum(len(level) for level in self._store._levels) - self._hidden()
+
+    # Number of leading points from before the symbol was listed (they hold filler prices)
+    def _hidden(self) -> int:
+        first_day = self._store.first_days.get(self._symbol)
+        if first_day is None:
+            return 0
+        # Days are in order across levels, so binary search each level oldest first
+        hidden = 0
+        for level in reversed(self._store._levels):
+            count = bisect_left(range(len(level)), first_day, key=level.day_at)
+            hidden += count
+            if count < len(level):
+                break
+        return hidden
+
+    # Index into the view like a list (supports negative indexes)
+    def __getitem__(self, index: int) -> Tuple[int, float]:
+        # Normalize negative indexes, then skip points from before the listing
+        hidden = self._hidden()
+        length = sum(len(level) for level in self._store._levels) - hidden
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("history index out of range")
+        index += hidden
+        # Find the level that holds the requested point
+        for level in reversed(self._store._levels):
+            if index < len(level):
+                return level.point(self._symbol, index)
+            index -= len(level)
+        raise IndexError("history index out of range")
+
+    # Method to get the whole series as two parallel arrays (days, prices)
+    def columns(self) -> Tuple[array, array]:
+        # Build the columns level by level, oldest tier first
+        days, prices = array("q"), array("d")
+        for level in reversed(self._store._levels):
+            level.extend_columns(self._symbol, days, prices)
+        hidden = self._hidden()
+        if hidden:
+            return days[hidden:], prices[hidden:]
+        return days, prices
+
+    # Truthiness matches a list: empty views are falsy
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    # Show the view like the list it replaces
+    def __repr__(self) -> str:
+        return f"HistoryView({self._symbol!r}, {len(self)} points)"
+
+
+# Define one change made to a PriceHistory, as passed to its listeners
+class HistoryChange(NamedTuple):
+    # Name of the PriceHistory method that made the change, and its arguments
+    # (StockMarket passes a fresh prices dict every day, so nothing changes them later)
+    method: str
+    args: tuple
+
+    # Method to make the same change to another history, such as a copy kept on another thread
+    def apply(self, history: "PriceHistory"):
+        getattr(history, self.method)(*self.args)
+
+
+# Define the columnar price history store used by StockMarket
+class PriceHistory(Mapping):
+    """
+    Columnar, bounded price history.
+    Days live in one shared column and prices in one array('d') column per
+    symbol. The newest `recent_days` points are kept at full resolution in a
+    ring buffer; older points are averaged into coarser tiers. Appending is
+    O(1). Indexing by symbol returns a HistoryView that iterates as
+    (day, price) pairs, so code written for the old dict of lists still works.
+    """
+
+    # Constructor that sets up the full-resolution level and the older tiers
+    def __init__(self, symbols: Iterable[str], retention: RetentionPolicy = DEFAULT_RETENTION):
+        # Keep the symbol order stable for charts and legends
+        self.symbols = list(symbols)
+        # Store the retention policy
+        self.retention = retention
+        # Level 0 is the full-resolution ring; tiers only apply when it is bounded
+        self._levels = [_Level(self.symbols, retention.recent_days)]
+        if retention.recent_days is not None:
+            for factor, capacity in retention.tiers:
+                self._levels.append(_Level(self.symbols, capacity, factor))
+        # Count of appends that moved an old point out of the full-resolution ring;
+        # while it is unchanged, the history has only grown at the end
+        self.compactions = 0
+        # Day each symbol listed after the start was added; earlier points are hidden
+        self.first_days: Dict[str, int] = {}
+        # Token shared with copies made by copy(), so a chart can tell a newer copy
+        # of the same game's history from a different game's
+        self.lineage = object()
+        # Functions called with a HistoryChange after every append, add_symbol and remove_symbol
+        self.listeners: List[Callable[[HistoryChange], None]] = []
+
+    # Method to start tracking a newly listed symbol from `day`
+    def add_symbol(self, symbol: str, day: int, price: float):
+        if symbol in self._levels[0].columns:
+            raise ValueError(f"{symbol} is already in the history")
+        # Older slots get the listing price so tier averages stay finite; views hide them
+        for level in self._levels:
+            level.add_column(symbol, price)
+        self.symbols.append(symbol)
+        self.first_days[symbol] = day
+        self._notify("add_symbol", symbol, day, price)
+
+    # Method to stop tracking a delisted symbol and drop its prices
+    def remove_symbol(self, symbol: str):
+        for level in self._levels:
+            level.remove_column(symbol)
+        self.symbols.remove(symbol)
+        self.first_days.pop(symbol, None)
+        self._notify("remove_symbol", symbol)
+
+    # Method to record one day's prices for every symbol
+    def append(self, day: int, prices: Dict[str, float]):
+        # Push into the full-resolution ring and cascade evictions down the tiers
+        evicted = self._levels[0].push(day, prices)
+        if evicted is not None:
+            self.compactions += 1
+        for level in self._levels[1:]:
+            if evicted is None:
+                break
+            evicted = level.accumulate(*evicted)
+        # Anything evicted from the last tier is dropped
+        self._notify("append", day, prices)
+
+    # Method to register a function called with every HistoryChange
+    def add_listener(self, listener: Callable[[HistoryChange], None]):
+        self.listeners.append(listener)
+
+    # Method to unregister a listener added with add_listener
+    def remove_listener(self, listener: Callable[[HistoryChange], None]):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    # Method to pass one change to the listeners (skipped when there are none)
+    def _notify(self, method: str, *args):
+        if self.listeners:
+            change = HistoryChange(method, args)
+            for listener in self.listeners:
+                listener(change)
+
+    # Method to get the latest recorded (day, price) for a symbol
+    def latest(self, symbol: str) -> Optional[Tuple[int, float]]:
+        # The newest point is always in the full-resolution level
+        level = self._levels[0]
+        if level.size == 0:
+            return None
+        capacity = level.capacity or level.size
+        slot = (level.start + level.size - 1) % capacity
+        return level.days[slot], level.columns[symbol][slot]
+
+    # Method to export every level as plain data with columns in chronological order
+    def export_levels(self) -> List[dict]:
+        # Each level becomes its days, its price columns and its partial bucket
+        levels = []
+        for level in self._levels:
+            # The day column is shared, so copy it once; the partial bucket is saved separately
+            days = array("q")
+            level.copy_ring(level.days, days)
+            columns = {}
+            for symbol in self.symbols:
+                columns[symbol] = array("d")
+                level.copy_ring(level.columns[symbol], columns[symbol])
+            levels.append({
+                "days": days,
+                "columns": columns,
+                "pending_count": level.pending_count,
+                "pending_day": level.pending_day,
+                "pending_sums": dict(level.pending_sums),
+            })
+        return levels
+
+    # Build a store from exported levels (the inverse of export_levels)
+    @classmethod
+    def from_levels(cls, symbols: Iterable[str], retention: RetentionPolicy, levels: List[dict], compactions: int = 0,
+                    first_days: Optional[Dict[str, int]] = None) -> "PriceHistory":
+        # Create an empty store with the same shape
+        store = cls(symbols, retention)
+        if len(levels) != len(store._levels):
+            raise ValueError("saved history does not match the retention policy")
+        # Refill each level from the start of its ring buffer with slice copies
+        for level, saved in zip(store._levels, levels):
+            days = array("q", saved["days"])
+            count = len(days)
+            if level.capacity is not None and count > level.capacity:
+                raise ValueError("saved history level is larger than its capacity")
+            level.days[0:count] = days
+            for symbol in store.symbols:
+                column = array("d", saved["columns"][symbol])
+                if len(column) != count:
+                    raise ValueError(f"saved history column {symbol!r} has the wrong length")
+                level.columns[symbol][0:count] = column
+            level.size = count
+            level.pending_count = saved["pending_count"]
+            level.pending_day = saved["pending_day"]
+            level.pending_sums = {symbol: saved["pending_sums"][symbol] for symbol in store.symbols}
+        store.compactions = compactions
+        store.first_days = dict(first_days or {})
+        return store
+
+    # Method to get an independent copy (for handing the history to another thread)
+    def copy(self) -> "PriceHistory":
+        store = PriceHistory.from_levels(self.symbols, self.retention, self.export_levels(), self.compactions, self.first_days)
+        store.lineage = self.lineage
+        return store
+
+    # Mapping interface: history[symbol] returns a view of that symbol's points
+    def __getitem__(self, symbol: str) -> HistoryView:
+        if symbol not in self._levels[0].columns:
+            raise KeyError(symbol)
+        return HistoryView(self, symbol)
+
+    # Mapping interface: iterate over symbols in their original order
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.symbols)
+
+    # Mapping interface: number of symbols
+    def __len__(self) -> int:
+        return len(self.symbols)
@@ -0,0 +1,285 @@
+# Save_game.py
+# Versioned save/load for the pet, economy and stock market.
+# Saves are JSON by default; binary saves put the price history in
+# struct-packed little-endian columns after a small JSON header.
+# Import array to pack and unpack the history columns
+from array import array
+# Import asdict to turn the petStats profile into plain data
+from dataclasses import asdict
+# Import json for the document and the binary header
+import json
+# Import os for the atomic temp-file-then-rename write
+import os
+# Import struct for the binary container header
+import struct
+# Import sys to check the machine byte order
+import sys
+# Import tempfile to create the temporary file next to the save
+import tempfile
+# Import type hints for the public functions
+from typing import List, NamedTuple, Optional
+
+# Import the three game models
+from economy import Budget, Economy
+# Import the species lookup so version 0 saves get their species' stat caps
+from game_session import profile_for
+from ledger import TransactionLedger
+from pet import Pet, petStats
+from price_history import PriceHistory, RetentionPolicy
+from stock_market import StockMarket
+
+# Current save schema version. Files without a version are the original
+# pet/economy format (0); version 1 adds the market, the pet's full profile,
+# and the economy's calendar, ledger and budgets
+SAVE_VERSION = 1
+# First bytes of a binary save, followed by the version and the header length
+BINARY_MAGIC = b"VPET"
+BINARY_PREFIX = struct.Struct("<4sHI")
+# Pet stats stored in every save
+PET_STATS = ("hunger", "happiness", "health", "energy", "cleanliness")
+
+
+# Define what load_game returns
+class SavedGame(NamedTuple):
+    pet: Pet
+    economy: Economy
+    # None for saves made before the market was saved
+    market: Optional[StockMarket]
+
+
+# Function to turn the pet into plain data
+def pet_to_dict(pet: Pet) -> dict:
+    # Keep the full profile so custom species load with the same stat caps
+    data = {"name": pet.name, "profile": asdict(pet.pet_profile), "age_days": pet.age_days}
+    data.update({stat: getattr(pet, stat) for stat in PET_STATS})
+    data["sad_streak"] = pet.sad_streak
+    data["last_death_reason"] = pet.last_death_reason
+    return data
+
+
+# Function to rebuild a pet from plain data
+def pet_from_dict(data: dict) -> Pet:
+    # Version 0 only stored the species name, so look up that species' caps
+    profile = petStats(**data["profile"]) if "profile" in data else profile_for(data.get("pet_type", "dog"))
+    pet = Pet(data["name"], profile, data.get("age_days", 0))
+    for stat in PET_STATS:
+        if stat in data:
+            setattr(pet, stat, data[stat])
+    pet.sad_streak = data.get("sad_streak", 0)
+    pet.last_death_reason = data.get("last_death_reason", "")
+    return pet
+
+
+# Function to turn the economy into plain data
+def economy_to_dict(economy: Economy) -> dict:
+    return {
+        "balance": economy.balance,
+        "expenses": dict(economy.expenses),
+        "day": economy.day,
+        "ledger": economy.ledger.to_dict(),
+        "budgets": {category: list(budget) for category, budget in economy.budgets.items()},
+    }
+
+
+# Function to rebuild an economy from plain data
+def economy_from_dict(data: dict) -> Economy:
+    # Start from the predefined categories, then restore the saved totals
+    economy = Economy(data["balance"])
+    economy.expenses.update(data.get("expenses", {}))
+    # Version 0 saves have no calendar or ledger, so their history starts empty
+    economy.day = data.get("day", 0)
+    if "ledger" in data:
+        economy.ledger = TransactionLedger.from_dict(data["ledger"])
+    economy.budgets = {category: Budget(*budget) for category, budget in data.get("budgets", {}).items()}
+    return economy
+
+
+# Function to turn the market into plain data; the history levels are returned separately
+def market_to_dict(market: StockMarket):
+    data = {
+        "day": market.day,
+        "prices": dict(market.prices),
+        "momentum": dict(market.momentum),
+        "holdings": dict(market.holdings),
+        "holdings_cost": dict(market.holdings_cost),
+        "realized_profit": market.realized_profit,
+        "orders": market.orders.to_list(),
+        "next_order_id": market.orders.next_id,
+        "analytics": market.analytics.to_dict(),
+        "seed": market.seed,
+        # The market's random state is a JSON-friendly dict (NumPy bit generator state)
+        "rng": market.rng_state(),
+        "history": {
+            "symbols": list(market.history.symbols),
+            "retention": {
+                "recent_days": market.history.retention.recent_days,
+                "tiers": [list(tier) for tier in market.history.retention.tiers],
+            },
+            "compactions": market.history.compactions,
+            "first_days": dict(market.history.first_days),
+        },
+    }
+    return data, market.history.export_levels()
+
+
+# Function to rebuild a market around an economy from plain data and history levels
+def market_from_dict(data: dict, levels: List[dict], economy: Economy) -> StockMarket:
+    # Rebuild the history first so the market can be created with the same retention
+    saved = data["history"]
+    retention = RetentionPolicy(
+        saved["retention"]["recent_days"],
+        tuple(tuple(tier) for tier in saved["retention"]["tiers"]),
+    )
+    # The saved prices list the symbols that were trading, in order
+    market = StockMarket(economy, data["seed"], retention, data["prices"])
+    market.history = PriceHistory.from_levels(saved["symbols"], retention, levels, saved["compactions"], saved["first_days"])
+    # Restore trading state and the day counter
+    market.day = data["day"]
+    market.momentum.update(data["momentum"])
+    market.holdings.update(data["holdings"])
+    market.holdings_cost.update(data["holdings_cost"])
+    market.realized_profit = data["realized_profit"]
+    market.orders.load_list(data["orders"], data["next_order_id"])
+    market.analytics.load_dict(data["analytics"])
+    # Restore the random stream last: creating the market above drew from it
+    market.set_rng_state(data["rng"])
+    return market
+
+
+# Function to make history levels JSON-friendly
+def _levels_to_json(levels: List[dict]) -> List[dict]:
+    return [
+        dict(level, days=level["days"].tolist(), columns={symbol: column.tolist() for symbol, column in level["columns"].items()})
+        for level in levels
+    ]
+
+
+# Function to pack history levels into one little-endian blob; the layout goes in the header
+def _pack_levels(levels: List[dict], symbols: List[str]):
+    # Every column is written back to back, days first, then prices in symbol order
+    blob = bytearray()
+    layout = []
+    for level in levels:
+        for column in [level["days"]] + [level["columns"][symbol] for symbol in symbols]:
+            if sys.byteorder == "big":
+                column = array(column.typecode, column)
+                column.byteswap()
+            blob += column.tobytes()
+        # The header keeps each level's point count and partial bucket
+        layout.append({
+            "count": len(level["days"]),
+            "pending_count": level["pending_count"],
+            "pending_day": level["pending_day"],
+            "pending_sums": level["pending_sums"],
+        })
+    return layout, bytes(blob)
+
+
+# Function to unpack history levels from a blob written by _pack_levels
+def _unpack_levels(layout: List[dict], symbols: List[str], blob: memoryview) -> List[dict]:
+    levels = []
+    offset = 0
+
+    # Read one column of `count` items and move past it
+    def take(typecode: str, count: int) -> array:
+        nonlocal offset
+        column = array(typecode)
+        size = column.itemsize * count
+        if offset + size > len(blob):
+            raise ValueError("binary save is truncated")
+        column.frombytes(blob[offset:offset + size])
+        if sys.byteorder == "big":
+            column.byteswap()
+        offset += size
+        return column
+
+    for saved in layout:
+        count = saved["count"]
+        level = dict(saved)
+        level["days"] = take("q", count)
+        level["columns"] = {symbol: take("d", count) for symbol in symbols}
+        levels.append(level)
+    return levels
+
+
+# Function to write bytes to `path` atomically (temp file in the same folder, then rename)
+def atomic_write(path: str, data: bytes):
+    # The temp file must be on the same filesystem for os.replace to be atomic
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".save-", suffix=".tmp", dir=folder)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        # Leave the old save untouched and clean up the partial file
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+# Function to encode a game as save-file bytes
+def encode_game(pet: Pet, economy: Economy, market: Optional[StockMarket] = None, binary: bool = False) -> bytes:
+    # Build the document shared by both encodings
+    document = {"version": SAVE_VERSION, "pet": pet_to_dict(pet), "economy": economy_to_dict(economy)}
+    levels = None
+    if market is not None:
+        document["market"], levels = market_to_dict(market)
+
+    # JSON saves keep the history inline as lists
+    if not binary:
+        if levels is not None:
+            document["market"]["history"]["levels"] = _levels_to_json(levels)
+        return json.dumps(document, separators=(",", ":")).encode("utf-8")
+
+    # Binary saves store the level layout in the header and the columns after it
+    blob = b""
+    if levels is not None:
+        history = document["market"]["history"]
+        history["levels"], blob = _pack_levels(levels, history["symbols"])
+    header = json.dumps(document, separators=(",", ":")).encode("utf-8")
+    return BINARY_PREFIX.pack(BINARY_MAGIC, SAVE_VERSION, len(header)) + header + blob
+
+
+# Function to decode save-file bytes (JSON or binary, any known version)
+def decode_game(data: bytes) -> SavedGame:
+    # Binary saves start with the magic bytes; everything else is JSON
+    blob = None
+    if data[:len(BINARY_MAGIC)] == BINARY_MAGIC:
+        _magic, version, header_length = BINARY_PREFIX.unpack_from(data)
+        start = BINARY_PREFIX.size
+        document = json.loads(data[start:start + header_length].decode("utf-8"))
+        blob = memoryview(data)[start + header_length:]
+    else:
+        document = json.loads(data.decode("utf-8"))
+        version = document.get("version", 0)
+    if version > SAVE_VERSION:
+        raise ValueError(f"save version {version} is newer than this game supports ({SAVE_VERSION})")
+
+    # Rebuild the models; version 0 saves have no market
+    pet = pet_from_dict(document["pet"])
+    economy = economy_from_dict(document["economy"])
+    market = None
+    if "market" in document:
+        history = document["market"]["history"]
+        if blob is None:
+            levels = history["levels"]
+        else:
+            levels = _unpack_levels(history["levels"], history["symbols"], blob)
+        market = market_from_dict(document["market"], levels, economy)
+    return SavedGame(pet, economy, market)
+
+
+# Function to save a game to `path`
+def save_game(path: str, pet: Pet, economy: Economy, market: Optional[StockMarket] = None, binary: bool = False):
+    atomic_write(path, encode_game(pet, economy, market, binary))
+
+
+# Function to load a game from `path`
+def load_game(path: str) -> SavedGame:
+    with open(path, "rb") as handle:
+        return decode_game(handle.read())
@@ -0,0 +1,270 @@
+# Session_farm.py
+# Multiprocess runner for large balancing studies:
+#     cd virtual-pet/src
+#     python -m session_farm --sessions 100000 --days 365 --seed 1
+# Add --scaling to time the same run with 1, 2, 4, ... workers.
+# Import argparse to read command-line options
+import argparse
+# Import math for the standard deviation
+import math
+# Import multiprocessing to spread sessions across CPU cores
+import multiprocessing
+# Import random to derive the session seeds for each shard
+import random
+# Import struct to pack session summaries into compact binary records
+import struct
+# Import time to measure throughput
+import time
+# Import type hints for the public functions
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Import the spending categories so every record has the same layout
+from economy import EXPENSE_CATEGORIES
+# Import the session core and the scripted player
+from game_session import PET_PROFILES, GameSession, run_session, scripted_player_policy
+# Import the loss reasons so they can travel as one-byte codes
+from pet_population import LOSS_REASONS
+
+# Binary layout of one session summary: days, loss reason code, balance,
+# realized profit, then one total per expense category (little-endian, no padding)
+RECORD = struct.Struct("<IBdd" + "d" * len(EXPENSE_CATEGORIES))
+
+
+# Function to pack one session summary into a binary record
+def pack_summary(summary: dict) -> bytes:
+    # Unknown reasons are stored as code 0 ("no loss")
+    reason = summary["last_death_reason"]
+    code = LOSS_REASONS.index(reason) if reason in LOSS_REASONS else 0
+    expenses = summary["expenses"]
+    return RECORD.pack(
+        summary["days"],
+        code,
+        summary["balance"],
+        summary["realized_profit"],
+        *(expenses.get(category, 0) for category in EXPENSE_CATEGORIES),
+    )
+
+
+# Function to unpack a block of binary records back into summaries
+def unpack_summaries(block: bytes) -> Iterator[dict]:
+    # Each record has a fixed size, so iter_unpack walks the block directly
+    for days, code, balance, realized, *expenses in RECORD.iter_unpack(block):
+        yield {
+            "days": days,
+            "last_death_reason": LOSS_REASONS[code],
+            "balance": balance,
+            "realized_profit": realized,
+            "expenses": dict(zip(EXPENSE_CATEGORIES, expenses)),
+        }
+
+
+# Function to derive the seed for one shard from the run seed
+def shard_seed(seed: int, shard: int) -> int:
+    # A string seed is hashed with SHA-512 by random, so this is stable across runs and platforms
+    return random.Random(f"{seed}/{shard}").getrandbits(64)
+
+
+# Worker: run one shard of sessions and return their packed summaries
+def run_shard(task: Tuple[int, int, int, int, str, int]) -> Tuple[int, bytes]:
+    # Unpack the shard description
+    shard, count, days, seed, species, balance = task
+    # Every session seed (market and player) comes from (seed, shard), so results
+    # do not depend on which process ran the shard
+    seeds = random.Random(shard_seed(seed, shard))
+    # Run the shard's sessions and pack each summary as it finishes
+    records = bytearray()
+    for index in range(count):
+        session_seed = seeds.getrandbits(64)
+        session = GameSession(f"pet-{shard}-{index}", species, balance, session_seed)
+        records += pack_summary(run_session(session, days, scripted_player_policy(session_seed)).summary())
+    # Return the shard number with one compact block of records
+    return shard, bytes(records)
+
+
+# Define running aggregate statistics over many session summaries
+class FarmStats:
+    # Constructor that starts every total at zero
+    def __init__(self):
+        # Number of sessions merged so far
+        self.sessions = 0
+        # Days survived: total, shortest and longest
+        self.total_days = 0
+        self.min_days = None
+        self.max_days = None
+        # Welford running mean and variance of the final balance
+        self.balance_mean = 0.0
+        self._balance_m2 = 0.0
+        # Realized profit total
+        self.total_realized_profit = 0.0
+        # Count of sessions per loss reason ("" means the pet survived)
+        self.outcomes: Dict[str, int] = {}
+        # Total expenses per category
+        self.expenses: Dict[str, float] = {category: 0.0 for category in EXPENSE_CATEGORIES}
+
+    # Method to merge one session summary into the totals
+    def add(self, summary: dict):
+        # Count the session and its days
+        self.sessions += 1
+        days = summary["days"]
+        self.total_days += days
+        self.min_days = days if self.min_days is None else min(self.min_days, days)
+        self.max_days = days if self.max_days is None else max(self.max_days, days)
+        # Welford update for the balance
+        delta = summary["balance"] - self.balance_mean
+        self.balance_mean += delta / self.sessions
+        self._balance_m2 += delta * (summary["balance"] - self.balance_mean)
+        # Add profit, outcome and expenses
+        self.total_realized_profit += summary["realized_profit"]
+        reason = summary["last_death_reason"]
+        self.outcomes[reason] = self.outcomes.get(reason, 0) + 1
+        for category, amount in summary["expenses"].items():
+            self.expenses[category] = self.expenses.get(category, 0.0) + amount
+
+    # Average days survived per session
+    @property
+    def mean_days(self) -> float:
+        return self.total_days / self.sessions if self.sessions else 0.0
+
+    # Standard deviation of the final balance
+    @property
+    def balance_std(self) -> float:
+        return math.sqrt(self._balance_m2 / self.sessions) if self.sessions else 0.0
+
+    # Method to format the aggregate as report lines
+    def report_lines(self) -> List[str]:
+        # Build a short human-readable report
+        lines = [
+            f"Sessions:         {self.sessions}",
+            f"Days survived:    mean {self.mean_days:.1f}, min {self.min_days}, max {self.max_days}",
+            f"Final balance:    mean ${self.balance_mean:,.2f}, std ${self.balance_std:,.2f}",
+            f"Realized profit:  total ${self.total_realized_profit:,.2f}",
+            "Outcomes:",
+        ]
+        for reason, count in sorted(self.outcomes.items(), key=lambda item: -item[1]):
+            lines.append(f"  {reason or 'survived':<26} {count}")
+        lines.append("Expenses:")
+        for category, amount in self.expenses.items():
+            lines.append(f"  {category:<14} ${amount:,.0f}")
+        return lines
+
+
+# Function to run many sessions across worker processes and merge their summaries
+def run_farm(
+    sessions: int,
+    days: int,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    shard_size: int = 256,
+    species: str = "dog",
+    balance: int = 1000,
+) -> FarmStats:
+    """
+    Shard `sessions` into blocks of `shard_size`, run the shards in a process
+    pool and merge the packed summaries as they stream back. Each shard is
+    seeded from (seed, shard index), so results do not depend on the number
+    of workers or the order shards finish in.
+    """
+    # Describe every shard up front
+    tasks = []
+    for shard, start in enumerate(range(0, sessions, shard_size)):
+        tasks.append((shard, min(shard_size, sessions - start), days, seed, species, balance))
+
+    # Merge results as shards finish
+    stats = FarmStats()
+    workers = workers or multiprocessing.cpu_count()
+    if workers <= 1:
+        # Skip process start-up entirely for a single worker
+        results = map(run_shard, tasks)
+        for _shard, block in results:
+            for summary in unpack_summaries(block):
+                stats.add(summary)
+        return stats
+    with multiprocessing.Pool(workers) as pool:
+        for _shard, block in pool.imap_unordered(run_shard, tasks):
+            for summary in unpack_summaries(block):
+                stats.add(summary)
+    return stats
+
+
+# Function to time the same farm run with 1, 2, 4, ... workers, up to max_workers
+def measure_scaling(
+    sessions: int,
+    days: int,
+    seed: int = 0,
+    max_workers: Optional[int] = None,
+    shard_size: int = 256,
+) -> List[Tuple[int, float, FarmStats]]:
+    """
+    Returns (workers, seconds, stats) for each worker count. Speedup is the
+    one-worker time over each time; it only approaches the worker count when
+    the machine has that many free cores and there are several shards per worker.
+    """
+    # Double the worker count each run, always ending on max_workers
+    max_workers = max_workers or multiprocessing.cpu_count()
+    counts = [1]
+    while counts[-1] * 2 < max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    # Time each run, process pool start-up included
+    runs = []
+    for workers in counts:
+        started = time.perf_counter()
+        stats = run_farm(sessions, days, seed, workers, shard_size)
+        runs.append((workers, time.perf_counter() - started, stats))
+    return runs
+
+
+# Function to build the command-line parser
+def build_parser() -> argparse.ArgumentParser:
+    # Describe the farm and its options
+    parser = argparse.ArgumentParser(description="Run many virtual pet sessions across CPU cores.")
+    parser.add_argument("--sessions", type=int, default=10000, help="number of sessions to run")
+    parser.add_argument("--days", type=int, default=365, help="maximum days per session")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--shard-size", type=int, default=256, help="sessions per shard")
+    parser.add_argument("--species", default="dog", choices=sorted(PET_PROFILES), help="pet species")
+    parser.add_argument("--balance", type=int, default=1000, help="starting balance")
+    parser.add_argument("--seed", type=int, default=0, help="run seed")
+    parser.add_argument("--scaling", action="store_true", help="time the run with 1, 2, 4, ... up to --workers processes")
+    return parser
+
+
+# Function to run the farm from the command line
+def main(argv: Optional[List[str]] = None) -> int:
+    # Read the options and run the farm
+    args = build_parser().parse_args(argv)
+    if args.scaling:
+        return print_scaling(args)
+    started = time.perf_counter()
+    stats = run_farm(args.sessions, args.days, args.seed, args.workers, args.shard_size, args.species, args.balance)
+    elapsed = time.perf_counter() - started
+    # Print the aggregate report and throughput
+    for line in stats.report_lines():
+        print(line)
+    print(f"Elapsed:          {elapsed:.2f}s ({stats.sessions / elapsed if elapsed else 0:,.0f} sessions/s)")
+    return 0
+
+
+# Function to print the scaling benchmark as a table
+def print_scaling(args: argparse.Namespace) -> int:
+    runs = measure_scaling(args.sessions, args.days, args.seed, args.workers, args.shard_size)
+    baseline = runs[0][1]
+    print(f"CPUs:             {multiprocessing.cpu_count()}")
+    print("Workers  Seconds  Sessions/s  Speedup  Efficiency")
+    for workers, seconds, stats in runs:
+        speedup = baseline / seconds if seconds else 0.0
+        print(f"{workers:>7}  {seconds:>7.2f}  {stats.sessions / seconds if seconds else 0:>10,.0f}  "
+              f"{speedup:>6.2f}x  {speedup / workers:>9.0%}")
+    # Every worker count must produce the same sessions and outcomes
+    same = all(
+        (stats.total_days, stats.outcomes) == (runs[0][2].total_days, runs[0][2].outcomes)
+        for _workers, _seconds, stats in runs
+    )
+    print(f"Same results:     {'yes' if same else 'NO'}")
+    return 0 if same else 1
+
+
+# Run the CLI when executed with `python -m session_farm`
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,165 @@
+# Sim_clock.py
+# Fixed-timestep clock for the real-time game loop.
+# Ticks are scheduled against monotonic deadlines (start + n * interval), so the
+# time spent simulating and drawing never pushes later ticks back. When the loop
+# falls behind, every missed tick is returned as one batch to run before the next
+# frame is drawn.
+# Import math for rounding the number of due ticks down
+import math
+# Import time for the monotonic clock
+import time
+# Import type hints for the clock function and the stats
+from typing import Callable, Dict, Optional
+
+# Allowed speed multipliers
+MIN_SPEED = 1
+MAX_SPEED = 1000
+# Speeds offered by the GUI
+SPEED_CHOICES = (1, 10, 100, 1000)
+
+
+# Define the simulation clock
+class SimulationClock:
+    """
+    One simulation day lasts `tick_seconds / speed` of real time. due()
+    returns how many days are due now and moves the deadline forward by
+    exactly that many intervals. Batches are capped at `max_batch` days; any
+    extra days are dropped (and counted) so a long stall does not freeze the
+    game while it catches up.
+
+    Latency is how late the first due tick of a batch ran; lag is how many
+    ticks are overdue right now, and the batch sizes show how far the loop
+    had to catch up.
+    """
+
+    # Constructor that sets the tick length, speed and catch-up cap
+    def __init__(self, tick_seconds: float = 5.0, speed: int = 1, max_batch: int = 1000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.tick_seconds = tick_seconds
+        self.max_batch = max_batch
+        self.clock = clock
+        self._speed = self._check_speed(speed)
+        # Deadline of the next tick (None until started)
+        self._deadline: Optional[float] = None
+        self.reset_stats()
+
+    # Method to clear the latency and lag statistics
+    def reset_stats(self):
+        self.frames = 0
+        self.ticks = 0
+        self.dropped_ticks = 0
+        self.max_batch_seen = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self._latency_total = 0.0
+        self.last_work = 0.0
+        self.max_work = 0.0
+        self._work_total = 0.0
+        self._work_frames = 0
+
+    # Validate a speed multiplier
+    @staticmethod
+    def _check_speed(speed: int) -> int:
+        speed = int(speed)
+        if not MIN_SPEED <= speed <= MAX_SPEED:
+            raise ValueError(f"speed must be between x{MIN_SPEED} and x{MAX_SPEED}")
+        return speed
+
+    # Real seconds between two simulation days at the current speed
+    @property
+    def interval(self) -> float:
+        return self.tick_seconds / self._speed
+
+    # Current speed multiplier
+    @property
+    def speed(self) -> int:
+        return self._speed
+
+    # Method to change the speed; the time already waited toward the next tick is kept as a fraction
+    def set_speed(self, speed: int):
+        speed = self._check_speed(speed)
+        if self._deadline is not None:
+            now = self.clock()
+            remaining = max(0.0, self._deadline - now) / self.interval
+            self._speed = speed
+            self._deadline = now + remaining * self.interval
+        else:
+            self._speed = speed
+
+    # Method to start (or restart) the clock: the first tick is one interval from now
+    def start(self):
+        self._deadline = self.clock() + self.interval
+
+    # Method to stop the clock; due() returns 0 until it is started again
+    def stop(self):
+        self._deadline = None
+
+    # Whether the clock is running
+    @property
+    def running(self) -> bool:
+        return self._deadline is not None
+
+    # Method to get how many ticks are due now, advancing the deadline past them
+    def due(self) -> int:
+        if self._deadline is None:
+            return 0
+        now = self.clock()
+        if now < self._deadline:
+            return 0
+        # Every deadline at or before now is due
+        count = math.floor((now - self._deadline) / self.interval) + 1
+        latency = now - self._deadline
+        self._deadline += count * self.interval
+        # Keep at most max_batch; the rest are skipped rather than run late
+        if count > self.max_batch:
+            self.dropped_ticks += count - self.max_batch
+            count = self.max_batch
+        self.frames += 1
+        self.ticks += count
+        self.max_batch_seen = max(self.max_batch_seen, count)
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self._latency_total += latency
+        return count
+
+    # Method to get the seconds until the next deadline (0 if a tick is already due)
+    def time_until_next(self) -> float:
+        if self._deadline is None:
+            return self.interval
+        return max(0.0, self._deadline - self.clock())
+
+    # Method to record how long a frame's simulation work took
+    def record_work(self, seconds: float):
+        self.last_work = seconds
+        self.max_work = max(self.max_work, seconds)
+        self._work_total += seconds
+        self._work_frames += 1
+
+    # Method to collect the tick-latency and lag statistics
+    def stats(self) -> Dict[str, float]:
+        return {
+            "speed": self._speed,
+            "interval": self.interval,
+            "frames": self.frames,
+            "ticks": self.ticks,
+            "ticks_per_frame": self.ticks / self.frames if self.frames else 0.0,
+            "max_batch": self.max_batch_seen,
+            "dropped_ticks": self.dropped_ticks,
+            "last_latency": self.last_latency,
+            "mean_latency": self._latency_total / self.frames if self.frames else 0.0,
+            "max_latency": self.max_latency,
+            "last_work": self.last_work,
+            "mean_work": self._work_total / self._work_frames if self._work_frames else 0.0,
+            "max_work": self.max_work,
+            # Ticks behind right now (0 when the loop is keeping up)
+            "lag_ticks": self.lag_ticks(),
+        }
+
+    # Method to get how many whole ticks are overdue right now
+    def lag_ticks(self) -> int:
+        if self._deadline is None:
+            return 0
+        now = self.clock()
+        if now < self._deadline:
+            return 0
+        return math.floor((now - self._deadline) / self.interval) + 1
@@ -0,0 +1,303 @@
+# Sim_worker.py
+# Runs a GameSession on its own thread so the Tk main loop never waits for the model.
+# The worker owns the Pet, Economy and StockMarket. It advances them on a
+# SimulationClock, applies commands sent from the UI, and publishes immutable
+# snapshots through a small bounded queue. When the UI falls behind, the oldest
+# snapshot is dropped, so the UI only ever draws the newest state. Snapshots
+# carry only the price history changes since the previous one; the UI thread
+# applies them to its own copy of the history.
+# Import queue for the thread-safe command and result queues
+import queue
+# Import threading for the worker thread
+import threading
+# Import time to time each step
+import time
+# Import deque for the bounded snapshot queue
+from collections import deque
+# Import MappingProxyType for the read-only clock statistics
+from types import MappingProxyType
+# Import type hints for the snapshots and commands
+from typing import Any, Deque, List, Mapping, NamedTuple, Optional, Tuple
+
+# Import the game state the worker owns
+from game_session import GameSession
+from pet import petStats
+from price_history import HistoryChange, PriceHistory
+# Import the fixed-timestep clock that decides when days are due
+from sim_clock import SimulationClock
+
+# Snapshots waiting for the UI; older ones are dropped beyond this
+SNAPSHOT_QUEUE_SIZE = 2
+# Shortest wait between two steps of the worker (about 60 per second)
+MIN_STEP_SECONDS = 1 / 60
+# Session methods the UI may call through send()
+SESSION_COMMANDS = ("feed", "play", "sleep", "shower", "buy_stock", "sell_stock", "place_order", "cancel_order")
+
+
+# Define the pet's part of a snapshot
+class PetSnapshot(NamedTuple):
+    name: str
+    # Stat caps (frozen and shared by every pet of the species)
+    profile: petStats
+    state: str
+    hunger: int
+    happiness: int
+    health: int
+    energy: int
+    cleanliness: int
+    age_days: int
+
+    # The species name, like Pet.species
+    @property
+    def species(self) -> str:
+        return self.profile.type
+
+
+# Define the market's part of a snapshot
+class MarketSnapshot(NamedTuple):
+    day: int
+    # (symbol, price) pairs in listing order
+    prices: Tuple[Tuple[str, float], ...]
+    # (text, unrealized profit) pairs, as StockMarket.holdings_lines returns them
+    holdings: Tuple[Tuple[str, float], ...]
+    portfolio_value: float
+    total_profit: float
+    drawdown: float
+    max_drawdown: float
+    volatility: float
+    # Price history changes since the previous snapshot, oldest first
+    history_changes: Tuple[HistoryChange, ...]
+
+    # Symbols in listing order
+    @property
+    def symbols(self) -> Tuple[str, ...]:
+        return tuple(symbol for symbol, _ in self.prices)
+
+
+# Define one published state of the game
+class GameSnapshot(NamedTuple):
+    # Increases with every snapshot, so the UI can tell a new one from the last
+    sequence: int
+    day: int
+    pet: PetSnapshot
+    balance: float
+    expenses: Tuple[Tuple[str, float], ...]
+    market: MarketSnapshot
+    # "" while the pet is alive
+    loss_reason: str
+    speed: int
+    clock_stats: Mapping[str, float]
+
+
+# Define a command sent to the worker
+class Command(NamedTuple):
+    name: str
+    args: Tuple[Any, ...] = ()
+
+
+# Define the reply to a command, delivered in order through results()
+class CommandResult(NamedTuple):
+    command: Command
+    ok: bool
+    message: str = ""
+
+
+# Define the worker that owns a game session
+class SimulationWorker:
+    """
+    Owns a GameSession once start() is called; from then on only the worker
+    thread touches it. The UI sends commands with send(), reads replies with
+    results() and reads the newest state with latest(). Snapshots, commands
+    and results are immutable, so nothing is shared mutably between threads.
+    `history` is the UI thread's copy of the price history; latest() brings
+    it up to date with the snapshot it returns.
+    """
+
+    # Constructor that takes the session to run and its clock
+    def __init__(self, session: GameSession, clock: Optional[SimulationClock] = None,
+                 queue_size: int = SNAPSHOT_QUEUE_SIZE):
+        self.session = session
+        self.clock = clock or SimulationClock()
+        # Commands from the UI and replies to the UI
+        self._commands: "queue.Queue[Command]" = queue.Queue()
+        self._results: "queue.Queue[CommandResult]" = queue.Queue()
+        # Snapshots waiting for the UI (at most queue_size), guarded by a lock so a dropped
+        # snapshot's history changes can be folded into the next one in order
+        self._snapshots: Deque[GameSnapshot] = deque()
+        self._snapshot_limit = queue_size
+        self._snapshot_lock = threading.Lock()
+        self._sequence = 0
+        self._thread: Optional[threading.Thread] = None
+        # Exception that stopped the worker, re-raised by latest() on the UI thread
+        self.error: Optional[BaseException] = None
+        # Snapshots dropped by the worker because the queue was full, and skipped by latest()
+        self.dropped_snapshots = 0
+        self.skipped_snapshots = 0
+        # Loss reason reported by the pet's event stream
+        self._loss_reason = session.pet.last_death_reason if session.game_over else ""
+        session.pet.subscribe(self._on_pet_event)
+        # The UI's copy of the price history, and the changes made since the last snapshot
+        market_history = session.stock_market.price_history()
+        self.history: PriceHistory = market_history.copy()
+        self._history_changes: List[HistoryChange] = []
+        market_history.add_listener(self._history_changes.append)
+
+    # Method to build a snapshot of the session (worker thread, or before start())
+    def snapshot(self) -> GameSnapshot:
+        session = self.session
+        pet = session.pet
+        market = session.stock_market
+        analytics = market.analytics
+        self._sequence += 1
+        # Hand over the changes made since the last snapshot
+        changes = tuple(self._history_changes)
+        self._history_changes.clear()
+        return GameSnapshot(
+            sequence=self._sequence,
+            day=session.day,
+            pet=PetSnapshot(
+                pet.name, pet.pet_profile, pet.get_emotional_state(),
+                pet.hunger, pet.happiness, pet.health, pet.energy, pet.cleanliness, pet.age_days,
+            ),
+            balance=session.economy.balance,
+            expenses=tuple(session.economy.expenses.items()),
+            market=MarketSnapshot(
+                day=market.day,
+                prices=tuple((symbol, float(price)) for symbol, price in market.prices.items()),
+                holdings=tuple(market.holdings_lines()),
+                portfolio_value=analytics.portfolio_value,
+                total_profit=analytics.total_profit,
+                drawdown=analytics.drawdown,
+                max_drawdown=analytics.max_drawdown,
+                volatility=analytics.volatility,
+                history_changes=changes,
+            ),
+            loss_reason=self._loss_reason,
+            speed=self.clock.speed,
+            clock_stats=MappingProxyType(self.clock.stats()),
+        )
+
+    # Method to start the worker thread (the session must not be used elsewhere afterwards)
+    def start(self):
+        if self._thread is not None:
+            raise RuntimeError("the worker is already running")
+        self._thread = threading.Thread(target=self._run, name="simulation", daemon=True)
+        self._thread.start()
+
+    # Method to ask the worker to stop and wait for it
+    def stop(self, timeout: Optional[float] = 1.0):
+        if self._thread is None:
+            return
+        self.send("stop")
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    # Whether the worker thread is running
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # Method to queue a command for the worker: a SESSION_COMMANDS name, "set_speed" or "stop"
+    def send(self, name: str, *args):
+        self._commands.put(Command(name, args))
+
+    # Method to take the newest snapshot, skipping older ones (None if nothing new was published)
+    def latest(self) -> Optional[GameSnapshot]:
+        if self.error is not None:
+            raise RuntimeError("the simulation worker stopped") from self.error
+        with self._snapshot_lock:
+            waiting = list(self._snapshots)
+            self._snapshots.clear()
+        if not waiting:
+            return None
+        self.skipped_snapshots += len(waiting) - 1
+        # Skipped snapshots still carry history the UI has not seen
+        for snapshot in waiting:
+            for change in snapshot.market.history_changes:
+                change.apply(self.history)
+        return waiting[-1]
+
+    # Method to take every command result that has arrived, oldest first
+    def results(self) -> Tuple[CommandResult, ...]:
+        replies = []
+        while True:
+            try:
+                replies.append(self._results.get_nowait())
+            except queue.Empty:
+                return tuple(replies)
+
+    # Worker loop: apply commands, run due days, publish a snapshot after each change
+    def _run(self):
+        try:
+            self.clock.start()
+            self._publish(self.snapshot())
+            while True:
+                # Sleep until the next day is due (or a command arrives)
+                wait = max(MIN_STEP_SECONDS, self.clock.time_until_next())
+                try:
+                    commands = [self._commands.get(timeout=wait)]
+                except queue.Empty:
+                    commands = []
+                # Take everything else already queued, so a burst costs one snapshot
+                while True:
+                    try:
+                        commands.append(self._commands.get_nowait())
+                    except queue.Empty:
+                        break
+                changed = False
+                for command in commands:
+                    if command.name == "stop":
+                        return
+                    self._results.put(self._apply(command))
+                    changed = True
+                days = self.clock.due()
+                if days and not self.session.game_over:
+                    started = time.perf_counter()
+                    self.session.advance_days(days)
+                    self.clock.record_work(time.perf_counter() - started)
+                    changed = True
+                if changed:
+                    self._publish(self.snapshot())
+        except BaseException as error:
+            self.error = error
+        finally:
+            self.clock.stop()
+
+    # Method to run one command against the session
+    def _apply(self, command: Command) -> CommandResult:
+        try:
+            if command.name == "set_speed":
+                self.clock.set_speed(*command.args)
+                return CommandResult(command, True, f"Speed x{self.clock.speed}.")
+            if command.name not in SESSION_COMMANDS:
+                return CommandResult(command, False, f"Unknown command: {command.name}")
+            if self.session.game_over:
+                return CommandResult(command, False, "The game is over.")
+            outcome = getattr(self.session, command.name)(*command.args)
+        except ValueError as error:
+            return CommandResult(command, False, str(error))
+        # Trades return (success, message); care actions return a bool
+        if isinstance(outcome, tuple):
+            ok, message = outcome
+        else:
+            ok, message = bool(outcome), ""
+        self.session.check_game_over()
+        return CommandResult(command, ok, message)
+
+    # Method to publish a snapshot, dropping the oldest waiting one if the queue is full
+    def _publish(self, snapshot: GameSnapshot):
+        with self._snapshot_lock:
+            self._snapshots.append(snapshot)
+            if len(self._snapshots) <= self._snapshot_limit:
+                return
+            dropped = self._snapshots.popleft()
+            self.dropped_snapshots += 1
+            # The UI never saw the dropped snapshot's history changes, so they go first in the next one
+            following = self._snapshots[0]
+            changes = dropped.market.history_changes + following.market.history_changes
+            self._snapshots[0] = following._replace(market=following.market._replace(history_changes=changes))
+
+    # Pet event listener (runs on the worker thread): remember a loss for the snapshots
+    def _on_pet_event(self, event):
+        if event.kind == "loss":
+            self._loss_reason = event.new
@@ -0,0 +1,371 @@
+# Sprite_cache.py
+# Background sprite pipeline for the pet images.
+# The <state>-<species>.png assets are decoded once on a worker thread and
+# stored as pre-scaled PNGs for several panel sizes in an on-disk cache keyed
+# by each asset's mtime and size. The GUI then only loads small files, through
+# a memory-capped LRU, so mood changes and resizes never decode a full sprite.
+# Import OrderedDict for the LRU order
+from collections import OrderedDict, deque
+# Import hashlib to build the cache key of an asset
+import hashlib
+# Import os for paths, stat and atomic renames
+import os
+# Import struct to read and write PNG chunks
+import struct
+# Import tempfile to write cache files atomically
+import tempfile
+# Import threading for the background worker
+import threading
+# Import zlib for PNG compression
+import zlib
+# Import type hints for the public methods
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# Import NumPy to unfilter, scale and encode pixel rows in bulk
+import numpy as np
+
+# Longest side, in pixels, of the pre-scaled variants kept for each sprite
+SPRITE_SIZES = (160, 240, 320, 480)
+# Memory the GUI's decoded sprites may use before the least recently used are dropped
+DEFAULT_MEMORY_LIMIT = 32 * 1024 * 1024
+# First bytes of every PNG file
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Channels per pixel for each PNG color type (3 is a palette, expanded to RGB or RGBA)
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+# PNG color type to write for each channel count
+COLOR_TYPES = {1: 0, 2: 4, 3: 2, 4: 6}
+
+
+# Function to get a per-user cache folder (scaled sprites by default)
+def default_cache_dir(kind: str = "sprites") -> str:
+    # Windows keeps caches under LOCALAPPDATA; elsewhere follow XDG_CACHE_HOME
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "virtual-pet", kind)
+
+
+# Function to decode a non-interlaced PNG into a (height, width, channels) uint8 array
+def decode_png(data: bytes) -> np.ndarray:
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("not a PNG file")
+    # Collect the header, palette, transparency and image data chunks
+    offset = len(PNG_SIGNATURE)
+    header, palette, transparency, chunks = None, None, None, []
+    while offset + 8 <= len(data):
+        length, kind = struct.unpack_from(">I4s", data, offset)
+        body = data[offset + 8:offset + 8 + length]
+        offset += 12 + length
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", body)
+        elif kind == b"PLTE":
+            palette = np.frombuffer(body, np.uint8).reshape(-1, 3)
+        elif kind == b"tRNS":
+            transparency = np.frombuffer(body, np.uint8)
+        elif kind == b"IDAT":
+            chunks.append(body)
+        elif kind == b"IEND":
+            break
+    if header is None:
+        raise ValueError("PNG has no header")
+    width, height, depth, color_type, _compression, _filter, interlace = header
+    if interlace or depth not in (8, 16) or color_type not in PNG_CHANNELS or (color_type == 3 and depth != 8):
+        raise ValueError("unsupported PNG layout")
+
+    # Undo the per-row filters, then keep the high byte of 16-bit samples
+    channels = PNG_CHANNELS[color_type]
+    sample_bytes = depth // 8
+    rows = _unfilter(zlib.decompress(b"".join(chunks)), height, width * channels * sample_bytes, channels * sample_bytes)
+    pixels = rows.reshape(height, width, channels * sample_bytes)[:, :, ::sample_bytes]
+    # Expand palette images to RGB (RGBA when the palette has transparency)
+    if color_type == 3:
+        colors = palette
+        if transparency is not None:
+            alpha = np.full(len(palette), 255, np.uint8)
+            alpha[:len(transparency)] = transparency[:len(palette)]
+            colors = np.column_stack([palette, alpha])
+        pixels = colors[pixels[:, :, 0]]
+    return np.ascontiguousarray(pixels)
+
+
+# Function to undo PNG row filters; `stride` is the bytes per row and `bpp` the bytes per pixel
+def _unfilter(raw: bytes, height: int, stride: int, bpp: int) -> np.ndarray:
+    rows = np.frombuffer(raw, np.uint8)[:height * (stride + 1)].reshape(height, stride + 1)
+    filters = rows[:, 0]
+    data = rows[:, 1:].copy()
+    previous = np.zeros(stride, np.uint8)
+    for y in range(height):
+        line = data[y]
+        kind = filters[y]
+        if kind == 1:
+            # Sub: each byte adds the byte one pixel to the left, a running sum per channel (mod 256)
+            for channel in range(bpp):
+                line[channel::bpp] = np.cumsum(line[channel::bpp], dtype=np.uint8)
+        elif kind == 2:
+            # Up: add the row above (uint8 arithmetic wraps like the PNG spec)
+            line += previous
+        elif kind in (3, 4):
+            # Average and Paeth depend on the decoded byte to the left, so they run byte by byte
+            line[:] = _unfilter_sequential(kind, line.tolist(), previous.tolist(), bpp)
+        previous = line
+    return data
+
+
+# Function to undo one Average (3) or Paeth (4) filtered row
+def _unfilter_sequential(kind: int, line: List[int], up: List[int], bpp: int) -> List[int]:
+    for x in range(len(line)):
+        left = line[x - bpp] if x >= bpp else 0
+        if kind == 3:
+            line[x] = (line[x] + ((left + up[x]) >> 1)) & 0xFF
+            continue
+        above = up[x]
+        corner = up[x - bpp] if x >= bpp else 0
+        # Paeth predictor: whichever neighbour is closest to left + above - corner
+        distance_left = abs(above - corner)
+        distance_above = abs(left - corner)
+        distance_corner = abs(left + above - 2 * corner)
+        if distance_left <= distance_above and distance_left <= distance_corner:
+            predicted = left
+        elif distance_above <= distance_corner:
+            predicted = above
+        else:
+            predicted = corner
+        line[x] = (line[x] + predicted) & 0xFF
+    return line
+
+
+# Function to encode a (height, width, channels) uint8 array as a PNG
+def encode_png(pixels: np.ndarray) -> bytes:
+    height, width, channels = pixels.shape
+    # Filter every row with "Up" (difference to the row above), which compresses photos well
+    data = pixels.reshape(height, width * channels)
+    filtered = data.copy()
+    filtered[1:] -= data[:-1]
+    raw = np.column_stack([np.full(height, 2, np.uint8), filtered]).tobytes()
+
+    # Function to frame one chunk with its length and CRC
+    def chunk(kind: bytes, body: bytes) -> bytes:
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+    header = struct.pack(">IIBBBBB", width, height, 8, COLOR_TYPES[channels], 0, 0, 0)
+    return PNG_SIGNATURE + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b"")
+
+
+# Function to shrink an image so its longest side is `max_dim`, averaging the pixels each output pixel covers
+def scale_to_fit(pixels: np.ndarray, max_dim: int) -> np.ndarray:
+    height, width, channels = pixels.shape
+    scale = max_dim / max(height, width)
+    if scale >= 1:
+        return pixels
+    values = pixels.astype(np.float32)
+    # Average colour weighted by alpha, so transparent pixels do not darken the edges
+    has_alpha = channels in (2, 4)
+    if has_alpha:
+        values[..., :-1] *= values[..., -1:] / 255.0
+    values = _box_axis(values, max(1, round(height * scale)), 0)
+    values = _box_axis(values, max(1, round(width * scale)), 1)
+    if has_alpha:
+        alpha = values[..., -1:]
+        values[..., :-1] = np.divide(values[..., :-1] * 255.0, alpha, out=np.zeros_like(values[..., :-1]), where=alpha > 0)
+    return np.clip(np.rint(values), 0, 255).astype(np.uint8)
+
+
+# Function to average an axis down to `size` bins of (nearly) equal width
+def _box_axis(values: np.ndarray, size: int, axis: int) -> np.ndarray:
+    length = values.shape[axis]
+    starts = np.arange(size) * length // size
+    sums = np.add.reduceat(values, starts, axis=axis)
+    counts = np.diff(np.append(starts, length)).astype(np.float32)
+    shape = [1] * values.ndim
+    shape[axis] = size
+    return sums / counts.reshape(shape)
+
+
+# Define the on-disk cache of pre-scaled sprites and the worker that fills it
+class SpriteCache:
+    """
+    Pre-scaled copies of every PNG in `assets_dir`, one per size in `sizes`,
+    stored in `cache_dir` as <name>-<size>-<key>.png. The key hashes the
+    asset's name, mtime and size, so an edited asset gets new variants and
+    stale ones are deleted when it is rebuilt.
+    start() builds the missing variants on a daemon thread; prioritize()
+    moves a sprite to the front of its queue. Nothing here touches Tk, so
+    it is safe to call from any thread.
+    """
+
+    # Constructor that records the folders and sizes
+    def __init__(self, assets_dir: str, cache_dir: Optional[str] = None, sizes: Sequence[int] = SPRITE_SIZES):
+        self.assets_dir = assets_dir
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.sizes = tuple(sorted(sizes))
+        # Sprites waiting for the worker, the worker thread, and failures by asset name
+        self._queue: deque = deque()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self.errors: Dict[str, str] = {}
+        # Number of sprites decoded (the rest were already on disk)
+        self.built = 0
+
+    # Method to list the PNG assets by file name
+    def asset_names(self) -> List[str]:
+        try:
+            return sorted(name for name in os.listdir(self.assets_dir) if name.lower().endswith(".png"))
+        except FileNotFoundError:
+            return []
+
+    # Method to pick the largest variant size that fits `available` pixels (the smallest if none fit)
+    def size_for(self, available: int) -> int:
+        fitting = [size for size in self.sizes if size <= available]
+        return fitting[-1] if fitting else self.sizes[0]
+
+    # Method to build the cache key for an asset from its mtime and size (None if it is missing)
+    def key(self, name: str) -> Optional[str]:
+        try:
+            info = os.stat(os.path.join(self.assets_dir, name))
+        except FileNotFoundError:
+            return None
+        return hashlib.sha1(f"{name}:{info.st_mtime_ns}:{info.st_size}".encode("utf-8")).hexdigest()[:16]
+
+    # Method to get the path of a pre-scaled variant, or None if it has not been built yet
+    def variant(self, name: str, size: int) -> Optional[str]:
+        key = self.key(name)
+        if key is None:
+            return None
+        path = self._variant_path(name, size, key)
+        return path if os.path.exists(path) else None
+
+    # Method to build every missing variant of one asset; returns False if it was already up to date
+    def build(self, name: str) -> bool:
+        key = self.key(name)
+        if key is None:
+            return False
+        paths = {size: self._variant_path(name, size, key) for size in self.sizes}
+        if all(os.path.exists(path) for path in paths.values()):
+            return False
+        with open(os.path.join(self.assets_dir, name), "rb") as handle:
+            pixels = decode_png(handle.read())
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Scale down step by step from the largest size, so each step averages fewer pixels
+        for size in sorted(self.sizes, reverse=True):
+            pixels = scale_to_fit(pixels, size)
+            if not os.path.exists(paths[size]):
+                self._write(paths[size], encode_png(pixels))
+        self._remove_stale(name, key)
+        self.built += 1
+        return True
+
+    # Method to start (or keep running) the worker that builds `names` (all assets by default)
+    def start(self, names: Optional[Iterable[str]] = None) -> threading.Thread:
+        with self._lock:
+            queued = set(self._queue)
+            self._queue.extend(name for name in (self.asset_names() if names is None else names) if name not in queued)
+            return self._ensure_worker()
+
+    # Method to build one sprite before everything else still queued
+    def prioritize(self, name: str):
+        with self._lock:
+            if name in self._queue:
+                self._queue.remove(name)
+            self._queue.appendleft(name)
+            self._ensure_worker()
+
+    # Method to wait until the worker has emptied its queue
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+        return worker is None or not worker.is_alive()
+
+    # Method to start the worker thread if it is not running (call with the lock held)
+    def _ensure_worker(self) -> threading.Thread:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="sprite-cache", daemon=True)
+            self._worker.start()
+        return self._worker
+
+    # Worker loop: build queued sprites until the queue is empty
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._queue:
+                    return
+                name = self._queue.popleft()
+            try:
+                self.build(name)
+            except (OSError, ValueError, zlib.error) as error:
+                # A broken asset falls back to Tk's own loader in the GUI
+                self.errors[name] = str(error)
+
+    # Method to build the path of one variant
+    def _variant_path(self, name: str, size: int, key: str) -> str:
+        stem = os.path.splitext(name)[0]
+        return os.path.join(self.cache_dir, f"{stem}-{size}-{key}.png")
+
+    # Method to delete variants of an asset made from an older version of it
+    def _remove_stale(self, name: str, key: str):
+        stem = os.path.splitext(name)[0]
+        prefixes = tuple(f"{stem}-{size}-" for size in self.sizes)
+        for entry in os.listdir(self.cache_dir):
+            if entry.startswith(prefixes) and entry.endswith(".png") and not entry.endswith(f"-{key}.png"):
+                try:
+                    os.unlink(os.path.join(self.cache_dir, entry))
+                except FileNotFoundError:
+                    pass
+
+    # Method to write a cache file atomically (a reader never sees a half-written PNG)
+    def _write(self, path: str, data: bytes):
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+
+# Define a least-recently-used map whose entries each have a memory cost
+class SpriteLRU:
+    """
+    Holds decoded sprites (Tk PhotoImages in the GUI) up to `limit_bytes`;
+    adding past the limit drops the least recently used entries.
+    """
+
+    # Constructor that sets the memory cap
+    def __init__(self, limit_bytes: int = DEFAULT_MEMORY_LIMIT):
+        self.limit_bytes = limit_bytes
+        self.used_bytes = 0
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        # Entries dropped to stay under the cap
+        self.evictions = 0
+
+    # Method to get an entry and mark it most recently used (None if absent)
+    def get(self, key) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    # Method to add an entry that costs `cost` bytes, evicting old entries as needed
+    def put(self, key, value, cost: int):
+        if key in self._entries:
+            self.used_bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, cost)
+        self.used_bytes += cost
+        # Always keep the newest entry, even if it alone is over the cap
+        while self.used_bytes > self.limit_bytes and len(self._entries) > 1:
+            _key, (_value, old_cost) = self._entries.popitem(last=False)
+            self.used_bytes -= old_cost
+            self.evictions += 1
+
+    # Number of entries held
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # Whether a key is held (does not change the order)
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    # Method to drop every entry
+    def clear(self):
+        self._entries.clear()
+        self.used_bytes = 0
@@ -1,12 +1,144 @@
-# Import random module for generating random price movements and events
+# Import random to pick a seed for markets created without one
 import random
-# Import defaultdict to create dictionaries with default integer values
-from collections import defaultdict
-# Import type hints for dictionary and tuple types
-from typing import Dict, Tuple
+# Import bisect_right to find the nearest replay checkpoint
+from bisect import bisect_right
+# Import MutableMapping so array-backed columns can still be used like dicts
+from collections.abc import MutableMapping
+# Import lru_cache to keep replayers (and their checkpoints) between replay_prices calls
+from functools import lru_cache
+# Import type hints for dictionary, list and tuple types
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+# Import NumPy for index-aligned price, momentum and holdings arrays
+import numpy as np
 
 # Import the Economy class to manage balance updates
-from economy import Economy
+from economy import Economy, FailureReason
+# Import the order book for resting limit, stop-loss and take-profit orders
+from order_book import Order, OrderBook
+# Import the running portfolio and risk analytics
+from portfolio_analytics import PortfolioAnalytics
+# Import the columnar price history store and its retention policy
+from price_history import DEFAULT_RETENTION, PriceHistory, RetentionPolicy
+
+# Starting price for each stock symbol
+STARTING_PRICES: Dict[str, float] = {
+    "PAW": 50.0,
+    "MEOW": 35.0,
+    "BONE": 20.0,
+    "NUT": 15.0,
+}
+
+
+# Function to draw the starting momentum for `count` symbols
+def initial_momentum(rng: np.random.Generator, count: int) -> np.ndarray:
+    return rng.uniform(-0.02, 0.03, count)
+
+
+# Number of uniform draws move_prices takes per symbol per day
+DRAWS_PER_SYMBOL = 7
+# Blocks up to this many prices are moved with a Python loop instead of array operations
+SCALAR_LIMIT = 16
+# Seeds whose replayers replay_prices keeps, least recently used dropped first
+REPLAY_CACHE_SIZE = 16
+
+
+# Function to advance prices one day for arrays of any shape (one day of StockMarket.tick per element)
+def move_prices(prices: np.ndarray, momentum: np.ndarray, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized daily price move shared by StockMarket.tick, MarketReplay and
+    the Monte Carlo engine. Returns (new_prices, new_momentum); the inputs
+    are not modified. Every element takes exactly DRAWS_PER_SYMBOL uniform
+    draws, all in one call, so the cost per tick is a few array operations.
+    """
+    # One block of uniform [0, 1) draws, scaled into each range below
+    draws = rng.random((DRAWS_PER_SYMBOL,) + prices.shape)
+    # NumPy's per-call overhead dominates for a few symbols, so small blocks use a plain loop
+    if prices.size <= SCALAR_LIMIT:
+        return _move_prices_scalar(prices, momentum, draws)
+    swing_u, surge_u, surge_size_u, crash_u, crash_factor_u, crash_momentum_u, drift_u = draws
+    # Random swing between -0.1 and 0.1 plus the current momentum
+    swing = swing_u * 0.2 - 0.1 + momentum
+    # 7% chance for a market surge of 0.15-0.4
+    swing = np.where(surge_u < 0.07, swing + 0.15 + surge_size_u * 0.25, swing)
+
+    # 4% chance for a crash that multiplies the price by 0.2-0.7 (floored at 0.75)
+    crash = crash_u < 0.04
+    prices = np.where(crash, np.maximum(0.75, prices * (0.2 + crash_factor_u * 0.5)), prices)
+    # A crash resets momentum to a negative value between -0.05 and -0.01
+    momentum = np.where(crash, crash_momentum_u * 0.04 - 0.05, momentum)
+
+    # Apply the swing, round to cents and keep the price floor
+    new_prices = np.maximum(0.5, np.round(prices * (1 + swing), 2))
+    # Slowly mean-revert momentum (drift between -0.01 and 0.02) and keep it inside its bounds
+    new_momentum = np.clip(momentum * 0.9 + (drift_u * 0.03 - 0.01), -0.1, 0.08)
+    return new_prices, new_momentum
+
+
+# Function with the same math as move_prices, one element at a time (bit-for-bit identical results)
+def _move_prices_scalar(prices: np.ndarray, momentum: np.ndarray, draws: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    new_prices = []
+    new_momentum = []
+    columns = draws.reshape(DRAWS_PER_SYMBOL, -1).T.tolist()
+    for price, drift, (swing_u, surge_u, surge_size_u, crash_u, crash_factor_u, crash_momentum_u, drift_u) in zip(
+        prices.ravel().tolist(), momentum.ravel().tolist(), columns
+    ):
+        # Random swing plus momentum, then a possible surge
+        swing = swing_u * 0.2 - 0.1 + drift
+        if surge_u < 0.07:
+            swing = swing + 0.15 + surge_size_u * 0.25
+        # Possible crash
+        if crash_u < 0.04:
+            price = max(0.75, price * (0.2 + crash_factor_u * 0.5))
+            drift = crash_momentum_u * 0.04 - 0.05
+        # np.round(x, 2) is rint(x * 100) / 100, and round() on a float rounds half to even like rint
+        new_prices.append(max(0.5, round(price * (1 + swing) * 100) / 100))
+        new_momentum.append(min(0.08, max(-0.1, drift * 0.9 + (drift_u * 0.03 - 0.01))))
+    return np.array(new_prices).reshape(prices.shape), np.array(new_momentum).reshape(prices.shape)
+
+
+# Define a dict-like view of one of the market's per-symbol arrays
+class SymbolColumn(MutableMapping):
+    """
+    Maps symbol -> value for one index-aligned market array, so code written
+    for the old prices/momentum/holdings dicts keeps working. Writes go
+    through the market so its running totals stay correct.
+    """
+
+    # Constructor that remembers the market, the array name and the Python type of the values
+    def __init__(self, market: "StockMarket", field: str, cast: Callable):
+        self._market = market
+        self._field = field
+        self._cast = cast
+
+    # Look up one symbol's value
+    def __getitem__(self, symbol: str):
+        return self._cast(getattr(self._market, self._field)[self._market._index[symbol]])
+
+    # Set one symbol's value (the symbol must already be listed)
+    def __setitem__(self, symbol: str, value):
+        self._market._set_value(self._field, self._market._index[symbol], value)
+
+    # Symbols are removed with StockMarket.delist_symbol
+    def __delitem__(self, symbol: str):
+        raise TypeError("use StockMarket.delist_symbol to remove a symbol")
+
+    # Iterate over symbols in listing order
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._market.symbols)
+
+    # Number of listed symbols
+    def __len__(self) -> int:
+        return len(self._market.symbols)
+
+    # Plain dict copy, like dict.copy()
+    def copy(self) -> dict:
+        return dict(zip(self._market.symbols, getattr(self._market, self._field).tolist()))
+
+    # Show the view like the dict it replaces
+    def __repr__(self) -> str:
+        return repr(self.copy())
+
 
 # Define the StockMarket class for simulating stock price changes and trading
 class StockMarket:
@@ -14,72 +146,124 @@ class StockMarket:
     Lightweight stock market simulator for the GUI economy tab.
     Prices move a bit each tick; buy/sell adjusts the shared Economy balance.
     Includes occasional crashes and surges to keep risk meaningful.
+
+    Prices, momentum, shares and cost basis live in NumPy arrays aligned with
+    `symbols`, so a tick is a handful of array operations whatever the number
+    of symbols. Portfolio value and open cost are kept as running totals.
     """
 
     # Constructor that initializes the stock market with an economy object and optional seed
-    def __init__(self, economy: Economy, seed: int = None):
+    def __init__(self, economy: Economy, seed: int = None, history_retention: RetentionPolicy = DEFAULT_RETENTION,
+                 prices: Optional[Mapping[str, float]] = None):
         # Store a reference to the shared Economy object
         self.economy = economy
-        # Initialize price dictionary with four stock symbols and their starting prices
-        self.prices: Dict[str, float] = {
-            "PAW": 50.0,
-            "MEOW": 35.0,
-            "BONE": 20.0,
-            "NUT": 15.0,
-        }
-        # Initialize price history as a dict mapping each symbol to a list of (day, price) tuples
-        self.history = {symbol: [(0, price)] for symbol, price in self.prices.items()}
-        # Initialize holdings as a defaultdict tracking shares owned of each symbol
-        self.holdings = defaultdict(int)
-        # Initialize holdings_cost to track total cost basis for each symbol
-        self.holdings_cost = defaultdict(float)
+        # Listed symbols and each symbol's position in the arrays
+        starting = dict(STARTING_PRICES if prices is None else prices)
+        self.symbols: List[str] = list(starting)
+        self._index: Dict[str, int] = {symbol: i for i, symbol in enumerate(self.symbols)}
+        # Index-aligned arrays: price, shares held and total cost basis per symbol
+        self._prices = np.array(list(starting.values()), dtype=np.float64)
+        self._shares = np.zeros(len(self.symbols), dtype=np.int64)
+        self._cost = np.zeros(len(self.symbols), dtype=np.float64)
+        # Dict-like views over the arrays
+        self.prices = SymbolColumn(self, "_prices", float)
+        self.momentum = SymbolColumn(self, "_momentum", float)
+        self.holdings = SymbolColumn(self, "_shares", int)
+        self.holdings_cost = SymbolColumn(self, "_cost", float)
+        # Running totals: market value of all shares and cost basis of open positions
+        self._value = 0.0
+        self._open_cost = 0.0
+        # Initialize the bounded, columnar price history with the day 0 prices
+        self.history = PriceHistory(self.symbols, history_retention)
+        self.history.append(0, self.prices.copy())
         # Initialize realized_profit to track profit from completed stock sales
         self.realized_profit = 0.0
         # Initialize day counter starting at 0
         self.day = 0
-        # Initialize momentum dict for each symbol to influence price direction
-        self.momentum: Dict[str, float] = {symbol: random.uniform(-0.02, 0.03) for symbol in self.prices}
-        # Set the random seed if provided for reproducible results
-        if seed is not None:
-            random.seed(seed)
+        # Pick a seed when none is given, so every market can be replayed later
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        self.seed = seed
+        # Give the market its own random stream; nothing else in the process draws from it
+        self.rng = np.random.default_rng(seed)
+        # Initialize momentum for each symbol to influence price direction
+        self._momentum = initial_momentum(self.rng, len(self.symbols))
+        # Resting orders, matched at the end of every tick, and the orders the last tick closed
+        self.orders = OrderBook(self)
+        self.last_fills: List[Order] = []
+        # Running portfolio value, P/L, drawdown, volatility and per-symbol returns
+        self.analytics = PortfolioAnalytics(self)
 
     # Method to advance the market one day and adjust all stock prices
-    def tick(self) -> Dict[str, float]:
+    def tick(self) -> Mapping[str, float]:
         """Advance market one step and slightly move prices."""
         # Increment the day counter
         self.day += 1
-        # Loop through each stock symbol and its current price
-        for symbol, price in self.prices.items():
-            # Generate a random swing between -0.1 and 0.1 for natural variation
-            swing = random.uniform(-0.1, 0.1)  # wider range to allow dips
-            # Add the symbol's momentum to the swing
-            swing += self.momentum.get(symbol, 0.0)
-
-            # 7% chance for a market surge (positive price movement)
-            if random.random() < 0.07:
-                # Add a large positive swing between 0.15 and 0.4
-                swing += random.uniform(0.15, 0.4)
-
-            # 4% chance for a market crash (negative price movement)
-            if random.random() < 0.04:
-                # Set crash factor between 0.2 and 0.7 (multiply current price)
-                crash_factor = random.uniform(0.2, 0.7)
-                # Apply the crash factor and ensure price doesn't go below 0.5
-                price = max(0.75, price * crash_factor)
-                # Set momentum negative after crash to simulate prolonged downturn
-                self.momentum[symbol] = random.uniform(-0.05, -0.01)
-
-            # Calculate new price using the swing percentage
-            new_price = max(0.5, round(price * (1 + swing), 2))
-            # Slowly mean-revert momentum to prevent unlimited growth or decline
-            self.momentum[symbol] = max(-0.1, min(0.08, self.momentum.get(symbol, 0.0) * 0.9 + random.uniform(-0.01, 0.02)))
-            # Update the price for this symbol
-            self.prices[symbol] = new_price
-            # Append the new price and day to the history
-            self.history.setdefault(symbol, []).append((self.day, new_price))
-        # Return the updated prices dictionary
+        # Move every price at once with this market's own random stream
+        self._prices, self._momentum = move_prices(self._prices, self._momentum, self.rng)
+        # Every price changed, so the portfolio value is one dot product
+        self._value = float(self._shares @ self._prices)
+        # Append the new day's prices for every symbol to the history
+        self.history.append(self.day, self.prices.copy())
+        # Update the running analytics once per day, before fills change the holdings
+        self.analytics.on_tick()
+        # Fill any resting orders the new prices triggered
+        self.last_fills = self.orders.match()
+        # Return the updated prices
         return self.prices
-        
+
+    # Method to get the random stream state (a plain dict that can be saved as JSON)
+    def rng_state(self) -> dict:
+        return self.rng.bit_generator.state
+
+    # Method to restore a state returned by rng_state()
+    def set_rng_state(self, state: dict):
+        self.rng.bit_generator.state = state
+
+    # Method to list a new symbol at `price`; its momentum is drawn from the market's stream
+    def list_symbol(self, symbol: str, price: float, momentum: Optional[float] = None):
+        # Symbols are stored in uppercase, like buy and sell expect
+        symbol = symbol.upper()
+        if symbol in self._index:
+            raise ValueError(f"{symbol} is already listed")
+        if price <= 0:
+            raise ValueError("listing price must be positive")
+        if momentum is None:
+            momentum = float(initial_momentum(self.rng, 1)[0])
+        # Append to every aligned array and to the history
+        self._index[symbol] = len(self.symbols)
+        self.symbols.append(symbol)
+        self._prices = np.append(self._prices, float(price))
+        self._momentum = np.append(self._momentum, float(momentum))
+        self._shares = np.append(self._shares, 0)
+        self._cost = np.append(self._cost, 0.0)
+        self.history.add_symbol(symbol, self.day, float(price))
+        self.analytics.on_list(float(price))
+
+    # Method to delist a symbol; any shares still held are sold at the last price
+    def delist_symbol(self, symbol: str) -> Tuple[bool, str]:
+        symbol = symbol.upper()
+        index = self._index.get(symbol)
+        if index is None:
+            return False, "Unknown symbol."
+        # Drop resting orders, then cash out the open position like a normal sale
+        self.orders.cancel_symbol(symbol)
+        owned = int(self._shares[index])
+        message = f"Delisted {symbol}"
+        if owned > 0:
+            _success, sold = self.sell(symbol, owned)
+            message += f"; {sold[0].lower()}{sold[1:]}"
+        # Remove the symbol from every aligned array and reindex the rest
+        self.symbols.pop(index)
+        self._index = {name: i for i, name in enumerate(self.symbols)}
+        self._prices = np.delete(self._prices, index)
+        self._momentum = np.delete(self._momentum, index)
+        self._shares = np.delete(self._shares, index)
+        self._cost = np.delete(self._cost, index)
+        self.history.remove_symbol(symbol)
+        self.analytics.on_delist(index)
+        return True, message
+
     # Method to buy shares of a stock, spending from the economy balance
     def buy(self, symbol: str, shares: int) -> Tuple[bool, str]:
         # Convert symbol to uppercase for consistency
@@ -88,24 +272,29 @@ class StockMarket:
         if shares <= 0:
             # Return failure with an error message
             return False, "Enter a positive share count."
-        # Get the current price of the symbol
-        price = self.prices.get(symbol)
+        # Get the position of the symbol in the arrays
+        index = self._index.get(symbol)
         # Check if the symbol exists in the market
-        if price is None:
+        if index is None:
             # Return failure if the symbol is unknown
             return False, "Unknown symbol."
+        price = float(self._prices[index])
 
         # Calculate the total cost of the purchase
         cost = int(round(price * shares))
         # Attempt to spend the cost from the economy
-        if not self.economy.spend("investments", cost):
-            # Return failure if there's insufficient balance
-            return False, "Not enough balance."
-
-        # Increase the holdings of this symbol by the purchased shares
-        self.holdings[symbol] += shares
-        # Add the cost basis to track average purchase price
-        self.holdings_cost[symbol] += price * shares
+        spent = self.economy.spend("investments", cost)
+        if not spent:
+            # Return failure if there's insufficient balance (or the investments budget is used up)
+            return False, "Over the investments budget." if spent.reason is FailureReason.OVER_BUDGET else "Not enough balance."
+
+        # Increase the holdings of this symbol and add the cost basis to track average purchase price
+        self._shares[index] += shares
+        self._cost[index] += price * shares
+        # Update the running totals for this one symbol
+        self._value += price * shares
+        self._open_cost += price * shares
+        self.analytics.on_fill()
         # Return success with a confirmation message
         return True, f"Bought {shares} {symbol} for ${cost}"
 
@@ -117,91 +306,163 @@ class StockMarket:
         if shares <= 0:
             # Return failure if share count is not positive
             return False, "Enter a positive share count."
-        # Get the current holdings for this symbol
-        owned = self.holdings.get(symbol, 0)
+        # Get the position of the symbol in the arrays
+        index = self._index.get(symbol)
         # Check if we have enough shares to sell
-        if shares > owned:
+        if shares > (int(self._shares[index]) if index is not None else 0):
             # Return failure if trying to sell more shares than owned
             return False, "Not enough shares to sell."
 
         # Get the current market price of the symbol
-        price = self.prices.get(symbol)
-        # Check if the symbol exists in the market
-        if price is None:
-            # Return failure if the symbol is unknown
-            return False, "Unknown symbol."
-
-        # Calculate the average cost per share for this symbol
-        avg_cost = self.average_cost(symbol)
-        # Calculate the cost basis for the shares being sold
-        cost_basis = avg_cost * shares
+        price = float(self._prices[index])
+        # Calculate the cost basis for the shares being sold from the average cost per share
+        cost_basis = self.average_cost(symbol) * shares
         # Calculate the proceeds from selling at current market price
         proceeds = int(round(price * shares))
-        # Decrease holdings for this symbol
-        self.holdings[symbol] -= shares
-        # Decrease the cost basis tracking accordingly
-        self.holdings_cost[symbol] = max(0.0, self.holdings_cost[symbol] - cost_basis)
+        # Decrease holdings and the cost basis tracking accordingly (a closed position has no cost)
+        old_cost = float(self._cost[index])
+        self._shares[index] -= shares
+        self._cost[index] = max(0.0, old_cost - cost_basis) if self._shares[index] > 0 else 0.0
+        # Update the running totals for this one symbol
+        self._value -= price * shares
+        self._open_cost += float(self._cost[index]) - old_cost
         # Add profit/loss to realized profit (proceeds minus cost basis)
         self.realized_profit += proceeds - cost_basis
         # Add the proceeds back to the economy balance
-        self.economy.earn(proceeds)
+        self.economy.earn(proceeds, "investments")
+        self.analytics.on_fill()
         # Return success with a confirmation message
         return True, f"Sold {shares} {symbol} for ${proceeds}"
 
+    # Method to place a resting order (kinds: limit_buy, limit_sell, stop_loss, take_profit)
+    def place_order(self, symbol: str, kind: str, shares: int, trigger: float) -> Tuple[bool, str]:
+        try:
+            order = self.orders.place(symbol, kind, shares, trigger)
+        except ValueError as error:
+            return False, str(error)
+        return True, f"Order #{order.order_id}: {kind.replace('_', ' ')} {order.shares} {order.symbol} at ${order.trigger:.2f}"
+
+    # Method to cancel a resting order by its number
+    def cancel_order(self, order_id: int) -> Tuple[bool, str]:
+        if not self.orders.cancel(order_id):
+            return False, "No open order with that number."
+        return True, f"Cancelled order #{order_id}"
+
+    # Method to set one array value through a SymbolColumn, keeping the running totals in step
+    def _set_value(self, field: str, index: int, value):
+        if field == "_prices":
+            self._value += float(self._shares[index]) * (float(value) - float(self._prices[index]))
+        elif field == "_shares":
+            self._value += (int(value) - int(self._shares[index])) * float(self._prices[index])
+        elif field == "_cost":
+            self._open_cost += float(value) - float(self._cost[index])
+        getattr(self, field)[index] = value
+
     # Method to calculate the total current value of all holdings
     def portfolio_value(self) -> float:
-        # Sum the market value of all holdings (shares * current price)
-        return round(sum(self.prices[symbol] * shares for symbol, shares in self.holdings.items()), 2)
+        # Market value of all holdings (shares * current price), kept as a running total
+        return round(self._value, 2)
 
     # Method to calculate the average purchase price per share for a symbol
     def average_cost(self, symbol: str) -> float:
         # Get the number of shares held for this symbol
-        shares = self.holdings.get(symbol, 0)
+        index = self._index.get(symbol)
+        shares = int(self._shares[index]) if index is not None else 0
         # If no shares are held, return 0
         if shares <= 0:
             return 0.0
         # Return total cost basis divided by shares (average cost per share)
-        return self.holdings_cost.get(symbol, 0.0) / shares
+        return float(self._cost[index]) / shares
 
     # Method to calculate unrealized profit/loss on current holdings
     def unrealized_profit(self) -> float:
-        # Initialize total unrealized profit to 0
-        total = 0.0
-        # Loop through each symbol and its share count
-        for symbol, shares in self.holdings.items():
-            # Skip symbols with no shares
-            if shares <= 0:
-                continue
-            # Add the profit/loss: (current price - avg cost) * shares
-            total += (self.prices.get(symbol, 0) - self.average_cost(symbol)) * shares
-        # Return the total unrealized profit rounded to 2 decimal places
-        return round(total, 2)
+        # Sum of (price - avg cost) * shares is market value minus open cost basis
+        return round(self._value - self._open_cost, 2)
 
     # Method to calculate total profit (realized + unrealized)
     def total_profit(self) -> float:
         # Return the sum of realized and unrealized profit
         return round(self.realized_profit + self.unrealized_profit(), 2)
 
-    # Method to retrieve the complete price history for all symbols
-    def price_history(self) -> Dict[str, list]:
-        # Return the history dictionary mapping symbols to lists of (day, price) tuples
+    # Method to retrieve the retained price history for all symbols
+    def price_history(self) -> PriceHistory:
+        # Return the history store; each symbol maps to a view of (day, price) pairs
         return self.history
 
     # Method to format current holdings as text lines with profit/loss information
     def holdings_lines(self):
         # Initialize an empty list to store formatted holding lines
         lines = []
-        # Loop through each symbol and share count, sorted by symbol
-        for symbol, shares in sorted(self.holdings.items()):
+        # Only visit symbols with shares, sorted by symbol
+        held = sorted((self.symbols[index], index) for index in np.flatnonzero(self._shares > 0))
+        for symbol, index in held:
+            shares = int(self._shares[index])
+            price = float(self._prices[index])
             # Calculate the market value of this holding
-            value = self.prices.get(symbol, 0) * shares
+            value = price * shares
             # Get the average purchase price for this symbol
             avg = self.average_cost(symbol)
             # Calculate unrealized profit/loss for this holding
-            unreal = (self.prices.get(symbol, 0) - avg) * shares
-            # Only include holdings with shares
-            if shares > 0:
-                lines.append((f"{symbol:<4} {shares:>4} sh @ ${avg:>6.2f}  (${value:>7.2f})  P/L ${unreal:>7.2f}", unreal))
+            unreal = (price - avg) * shares
+            lines.append((f"{symbol:<4} {shares:>4} sh @ ${avg:>6.2f}  (${value:>7.2f})  P/L ${unreal:>7.2f}", unreal))
         if not lines:
             lines.append(("No holdings yet.", 0.0))
         return lines
+
+
+# Define a replayer that re-creates a seeded market's prices for any day
+class MarketReplay:
+    """
+    Deterministic replay of StockMarket(seed=seed, prices=prices) for markets
+    that keep their starting symbols. prices(day) returns exactly the prices
+    such a market shows after `day` ticks. Every `checkpoint_every` days the
+    prices, momentum and random state are kept, so a later query jumps to
+    the nearest checkpoint instead of starting again from day 0.
+    """
+
+    # Constructor that records the day 0 state for the seed
+    def __init__(self, seed: int, checkpoint_every: int = 256, prices: Optional[Mapping[str, float]] = None):
+        self.seed = seed
+        self.checkpoint_every = checkpoint_every
+        # Day 0 matches StockMarket.__init__: starting prices, then momentum from the stream
+        starting = dict(STARTING_PRICES if prices is None else prices)
+        self.symbols = list(starting)
+        rng = np.random.default_rng(seed)
+        momentum = initial_momentum(rng, len(self.symbols))
+        # Checkpoints as (day, prices, momentum, random state), sorted by day
+        self._days: List[int] = [0]
+        self._checkpoints: List[tuple] = [(0, np.array(list(starting.values()), dtype=np.float64), momentum, rng.bit_generator.state)]
+
+    # Method to get the (prices, momentum, random state) arrays after `day` ticks
+    def state(self, day: int) -> Tuple[np.ndarray, np.ndarray, dict]:
+        if day < 0:
+            raise ValueError("day must not be negative")
+        # Jump to the newest checkpoint at or before the day
+        index = bisect_right(self._days, day) - 1
+        current, prices, momentum, state = self._checkpoints[index]
+        rng = np.random.default_rng()
+        rng.bit_generator.state = state
+        # Step the remaining days, keeping new checkpoints past the last one
+        while current < day:
+            prices, momentum = move_prices(prices, momentum, rng)
+            current += 1
+            if current % self.checkpoint_every == 0 and current > self._days[-1]:
+                self._days.append(current)
+                self._checkpoints.append((current, prices, momentum, rng.bit_generator.state))
+        return prices.copy(), momentum.copy(), rng.bit_generator.state
+
+    # Method to get the prices after `day` ticks
+    def prices(self, day: int) -> Dict[str, float]:
+        return dict(zip(self.symbols, self.state(day)[0].tolist()))
+
+
+# Function to get the shared replayer for a seed, so its checkpoints outlive one lookup
+@lru_cache(maxsize=REPLAY_CACHE_SIZE)
+def _replayer(seed: int) -> MarketReplay:
+    return MarketReplay(seed)
+
+
+# Function to re-create the prices of StockMarket(seed=seed) on `day`
+def replay_prices(seed: int, day: int) -> Dict[str, float]:
+    # Later lookups for the same seed start from the nearest checkpoint, not day 0
+    return _replayer(seed).prices(day)
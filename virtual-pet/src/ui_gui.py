@@ -1,13 +1,16 @@
+import time  # startup timing
+_IMPORT_STARTED = time.perf_counter()  # clock origin for the startup report
 import tkinter as tk  # GUI toolkit
 from tkinter import messagebox, ttk  # dialogs + themed widgets
-import audioop  # raw audio processing helpers
 import math  # math helpers for scaling
 import os  # filesystem paths
-import tempfile  # temp file creation
-import wave  # WAV file reading/writing
-from pet import Pet, petStats  # pet model + stat profiles
-from economy import Economy  # cash tracking
-from stock_market import StockMarket  # market simulator
+import traceback  # report a crashed simulation worker
+from game_session import PET_PROFILES, GameSession  # game state + actions
+from sim_clock import SPEED_CHOICES, SimulationClock  # fixed-timestep day clock
+from sim_worker import SimulationWorker  # runs the model off the Tk thread
+# Charts, sprites and music are imported when first needed (see build_chart_tab,
+# _sprite_cache and start_music), so they do not delay the first window.
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED  # time spent importing this module
 
 # Theme colors used throughout the UI.
 BACKGROUND = "#0f172a"  # app background
@@ -36,12 +39,21 @@ PET_SLUGS = {
     "guinea pig": "guinea-pig",
 }
 
-# Default stat profiles used for the GUI.
-GUI_PET_PROFILES = {
-    "dog": petStats("dog", 40, 80, 70, 90),
-    "cat": petStats("cat", 80, 70, 60, 80),
-    "guinea pig": petStats("guinea pig", 60, 75, 65, 70, 90),
-}
+# Default stat profiles used for the GUI (shared with headless sessions).
+GUI_PET_PROFILES = PET_PROFILES
+
+# Panels redrawn by the refresh scheduler, in render order.
+REFRESH_PANELS = ("pet", "stats", "economy", "holdings", "chart")
+# Notebook tab that shows each panel; a panel is only drawn once its tab is built.
+PANEL_TABS = {"pet": "care", "stats": "care", "economy": "economy", "holdings": "economy", "chart": "chart"}
+# How often to check whether the worker has built a sprite the pet panel is waiting for.
+SPRITE_POLL_MS = 50
+# Time-to-interactive budget for the first window paint, in seconds since import.
+STARTUP_BUDGET_SECONDS = 1.5
+# Real seconds per simulation day at x1 speed.
+DAY_SECONDS = 5.0
+# Wait between two polls of the simulation worker (about 60 frames per second).
+MIN_FRAME_MS = 16
 
 def format_bar(label: str, value: int, max_value: int, width: int = 18) -> str:
     # Normalize values so the bar stays aligned and bounded.
@@ -132,6 +144,45 @@ class TextTooltip:
             self._tip = None
 
 
+class TextLinesBinding:
+    def __init__(self, widget: tk.Text):
+        # Keeps a Text widget in sync with a list of (text, tags) lines,
+        # rewriting only the lines whose text or tags changed.
+        self.widget = widget
+        self._lines = []
+        # Counters for how much work the diff saved.
+        self.lines_written = 0
+        self.updates_skipped = 0
+
+    def update(self, lines) -> bool:
+        # Apply new lines; returns False when nothing changed.
+        lines = [(text, tuple(tags)) for text, tags in lines]
+        changed = [
+            index for index, line in enumerate(lines)
+            if index >= len(self._lines) or self._lines[index] != line
+        ]
+        if not changed and len(lines) == len(self._lines):
+            self.updates_skipped += 1
+            return False
+
+        self.widget.config(state="normal")
+        for index in changed:
+            text, tags = lines[index]
+            row = f"{index + 1}.0"
+            if index < len(self._lines):
+                # Replace the whole line, newline included, so its tags match too.
+                self.widget.delete(row, f"{row} lineend +1c")
+            self.widget.insert(row, text + "\n", tags)
+        if len(lines) < len(self._lines):
+            # Drop lines that are no longer shown.
+            self.widget.delete(f"{len(lines) + 1}.0", "end-1c")
+        self.widget.config(state="disabled")
+
+        self.lines_written += len(changed)
+        self._lines = lines
+        return True
+
+
 class VirtualPetGUI:
     def __init__(self):
         # Main app setup for the window and state.
@@ -142,28 +193,72 @@ class VirtualPetGUI:
         self.root.resizable(True, True)
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
-        # Runtime state for pet and economy.
-        self.pet = None
-        self.economy = None
+        # Simulation worker that owns the game session, and the newest state it published.
+        self.sim = None
+        self.snapshot = None
+        # Loss reason from the latest snapshot ("" while the pet is alive).
+        self._loss_reason = ""
         # Tooltip instance for stat labels.
         self._stat_tooltip = None
         # Music playback tracking.
-        self._music_temp_path = None
+        self._music_path = None
         self._music_started = False
-        # Cache scaled PhotoImage objects to avoid repeated disk loads.
-        self._pet_image_cache = {}
+        # Sprite pipeline (created after the first paint) and its decoded-image LRU.
+        self.sprites = None
+        self._pet_image_cache = None
         self._current_pet_image = None
-        # Real-time tick configuration.
-        self._tick_ms = 5000
-        self._tick_after_id = None
+        # Sprites the pet panel is waiting on the worker for.
+        self._sprite_waits = set()
+        # Longest side of the pet sprite for the current panel size.
+        self._sprite_size = 320
+        # Snapshot polling: the worker runs days on fixed deadlines (batching them
+        # at high speeds) and the Tk loop draws the newest state it published.
+        self._poll_after_id = None
         self._running = True
+        # Coalesced refresh: dirty panels are redrawn once per event-loop turn.
+        self._dirty_panels = set()
+        self._refresh_after_id = None
+        self.redraw_counts = {panel: 0 for panel in REFRESH_PANELS}
+        self.skipped_redraws = {panel: 0 for panel in REFRESH_PANELS}
         # Simple Q&A knowledge base for in-game help.
         self._qa_knowledge = self.build_qa_knowledge()
+        # Notebook tabs built so far (the rest are built when first selected).
+        self._built_tabs = set()
+        # Startup milestones in seconds since this module started importing.
+        self.startup_times = {"import": IMPORT_SECONDS}
 
-        # Build the initial screen and start the loop.
+        # Build the initial screen and start the loop; once the window has been
+        # drawn, record the paint time and start pre-scaling sprites.
         self.create_start_screen()
+        self.root.after_idle(self._after_first_paint)
         self.root.mainloop()
 
+    def _mark_startup(self, milestone: str):
+        # Record a startup milestone once.
+        self.startup_times.setdefault(milestone, time.perf_counter() - _IMPORT_STARTED)
+
+    def _after_first_paint(self):
+        # Runs after Tk has drawn the start screen.
+        self._mark_startup("first_paint")
+        self._sprite_cache()
+
+    def startup_report(self) -> dict:
+        # Startup milestones (seconds since import) and whether the first paint met the budget.
+        report = dict(self.startup_times)
+        if "first_tick" in report and "game_start" in report:
+            report["first_tick_after_start"] = report["first_tick"] - report["game_start"]
+        report["within_budget"] = report.get("first_paint", float("inf")) <= STARTUP_BUDGET_SECONDS
+        return report
+
+    def _sprite_cache(self):
+        # Create the sprite pipeline on first use and start pre-scaling every sprite.
+        if self.sprites is None:
+            from sprite_cache import SpriteCache, SpriteLRU
+            self.sprites = SpriteCache(ASSETS_DIR)
+            self.sprites.start()
+            self._pet_image_cache = SpriteLRU()
+        return self.sprites
+
     def create_start_screen(self):
         # Build the name/species selection screen.
         self.clear()
@@ -229,11 +324,18 @@ class VirtualPetGUI:
             messagebox.showerror("Error", "Please give your pet a name.")
             return
 
-        # Pick a stats profile for the selected pet type.
-        profile = GUI_PET_PROFILES.get(ptype.lower(), petStats(ptype.lower()))
-        self.pet = Pet(name, profile)
-        self.economy = Economy()
-        self.stock_market = StockMarket(self.economy)
+        # Create the game model for the selected pet type; once the worker starts,
+        # only its thread touches the model and the UI draws from snapshots.
+        self._mark_startup("game_start")
+        self.sim = SimulationWorker(GameSession(name, ptype), SimulationClock(DAY_SECONDS))
+        self.snapshot = self.sim.snapshot()
+        self._loss_reason = ""
+        # Pre-scale the chosen species' sprites before the others.
+        slug = PET_SLUGS.get(ptype, PET_SLUGS["dog"])
+        sprites = self._sprite_cache()
+        for sprite in reversed(sprites.asset_names()):
+            if sprite.endswith(f"-{slug}.png"):
+                sprites.prioritize(sprite)
 
         # Move into the main game layout.
         self.create_game_screen()
@@ -256,13 +358,40 @@ class VirtualPetGUI:
         self.notebook.add(self.help_tab, text="Help")
         self.notebook.pack(fill="both", expand=True)
 
-        self.build_care_tab()
-        self.build_economy_tab()
-        self.build_chart_tab()
-        self.build_help_tab()
+        # Only the Care tab is visible at first; the others are built when selected.
+        self._built_tabs = set()
+        self.ensure_tab("care")
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
 
-        self.update_ui()
-        self.update_economy_ui()
+        # First draw includes the pet image; later updates leave it to apply_snapshot.
+        self.request_refresh(*REFRESH_PANELS)
+        self._mark_startup("game_screen")
+
+    def ensure_tab(self, tab: str):
+        # Build a notebook tab the first time it is needed, then draw its panels.
+        if tab in self._built_tabs:
+            return
+        self._built_tabs.add(tab)
+        builders = {
+            "care": self.build_care_tab,
+            "economy": self.build_economy_tab,
+            "chart": self.build_chart_tab,
+            "help": self.build_help_tab,
+        }
+        builders[tab]()
+        self.request_refresh(*(panel for panel, owner in PANEL_TABS.items() if owner == tab))
+
+    def _on_tab_changed(self, _event=None):
+        # Build the selected tab if this is its first time on screen.
+        frames = {
+            str(self.care_tab): "care",
+            str(self.economy_tab): "economy",
+            str(self.chart_tab): "chart",
+            str(self.help_tab): "help",
+        }
+        tab = frames.get(self.notebook.select())
+        if tab:
+            self.ensure_tab(tab)
 
     def start_music(self):
         # Start background music if supported.
@@ -280,85 +409,41 @@ class VirtualPetGUI:
         if not os.path.exists(music_path):
             return
 
-        faded_path = self.create_faded_wav(music_path, fade_seconds=6, volume_scale=0.5)
+        # Fade the track on a worker thread (or reuse the cached copy) and start
+        # playback once it is ready, so the game starts without waiting for it.
+        from audio_cache import prepare_faded_wav
+        self._music_started = True
+        self._poll_music(prepare_faded_wav(music_path, fade_seconds=6, volume_scale=0.5))
+
+    def _poll_music(self, job):
+        # Check the preprocessing job from the Tk thread; play the track when it is done.
+        if not self._music_started:
+            return
+        if not job.done():
+            self.root.after(100, self._poll_music, job)
+            return
+        faded_path = job.result()
         if not faded_path:
+            self._music_started = False
             return
-        self._music_temp_path = faded_path
-        self._music_started = True
-        winsound.PlaySound(self._music_temp_path, winsound.SND_FILENAME | winsound.SND_ASYNC | winsound.SND_LOOP)
+        import winsound
+        self._music_path = faded_path
+        winsound.PlaySound(self._music_path, winsound.SND_FILENAME | winsound.SND_ASYNC | winsound.SND_LOOP)
 
     def stop_music(self):
-        # Stop playback and clean up temp files.
+        # Stop playback; the faded track stays in the cache for the next launch.
         try:
             import winsound
             winsound.PlaySound(None, winsound.SND_PURGE)
         except ImportError:
             pass
-        if self._music_temp_path and os.path.exists(self._music_temp_path):
-            try:
-                os.remove(self._music_temp_path)
-            except OSError:
-                pass
-        self._music_temp_path = None
+        self._music_path = None
         self._music_started = False
 
     def create_faded_wav(self, input_path: str, fade_seconds: int = 3, volume_scale: float = 1.0):
-        # Read a wav file and apply fade-in/out for smoother looping.
-        try:
-            with wave.open(input_path, "rb") as wf:
-                params = wf.getparams()
-                frames = wf.readframes(wf.getnframes())
-        except (wave.Error, FileNotFoundError):
-            return None
-
-        # Apply a fade-in/out and optional volume scaling to avoid harsh loops.
-        frame_bytes = params.sampwidth * params.nchannels
-        if frame_bytes <= 0:
-            return None
-
-        total_frames = params.nframes
-        fade_frames = int(params.framerate * fade_seconds)
-        fade_frames = min(fade_frames, max(0, total_frames // 2))
-        if fade_frames <= 0:
-            return input_path
-
-        # Convert frames to a mutable bytearray for processing.
-        data = bytearray(frames)
-        volume_scale = max(0.0, min(volume_scale, 1.0))
-
-        # Fade in.
-        for i in range(fade_frames):
-            scale = (i / fade_frames) * volume_scale
-            start = i * frame_bytes
-            end = start + frame_bytes
-            data[start:end] = audioop.mul(data[start:end], params.sampwidth, scale)
-
-        # Fade out.
-        for i in range(fade_frames):
-            scale = ((fade_frames - i) / fade_frames) * volume_scale
-            start = (total_frames - fade_frames + i) * frame_bytes
-            end = start + frame_bytes
-            data[start:end] = audioop.mul(data[start:end], params.sampwidth, scale)
-
-        # Apply mid-section scaling if requested.
-        if volume_scale < 1.0:
-            mid_start = fade_frames * frame_bytes
-            mid_end = (total_frames - fade_frames) * frame_bytes
-            if mid_end > mid_start:
-                data[mid_start:mid_end] = audioop.mul(
-                    data[mid_start:mid_end], params.sampwidth, volume_scale
-                )
-
-        try:
-            temp_fd, temp_path = tempfile.mkstemp(suffix=".wav")
-            os.close(temp_fd)
-            # Write the processed audio to a temp file.
-            with wave.open(temp_path, "wb") as wf:
-                wf.setparams(params)
-                wf.writeframes(bytes(data))
-            return temp_path
-        except OSError:
-            return None
+        # Fade a wav file in/out for smoother looping (cached; runs on the calling thread).
+        from audio_cache import cached_faded_wav
+        return cached_faded_wav(input_path, fade_seconds, volume_scale)
 
     def show_instructions_popup(self):
         # Show a modal popup with gameplay instructions.
@@ -500,6 +585,7 @@ class VirtualPetGUI:
             pady=10
         )
         self.pet_display.pack(fill="both", expand=True)
+        display_frame.bind("<Configure>", self._on_pet_panel_resize)
 
         self.stats_label = tk.Text(
             display_frame,
@@ -516,6 +602,7 @@ class VirtualPetGUI:
         self.stats_label.config(state="disabled")
         self.stats_label.tag_configure("low", foreground="#f87171")
         self.stats_label.tag_configure("normal", foreground=TEXT_PRIMARY)
+        self.stats_binding = TextLinesBinding(self.stats_label)
         self._stat_tooltip = TextTooltip(self.stats_label)
         self.bind_stat_tooltips()
 
@@ -549,6 +636,17 @@ class VirtualPetGUI:
         Tooltip(sleep_btn, "Restore energy without spending money.")
         Tooltip(shower_btn, "Spend $8 to improve cleanliness.")
 
+        # Simulation speed: each step runs ten times as many days per second.
+        speed_row = tk.Frame(container, bg=BACKGROUND)
+        speed_row.pack()
+        tk.Label(speed_row, text="Speed", font=("Consolas", 11, "bold"), fg=TEXT_PRIMARY, bg=BACKGROUND).pack(side="left", padx=(0, 8))
+        self.speed_choice = tk.StringVar(value=f"x{self.snapshot.speed}")
+        speed_menu = tk.OptionMenu(speed_row, self.speed_choice, *(f"x{speed}" for speed in SPEED_CHOICES), command=self.set_speed)
+        speed_menu.config(bg=INPUT_BG, fg=TEXT_PRIMARY, activebackground=BORDER, activeforeground=TEXT_PRIMARY, relief="flat", highlightthickness=0, font=("Consolas", 11))
+        speed_menu["menu"].config(bg=INPUT_BG, fg=TEXT_PRIMARY, activebackground=BORDER, activeforeground=TEXT_PRIMARY, font=("Consolas", 11))
+        speed_menu.pack(side="left")
+        Tooltip(speed_menu, "Days per 5 seconds. At high speeds several days run before each redraw.")
+
     def build_economy_tab(self):
         # Assemble the economy tab layout and controls.
         container = tk.Frame(self.economy_tab, bg=BACKGROUND, padx=16, pady=16)
@@ -574,7 +672,10 @@ class VirtualPetGUI:
         self.portfolio_label.pack(side="right")
 
         self.profit_label = tk.Label(container, text="", font=("Consolas", 12, "bold"), fg=TEXT_PRIMARY, bg=BACKGROUND)
-        self.profit_label.pack(anchor="w", pady=(0, 6))
+        self.profit_label.pack(anchor="w", pady=(0, 2))
+
+        self.risk_label = tk.Label(container, text="", font=("Consolas", 11), fg=TEXT_SECONDARY, bg=BACKGROUND)
+        self.risk_label.pack(anchor="w", pady=(0, 6))
 
         market_card = tk.Frame(container, bg=CARD_BG, padx=14, pady=14, highlightbackground=BORDER, highlightthickness=1)
         market_card.pack(fill="both", expand=True)
@@ -589,7 +690,7 @@ class VirtualPetGUI:
         tk.Label(control_row, text="Shares", font=("Consolas", 11, "bold"), fg=TEXT_PRIMARY, bg=CARD_BG).grid(row=0, column=1, sticky="w")
 
         self.market_symbol = tk.StringVar(value="PAW")
-        symbols = list(self.stock_market.prices.keys())
+        symbols = list(self.snapshot.market.symbols)
         symbol_menu = tk.OptionMenu(control_row, self.market_symbol, *symbols)
         symbol_menu.config(bg=INPUT_BG, fg=TEXT_PRIMARY, activebackground=BORDER, activeforeground=TEXT_PRIMARY, relief="flat", highlightthickness=0, font=("Consolas", 11))
         symbol_menu["menu"].config(bg=INPUT_BG, fg=TEXT_PRIMARY, activebackground=BORDER, activeforeground=TEXT_PRIMARY, font=("Consolas", 11))
@@ -635,6 +736,7 @@ class VirtualPetGUI:
         self.holdings_text.tag_configure("gain", foreground="#22c55e")
         self.holdings_text.tag_configure("loss", foreground="#f87171")
         self.holdings_text.tag_configure("neutral", foreground=TEXT_PRIMARY)
+        self.holdings_binding = TextLinesBinding(self.holdings_text)
 
         self.market_message = tk.Label(market_card, text="", font=("Consolas", 10), fg=TEXT_SECONDARY, bg=CARD_BG, justify="left", anchor="w")
         self.market_message.pack(fill="x", pady=(8, 0))
@@ -642,6 +744,7 @@ class VirtualPetGUI:
         Tooltip(self.balance_label, "Your available cash for pet care and investing.")
         Tooltip(self.portfolio_label, "Estimated value of all shares you own.")
         Tooltip(self.profit_label, "Total profit or loss from all trades.")
+        Tooltip(self.risk_label, "Fall from your highest net worth (cash plus shares) and how much it moves day to day.")
         Tooltip(self.market_prices_label, "Current prices for each stock symbol.")
         Tooltip(symbol_menu, "Choose which stock symbol to trade.")
         Tooltip(self.shares_entry, "Enter how many shares to buy or sell.")
@@ -667,7 +770,9 @@ class VirtualPetGUI:
 
         self.chart_canvas = tk.Canvas(container, bg="#0b1220", highlightthickness=1, highlightbackground=BORDER)
         self.chart_canvas.pack(fill="both", expand=True)
-        self.chart_canvas.bind("<Configure>", lambda e: self.draw_chart())
+        from chart_renderer import ChartRenderer
+        self.chart_renderer = ChartRenderer(self.chart_canvas, STOCK_COLORS, TEXT_PRIMARY, TEXT_SECONDARY, BORDER)
+        self.chart_canvas.bind("<Configure>", lambda e: self.request_refresh("chart"))
 
     def build_help_tab(self):
         # Assemble the Q&A help tab.
@@ -780,69 +885,162 @@ class VirtualPetGUI:
                 return response
         return "I can help with pet care, controls, stats, or the economy. Try asking about feeding, playing, or the market."
 
-    def load_pet_image(self, species: str, state: str):
-        # Load and scale a pet image for the given species/state.
+    def load_pet_image(self, species: str, state: str, max_dim: int = 320):
+        # Load a pet image for the given species/state, pre-scaled to fit max_dim.
         species = species.lower()
         state = state.lower()
         slug = PET_SLUGS.get(species, PET_SLUGS["dog"])
-        cache_key = (slug, state)
-        if cache_key in self._pet_image_cache:
-            return self._pet_image_cache[cache_key]
+        sprites = self._sprite_cache()
+        size = sprites.size_for(max_dim)
+        cache_key = (slug, state, size)
+        image = self._pet_image_cache.get(cache_key)
+        if image is not None:
+            return image
 
         # Fall back to neutral if a specific state image is missing.
-        path = os.path.join(ASSETS_DIR, f"{state}-{slug}.png")
-        if not os.path.exists(path) and state != "neutral":
-            path = os.path.join(ASSETS_DIR, f"neutral-{slug}.png")
+        name = f"{state}-{slug}.png"
+        if not os.path.exists(os.path.join(ASSETS_DIR, name)) and state != "neutral":
+            name = f"neutral-{slug}.png"
+        path = os.path.join(ASSETS_DIR, name)
         if not os.path.exists(path):
             return None
+
+        # Use the pre-scaled variant. Until the worker has made it, move it to the
+        # front of the queue and redraw the pet once it is ready; nothing is decoded here.
+        variant = sprites.variant(name, size)
+        if variant is None and name not in sprites.errors:
+            sprites.prioritize(name)
+            if name not in self._sprite_waits:
+                self._sprite_waits.add(name)
+                self.root.after(SPRITE_POLL_MS, self._poll_sprite, name, size)
+            return None
+        if variant is None:
+            # The worker could not decode this asset: let Tk load it (kept under its own key).
+            cache_key = ("fallback",) + cache_key
+            image = self._pet_image_cache.get(cache_key)
+            if image is not None:
+                return image
         try:
-            image = tk.PhotoImage(file=path)
+            image = tk.PhotoImage(file=variant or path)
         except tk.TclError:
             return None
+        if variant is None:
+            scale = max(1, int(math.ceil(max(image.width(), image.height()) / size)))
+            if scale > 1:
+                image = image.subsample(scale, scale)
 
-        # Subsample large sprites to fit the display panel.
-        max_dim = 320
-        scale = max(1, int(math.ceil(max(image.width(), image.height()) / max_dim)))
-        if scale > 1:
-            image = image.subsample(scale, scale)
-
-        # Store in cache to reuse later.
-        self._pet_image_cache[cache_key] = image
+        # Keep it in the LRU (about 4 bytes per pixel) to reuse later.
+        self._pet_image_cache.put(cache_key, image, image.width() * image.height() * 4)
         return image
 
+    def _poll_sprite(self, name: str, size: int):
+        # Check from the Tk thread whether the worker has built a sprite; redraw the pet when it has.
+        sprites = self._sprite_cache()
+        waiting = os.path.exists(os.path.join(ASSETS_DIR, name)) and name not in sprites.errors
+        if waiting and sprites.variant(name, size) is None:
+            self.root.after(SPRITE_POLL_MS, self._poll_sprite, name, size)
+            return
+        self._sprite_waits.discard(name)
+        self.request_refresh("pet")
+
+    def _on_pet_panel_resize(self, event):
+        # Pick the sprite size that fits the panel; redraw only when it changes.
+        available = min(event.width, event.height - self.stats_label.winfo_reqheight()) - 60
+        size = self._sprite_cache().size_for(available)
+        if size != self._sprite_size:
+            self._sprite_size = size
+            self.request_refresh("pet")
+
+    def request_refresh(self, *panels: str):
+        # Mark panels dirty; a single idle callback redraws each one at most once.
+        for panel in panels:
+            if panel in self._dirty_panels:
+                self.skipped_redraws[panel] += 1
+            else:
+                self._dirty_panels.add(panel)
+        if self._dirty_panels and self._refresh_after_id is None:
+            self._refresh_after_id = self.root.after_idle(self._flush_refresh)
+
+    def _flush_refresh(self):
+        # Render every dirty panel once, in a fixed order.
+        self._refresh_after_id = None
+        dirty, self._dirty_panels = self._dirty_panels, set()
+        # Panels on tabs that are not built yet are drawn when their tab is built.
+        dirty = {panel for panel in dirty if PANEL_TABS[panel] in self._built_tabs}
+        renderers = {
+            "pet": self.render_pet,
+            "stats": self.render_stats,
+            "economy": self.render_economy_labels,
+            "holdings": self.render_holdings,
+            "chart": self.draw_chart,
+        }
+        for panel in REFRESH_PANELS:
+            if panel in dirty:
+                renderers[panel]()
+                self.redraw_counts[panel] += 1
+
+    def cancel_refresh(self):
+        # Drop any pending redraw (used before the window is destroyed).
+        if self._refresh_after_id:
+            self.root.after_cancel(self._refresh_after_id)
+            self._refresh_after_id = None
+        self._dirty_panels.clear()
+
+    def refresh_stats(self) -> dict:
+        # Summary of redraws done and redraws skipped because a panel was already dirty.
+        return {
+            "rendered": sum(self.redraw_counts.values()),
+            "skipped": sum(self.skipped_redraws.values()),
+            "per_panel": {
+                panel: (self.redraw_counts[panel], self.skipped_redraws[panel]) for panel in REFRESH_PANELS
+            },
+        }
+
     def update_ui(self):
-        # Refresh pet display and stat readout.
-        state = self.pet.get_emotional_state()
-        species = getattr(self.pet, "species", getattr(self.pet.pet_type, "type", "dog")).lower()
-        image = self.load_pet_image(species, state)
+        # Schedule a redraw of every panel except the pet image, which only changes with the mood.
+        self.request_refresh(*(panel for panel in REFRESH_PANELS if panel != "pet"))
+
+    def apply_snapshot(self, snapshot):
+        # Show a newer game state: redraw the panels, and the pet image only when the mood changed.
+        previous, self.snapshot = self.snapshot, snapshot
+        self.update_ui()
+        if snapshot.pet.state != previous.pet.state:
+            self.request_refresh("pet")
+        self._loss_reason = snapshot.loss_reason
+
+    def render_pet(self):
+        # Swap the pet image for the current mood.
+        pet = self.snapshot.pet
+        image = self.load_pet_image(pet.species, pet.state, self._sprite_size)
         if image:
             self.pet_display.config(image=image, text="")
             self._current_pet_image = image
+        elif self._sprite_waits:
+            # Keep the last sprite on screen until the new one has been scaled.
+            if self._current_pet_image is None:
+                self.pet_display.config(image="", text="Loading...")
         else:
             self.pet_display.config(image="", text="(missing image)")
             self._current_pet_image = None
 
+    def render_stats(self):
         # Update the stat readout and color tags in the text widget.
-        stats = self.pet.pet_type
+        pet = self.snapshot.pet
+        stats = pet.profile
         lines = [
-            (f"{self.pet.name} - {species.title()}\n", ["normal"]),
-            self.format_bar_line("Hunger", self.pet.hunger, stats.hunger),
-            self.format_bar_line("Happiness", self.pet.happiness, stats.happiness),
-            self.format_bar_line("Health", self.pet.health, stats.health),
-            self.format_bar_line("Energy", self.pet.energy, stats.energy),
-            self.format_bar_line("Cleanliness", self.pet.cleanliness, stats.cleanliness),
-            (f"Balance:      ${self.economy.balance}\n", ["normal"]),
+            (f"{pet.name} - {pet.species.title()}", ["normal"]),
+            self.format_bar_line("Hunger", pet.hunger, stats.hunger),
+            self.format_bar_line("Happiness", pet.happiness, stats.happiness),
+            self.format_bar_line("Health", pet.health, stats.health),
+            self.format_bar_line("Energy", pet.energy, stats.energy),
+            self.format_bar_line("Cleanliness", pet.cleanliness, stats.cleanliness),
+            (f"Balance:      ${self.snapshot.balance}", ["normal"]),
         ]
-        self.stats_label.config(state="normal")
-        self.stats_label.delete("1.0", "end")
-        for text, tags in lines:
-            self.stats_label.insert("end", text, tuple(tags))
-        self.stats_label.config(state="disabled")
-        self.update_economy_ui()
+        self.stats_binding.update(lines)
 
     def format_bar_line(self, label: str, value: int, max_value: int):
         # Format one stat line with a color tag.
-        line = format_bar(label, value, max_value) + "\n"
+        line = format_bar(label, value, max_value)
         max_value = max_value or 1
         ratio = max(0, min(value, max_value)) / max_value
         color_tag = "low" if ratio <= 0.25 else "normal"
@@ -878,81 +1076,111 @@ class VirtualPetGUI:
             self._stat_tooltip.hide()
 
     def update_economy_ui(self):
-        # Update economy labels and holdings list.
-        if not hasattr(self, "stock_market"):
+        # Schedule a redraw of the economy labels, holdings list and chart.
+        self.request_refresh("economy", "holdings", "chart")
+
+    def render_economy_labels(self):
+        # Update balance, portfolio, profit and price labels.
+        if self.snapshot is None:
             return
-        # Sync labels and holdings with the latest market values.
-        balance = self.economy.balance
-        portfolio = self.stock_market.portfolio_value()
-        total_profit = self.stock_market.total_profit()
+        # Sync labels with the market's running analytics.
+        balance = self.snapshot.balance
+        analytics = self.snapshot.market
+        portfolio = analytics.portfolio_value
+        total_profit = analytics.total_profit
         self.balance_label.config(text=f"Balance: ${balance}")
         self.portfolio_label.config(text=f"Portfolio: ${portfolio:,.2f}")
         self.profit_label.config(text=f"Total P/L: ${total_profit:,.2f}", fg="#22c55e" if total_profit > 0 else ("#f87171" if total_profit < 0 else TEXT_PRIMARY))
+        self.risk_label.config(
+            text=f"Drawdown: {analytics.drawdown:.1%} (max {analytics.max_drawdown:.1%})   Volatility: {analytics.volatility:.2%}/day"
+        )
 
-        price_lines = [f"{sym:<4} ${price:>6.2f}" for sym, price in self.stock_market.prices.items()]
+        price_lines = [f"{sym:<4} ${price:>6.2f}" for sym, price in self.snapshot.market.prices]
         self.market_prices_label.config(text="\n".join(price_lines))
 
-        holding_lines = self.stock_market.holdings_lines()
-        self.holdings_text.config(state="normal")
-        self.holdings_text.delete("1.0", "end")
+    def render_holdings(self):
+        # Rebuild the holdings list with gain/loss colors.
+        if self.snapshot is None:
+            return
+        holding_lines = self.snapshot.market.holdings
+        lines = []
         for line, pl in holding_lines:
             tag = "neutral"
             if pl > 0:
                 tag = "gain"
             elif pl < 0:
                 tag = "loss"
-            self.holdings_text.insert("end", line + "\n", tag)
-        self.holdings_text.config(state="disabled")
-        self.draw_chart()
+            lines.append((line, [tag]))
+        self.holdings_binding.update(lines)
 
     def feed(self):
-        # Feed action: spend money and reduce hunger.
-        if self.economy.spend("food", 10):
-            self.pet.feed(20)
-        self.update_ui()
-        self.check_game_over()
+        # Feed action: spend money and reduce hunger (the worker applies it and publishes the result).
+        self.sim.send("feed")
 
     def play(self):
         # Play action: spend money and raise happiness.
-        if self.economy.spend("toys", 5):
-            self.pet.play(10)
-        self.update_ui()
-        self.check_game_over()
+        self.sim.send("play")
 
     def sleep(self):
         # Sleep action: restore energy without spending.
-        self.pet.sleep(5)
-        self.update_ui()
-        self.check_game_over()
+        self.sim.send("sleep")
 
     def start_real_time_loop(self):
-        # Begin recurring ticks that advance time and market.
-        if self._tick_after_id:
-            self.root.after_cancel(self._tick_after_id)
+        # Start the simulation worker and poll it for new snapshots.
+        if self._poll_after_id:
+            self.root.after_cancel(self._poll_after_id)
         self._running = True
-        self._schedule_tick()
-
-    def _schedule_tick(self):
+        if not self.sim.running:
+            self.sim.start()
+        self._schedule_poll()
+
+    def set_speed(self, choice):
+        # Change the simulation speed ("x10" or 10); the worker reschedules its next day.
+        self.sim.send("set_speed", int(str(choice).lstrip("x")))
+
+    def tick_stats(self) -> dict:
+        # Tick latency, batch size and lag statistics from the latest snapshot, plus dropped snapshots.
+        stats = dict(self.snapshot.clock_stats)
+        stats["dropped_snapshots"] = self.sim.dropped_snapshots
+        stats["skipped_snapshots"] = self.sim.skipped_snapshots
+        return stats
+
+    def _schedule_poll(self):
+        # Check the worker again after one frame.
         if not self._running:
             return
-        self._tick_after_id = self.root.after(self._tick_ms, self._tick)
+        self._poll_after_id = self.root.after(MIN_FRAME_MS, self._poll_simulation)
 
-    def _tick(self):
+    def _poll_simulation(self):
+        # Draw the newest snapshot (older ones are skipped) and show replies to trades.
         if not self._running:
             return
-        self.stock_market.tick()
-        self.market_message.config(text="Market updated automatically.", fg=TEXT_SECONDARY)
-        self.pet.pass_time(1)
-        self.update_ui()
+        try:
+            snapshot = self.sim.latest()
+        except RuntimeError as error:
+            # The worker thread has exited, so polling again would only fail again.
+            self._simulation_failed(error)
+            return
+        if snapshot is not None:
+            days = snapshot.day - self.snapshot.day
+            self.apply_snapshot(snapshot)
+            if days and "first_tick" not in self.startup_times:
+                self._mark_startup("first_tick")
+                # Set VPET_STARTUP_REPORT=1 to print the startup timings once the game is running.
+                if os.environ.get("VPET_STARTUP_REPORT"):
+                    print(self.startup_report())
+            if days and "economy" in self._built_tabs:
+                text = "Market updated automatically." if days == 1 else f"Market advanced {days} days."
+                self.market_message.config(text=text, fg=TEXT_SECONDARY)
+        for result in self.sim.results():
+            if result.command.name in ("buy_stock", "sell_stock") and "economy" in self._built_tabs:
+                self.market_message.config(text=result.message, fg="#22c55e" if result.ok else "#fca5a5")
         if not self.check_game_over():
-            self._schedule_tick()
+            self._schedule_poll()
 
     def shower(self):
         # Bath action: spend money and improve cleanliness.
-        if self.economy.spend("grooming", 8):
-            self.pet.shower(5)
-        self.update_ui()
-        self.check_game_over()
+        self.sim.send("shower")
 
     def buy_stock(self):
         # Attempt to buy shares based on the entry field.
@@ -962,10 +1190,7 @@ class VirtualPetGUI:
             self.market_message.config(text="Enter a whole number of shares.", fg="#fca5a5")
             return
 
-        success, msg = self.stock_market.buy(self.market_symbol.get(), shares)
-        self.market_message.config(text=msg, fg="#22c55e" if success else "#fca5a5")
-        self.update_economy_ui()
-        self.update_ui()
+        self.sim.send("buy_stock", self.market_symbol.get(), shares)
 
     def sell_stock(self):
         # Attempt to sell shares based on the entry field.
@@ -975,77 +1200,16 @@ class VirtualPetGUI:
             self.market_message.config(text="Enter a whole number of shares.", fg="#fca5a5")
             return
 
-        success, msg = self.stock_market.sell(self.market_symbol.get(), shares)
-        self.market_message.config(text=msg, fg="#22c55e" if success else "#fca5a5")
-        self.update_economy_ui()
-        self.update_ui()
+        self.sim.send("sell_stock", self.market_symbol.get(), shares)
 
     def draw_chart(self):
-        # Render the stock history chart to the canvas.
-        if not hasattr(self, "chart_canvas") or not hasattr(self, "stock_market"):
+        # Render the stock history chart, updating existing canvas items in place.
+        if not hasattr(self, "chart_renderer") or self.snapshot is None:
             return
-        canvas = self.chart_canvas
-        canvas.delete("all")
-
-        history = self.stock_market.price_history()
+        history = self.sim.history
         if not history:
             return
-
-        # Determine bounds
-        all_points = [(day, price) for points in history.values() for day, price in points]
-        if not all_points:
-            return
-        min_day = min(d for d, _ in all_points)
-        max_day = max(d for d, _ in all_points)
-        min_price = min(p for _, p in all_points)
-        max_price = max(p for _, p in all_points)
-
-        # Compute drawing bounds based on the current canvas size.
-        width = canvas.winfo_width() or 800
-        height = canvas.winfo_height() or 400
-        pad = 40
-
-        def x_scale(day):
-            if max_day == min_day:
-                return pad
-            return pad + (day - min_day) / (max_day - min_day) * (width - 2 * pad)
-
-        def y_scale(price):
-            if max_price == min_price:
-                return height - pad
-            return height - pad - (price - min_price) / (max_price - min_price) * (height - 2 * pad)
-
-        # Axes
-        canvas.create_line(pad, height - pad, width - pad, height - pad, fill=TEXT_SECONDARY)
-        canvas.create_line(pad, pad, pad, height - pad, fill=TEXT_SECONDARY)
-
-        # Gridlines for nicer readability
-        grid_lines = 4
-        for i in range(1, grid_lines + 1):
-            y = pad + (height - 2 * pad) * i / (grid_lines + 1)
-            canvas.create_line(pad, y, width - pad, y, fill="#1f2937", dash=(2, 2))
-
-        # Labels
-        canvas.create_text(pad, pad - 10, text=f"Max ${max_price:.2f}", fill=TEXT_PRIMARY, anchor="w", font=("Consolas", 10))
-        canvas.create_text(pad, height - pad + 10, text=f"Min ${min_price:.2f}", fill=TEXT_PRIMARY, anchor="w", font=("Consolas", 10))
-        canvas.create_text(width - pad, height - pad + 10, text=f"Day {max_day}", fill=TEXT_PRIMARY, anchor="e", font=("Consolas", 10))
-
-        # Plot lines
-        symbols_order = list(history.keys())
-        for idx, symbol in enumerate(symbols_order):
-            points = history.get(symbol, [])
-            if len(points) >= 2:
-                color = STOCK_COLORS.get(symbol, TEXT_PRIMARY)
-                coords = []
-                for day, price in points:
-                    coords.extend([x_scale(day), y_scale(price)])
-                canvas.create_line(*coords, fill=color, width=2, smooth=True)
-
-            # Legend item
-            legend_y = pad + 14 * idx
-            color = STOCK_COLORS.get(symbol, TEXT_PRIMARY)
-            canvas.create_rectangle(width - pad - 140, legend_y, width - pad - 125, legend_y + 10, fill=color, outline=color)
-            canvas.create_text(width - pad - 115, legend_y + 5, text=symbol, fill=TEXT_PRIMARY, anchor="w", font=("Consolas", 9))
+        self.chart_renderer.render(history)
 
     def clear(self):
         # Remove all widgets from the root window.
@@ -1053,25 +1217,41 @@ class VirtualPetGUI:
             widget.destroy()
 
     def check_game_over(self):
-        # Stop the game if the pet reaches a loss state.
-        if not self.pet.detectLoss():
+        # Stop the game once the pet has reported a loss.
+        if not self._loss_reason:
             return False
-        reason = getattr(self.pet, "last_death_reason", "") or "Your pet's wellbeing dropped too low."
-        messagebox.showinfo("Game Over", f"{self.pet.name} has died.\n{reason}")
-        self._running = False
-        if self._tick_after_id:
-            self.root.after_cancel(self._tick_after_id)
-            self._tick_after_id = None
+        reason = self._loss_reason
+        self._stop_simulation()
+        messagebox.showinfo("Game Over", f"{self.snapshot.pet.name} has died.\n{reason}")
+        self.cancel_refresh()
         self.stop_music()
         self.root.destroy()
         return True
 
+    def _simulation_failed(self, error):
+        # Stop the clock for good and tell the player; the window stays open on the last state.
+        self._stop_simulation()
+        traceback.print_exception(error)
+        self.root.title("Virtual Pet Simulator (stopped)")
+        messagebox.showerror(
+            "Simulation stopped",
+            f"The game stopped because of an error:\n{error.__cause__ or error}\n\n"
+            "The last state stays on screen, but time no longer passes.",
+        )
+
+    def _stop_simulation(self):
+        # Stop polling and shut the worker down.
+        self._running = False
+        if self._poll_after_id:
+            self.root.after_cancel(self._poll_after_id)
+            self._poll_after_id = None
+        if self.sim is not None:
+            self.sim.stop()
+
     def on_close(self):
         # Handle window close events.
-        self._running = False
-        if self._tick_after_id:
-            self.root.after_cancel(self._tick_after_id)
-            self._tick_after_id = None
+        self._stop_simulation()
+        self.cancel_refresh()
         self.stop_music()
         self.root.destroy()
 
@@ -0,0 +1,95 @@
+# Test_chart_renderer.py
+# The chart must keep taking the incremental path after the price history starts
+# compacting old points, and the patched lines must match the history exactly.
+# Import os and sys to put the flat src/ modules on the import path
+import os
+import sys
+# Import unittest for the test case (pytest collects it too)
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+# Import the market that feeds the chart
+from economy import Economy
+from price_history import DEFAULT_RETENTION
+from stock_market import StockMarket
+
+# The renderer imports tkinter for its canvas type
+try:
+    from chart_renderer import ChartRenderer
+except ImportError:
+    ChartRenderer = None
+
+
+# Define a canvas stand-in that records item coordinates
+class FakeCanvas:
+    # Constructor with an empty item table
+    def __init__(self):
+        self.items = {}
+
+    # Every create_* call makes a numbered item
+    def _create(self, *coords, **options):
+        item = len(self.items) + 1
+        self.items[item] = [list(coords), dict(options)]
+        return item
+
+    create_line = create_text = create_rectangle = _create
+
+    def winfo_width(self):
+        return 800
+
+    def winfo_height(self):
+        return 400
+
+    def coords(self, item, *coords):
+        self.items[item][0] = list(coords)
+
+    def itemconfigure(self, item, **options):
+        self.items[item][1].update(options)
+
+    def delete(self, *items):
+        for item in items:
+            self.items.pop(item)
+
+
+# Define the compaction checks
+@unittest.skipIf(ChartRenderer is None, "tkinter is not available")
+class ChartCompactionTest(unittest.TestCase):
+    # Tick a seeded market with the default retention, rendering after every day
+    def setUp(self):
+        self.market = StockMarket(Economy(), seed=7)
+        self.canvas = FakeCanvas()
+        self.renderer = ChartRenderer(self.canvas, {}, "#fff", "#888", "#444")
+
+    def _run(self, days: int):
+        for _ in range(days):
+            self.market.tick()
+            self.renderer.render(self.market.price_history())
+
+    # Past the full-resolution window most renders stay incremental
+    def test_incremental_after_retention_window(self):
+        recent = DEFAULT_RETENTION.recent_days
+        self._run(recent + 35)
+        full, incremental = self.renderer.full_redraws, self.renderer.incremental_updates
+        self._run(400)
+        self.assertGreater(self.market.history.compactions, 400)
+        self.assertGreater(self.renderer.incremental_updates - incremental, 300)
+        self.assertLess(self.renderer.full_redraws - full, 100)
+
+    # The patched lines hold exactly the history's points, at the current scale
+    def test_patched_lines_match_history(self):
+        history = self.market.price_history()
+        for _ in range(40):
+            self._run(13)
+            for symbol in history:
+                days, prices = history[symbol].columns()
+                expected = [value for day, price in zip(days, prices)
+                            for value in (self.renderer._x(day), self.renderer._y(price))]
+                item = self.renderer._lines[symbol]
+                self.assertEqual(self.canvas.items[item][0], expected)
+            low = min(min(history[symbol].columns()[1]) for symbol in history)
+            self.assertEqual(self.renderer.bounds()[2], low)
+
+
+if __name__ == "__main__":
+    unittest.main()
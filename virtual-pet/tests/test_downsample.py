@@ -0,0 +1,63 @@
+# Test_downsample.py
+# The downsample cache must tell apart histories that cover the same days,
+# while copies of one history still share its entries.
+# Import os and sys to put the flat src/ modules on the import path
+import os
+import sys
+# Import unittest for the test case (pytest collects it too)
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+# Import the cache and the market that fills the histories
+from downsample import DownsampleCache
+from economy import Economy
+from stock_market import StockMarket
+
+# Days to tick, and the point budget (well below the history length)
+DAYS = 600
+MAX_POINTS = 100
+
+
+# Function to tick a seeded market and return its price history
+def ticked_history(seed: int):
+    market = StockMarket(Economy(), seed=seed)
+    for _ in range(DAYS):
+        market.tick()
+    return market.price_history()
+
+
+# Define the cache identity checks
+class DownsampleCacheTest(unittest.TestCase):
+    # Two games with the same range, length and version get their own entries
+    def test_different_histories_do_not_collide(self):
+        cache = DownsampleCache()
+        first, second = ticked_history(1), ticked_history(2)
+        symbol = next(iter(first))
+        self.assertEqual(len(first[symbol]), len(second[symbol]))
+        cache.points(symbol, first[symbol], MAX_POINTS, first.compactions)
+        points = cache.points(symbol, second[symbol], MAX_POINTS, second.compactions)
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(points, DownsampleCache().points(symbol, second[symbol], MAX_POINTS, second.compactions))
+
+    # A copy (like a worker snapshot) hits the entry made for the original
+    def test_copies_share_entries(self):
+        cache = DownsampleCache()
+        history = ticked_history(1)
+        symbol = next(iter(history))
+        points = cache.points(symbol, history[symbol], MAX_POINTS, history.compactions)
+        copy = history.copy()
+        self.assertEqual(cache.points(symbol, copy[symbol], MAX_POINTS, copy.compactions), points)
+        self.assertEqual(cache.hits, 1)
+
+    # Plain sequences have no identity, so they are never cached
+    def test_plain_sequences_are_not_cached(self):
+        cache = DownsampleCache()
+        series = [(day, float(day % 7)) for day in range(DAYS)]
+        cache.points("X", series, MAX_POINTS)
+        cache.points("X", series, MAX_POINTS)
+        self.assertEqual(cache.hits, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+# Test_market_simulation.py
+# Statistical-equivalence test: the vectorized Monte Carlo engine must produce the
+# same price distribution as the original per-symbol tick loop on the random module.
+# Import os and sys to put the flat src/ modules on the import path
+import os
+# Import random for the reference tick loop
+import random
+import sys
+# Import unittest for the test case (pytest collects it too)
+import unittest
+
+# Import NumPy for the summary statistics
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+# Import the two models being compared
+from market_simulation import simulate_paths
+from stock_market import DRAWS_PER_SYMBOL, SCALAR_LIMIT, STARTING_PRICES, _move_prices_scalar, move_prices
+
+# Number of independent paths for each model, and the days to compare
+PATHS = 2000
+HORIZONS = (1, 5, 20, 60)
+# Daily price ratios beyond these only happen with a surge or a crash
+SURGE_RATIO = 1.2
+CRASH_RATIO = 0.75
+
+
+# Function to run the original StockMarket.tick loop (random module, one symbol at a time)
+# for PATHS seeded markets and collect their prices as (paths, symbols, days + 1)
+def reference_paths(days: int) -> np.ndarray:
+    tensor = np.empty((PATHS, len(STARTING_PRICES), days + 1))
+    for path in range(PATHS):
+        rng = random.Random(path)
+        prices = dict(STARTING_PRICES)
+        momentum = {symbol: rng.uniform(-0.02, 0.03) for symbol in prices}
+        tensor[path, :, 0] = list(prices.values())
+        for day in range(1, days + 1):
+            for symbol, price in prices.items():
+                swing = rng.uniform(-0.1, 0.1) + momentum.get(symbol, 0)
+                if rng.random() < 0.07:
+                    swing += rng.uniform(0.15, 0.4)
+                if rng.random() < 0.04:
+                    price = max(0.75, price * rng.uniform(0.2, 0.7))
+                    momentum[symbol] = rng.uniform(-0.05, -0.01)
+                prices[symbol] = max(0.5, round(price * (1 + swing), 2))
+                momentum[symbol] = max(-0.1, min(0.08, momentum.get(symbol, 0) * 0.9 + rng.uniform(-0.01, 0.02)))
+            tensor[path, :, day] = list(prices.values())
+    return tensor
+
+
+# Define the equivalence checks
+class MarketSimulationEquivalenceTest(unittest.TestCase):
+    # Build both sets of paths once for every test
+    @classmethod
+    def setUpClass(cls):
+        days = max(HORIZONS)
+        cls.reference = reference_paths(days)
+        cls.vector = simulate_paths(PATHS, days, seed=12345)
+
+    # Tolerance for a difference of means: a few standard errors
+    @staticmethod
+    def _mean_tolerance(a: np.ndarray, b: np.ndarray) -> float:
+        return 4.5 * np.sqrt(a.var(ddof=1) / len(a) + b.var(ddof=1) / len(b))
+
+    # Tolerance for the log of a variance ratio; crashes make the tails heavy, so it uses the kurtosis
+    @staticmethod
+    def _spread_tolerance(a: np.ndarray, b: np.ndarray) -> float:
+        def log_variance_error(x: np.ndarray) -> float:
+            centered = x - x.mean()
+            kurtosis = (centered ** 4).mean() / centered.var() ** 2
+            return (kurtosis - 1) / len(x)
+        return 4.5 * np.sqrt(log_variance_error(a) + log_variance_error(b))
+
+    # Both models start every path from the same prices
+    def test_same_shape_and_start(self):
+        self.assertEqual(self.reference.shape, self.vector.shape)
+        np.testing.assert_array_equal(self.reference[:, :, 0], self.vector[:, :, 0])
+
+    # Log prices have the same mean and spread at every horizon, for every symbol
+    def test_log_price_moments(self):
+        for horizon in HORIZONS:
+            for symbol in range(self.reference.shape[1]):
+                with self.subTest(horizon=horizon, symbol=symbol):
+                    a = np.log(self.reference[:, symbol, horizon])
+                    b = np.log(self.vector[:, symbol, horizon])
+                    self.assertLess(abs(a.mean() - b.mean()), self._mean_tolerance(a, b))
+                    self.assertLess(abs(np.log(a.var(ddof=1) / b.var(ddof=1))), self._spread_tolerance(a, b))
+
+    # Surge-sized and crash-sized days happen equally often
+    def test_surge_and_crash_frequencies(self):
+        for ratio, above in ((SURGE_RATIO, True), (CRASH_RATIO, False)):
+            with self.subTest(ratio=ratio):
+                counts = []
+                for tensor in (self.reference, self.vector):
+                    daily = tensor[:, :, 1:] / tensor[:, :, :-1]
+                    hits = daily > ratio if above else daily < ratio
+                    counts.append((hits.mean(), hits.size))
+                (p1, n1), (p2, n2) = counts
+                pooled = (p1 * n1 + p2 * n2) / (n1 + n2)
+                tolerance = 4.5 * np.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n2))
+                self.assertGreater(pooled, 0.01)
+                self.assertLess(abs(p1 - p2), tolerance)
+
+
+# Define the check that the small-block loop and the array path agree exactly
+class MovePricesBranchTest(unittest.TestCase):
+    # Both branches turn the same generator state into the same prices and momentum, bit for bit
+    def test_scalar_branch_matches_vectorized(self):
+        shape = (50, 8)
+        self.assertGreater(shape[0] * shape[1], SCALAR_LIMIT)
+        setup = np.random.default_rng(7)
+        prices = np.round(setup.uniform(0.5, 300.0, shape), 2)
+        momentum = setup.uniform(-0.1, 0.08, shape)
+        for seed in range(20):
+            with self.subTest(seed=seed):
+                vector_prices, vector_momentum = move_prices(prices, momentum, np.random.default_rng(seed))
+                draws = np.random.default_rng(seed).random((DRAWS_PER_SYMBOL,) + shape)
+                scalar_prices, scalar_momentum = _move_prices_scalar(prices, momentum, draws)
+                np.testing.assert_array_equal(scalar_prices, vector_prices)
+                np.testing.assert_array_equal(scalar_momentum, vector_momentum)
+                prices, momentum = vector_prices, vector_momentum
+
+
+if __name__ == "__main__":
+    unittest.main()
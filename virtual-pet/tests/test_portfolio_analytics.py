@@ -0,0 +1,61 @@
+# Test_portfolio_analytics.py
+# Drawdown, volatility and returns must measure the investments only: care
+# spending and trades are cash flows, not losses or gains.
+# Import os and sys to put the flat src/ modules on the import path
+import os
+import sys
+# Import unittest for the test case (pytest collects it too)
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+# Import the session core and its scripted care
+from game_session import GameSession, run_session, threshold_care_policy
+
+# Days to play
+DAYS = 300
+
+
+# Define the analytics checks
+class PortfolioAnalyticsTest(unittest.TestCase):
+    # A game that never trades spends its money on care but has no investment risk
+    def test_no_trades_has_no_drawdown(self):
+        session = run_session(GameSession("pet", "dog", 1000, seed=1), DAYS, threshold_care_policy)
+        analytics = session.stock_market.analytics
+        self.assertLess(session.economy.balance, 1000)
+        self.assertEqual(analytics.max_drawdown, 0.0)
+        self.assertEqual(analytics.drawdown, 0.0)
+        self.assertEqual(analytics.volatility, 0.0)
+        self.assertEqual(analytics.total_return, 0.0)
+
+    # Buy and hold returns follow the price, whatever is spent on the pet meanwhile
+    def test_buy_and_hold_follows_price(self):
+        session = GameSession("pet", "dog", 100000, seed=2)
+        market = session.stock_market
+        symbol = market.symbols[0]
+        session.buy_stock(symbol, 10)
+        bought_at = market.prices[symbol]
+        for _ in range(DAYS):
+            session.advance_day()
+            session.feed()
+        analytics = market.analytics
+        self.assertAlmostEqual(analytics.total_return, market.prices[symbol] / bought_at - 1.0, places=9)
+        self.assertGreater(analytics.volatility, 0.0)
+
+    # Selling everything ends the exposure: later price moves change nothing
+    def test_flat_after_selling(self):
+        session = GameSession("pet", "dog", 100000, seed=3)
+        market = session.stock_market
+        symbol = market.symbols[1]
+        session.buy_stock(symbol, 7)
+        for _ in range(20):
+            session.advance_day()
+        session.sell_stock(symbol, 7)
+        growth = market.analytics.growth
+        for _ in range(DAYS):
+            session.advance_day()
+        self.assertEqual(market.analytics.growth, growth)
+
+
+if __name__ == "__main__":
+    unittest.main()
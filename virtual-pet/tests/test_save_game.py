@@ -0,0 +1,55 @@
+# Test_save_game.py
+# Saves must round-trip the whole game, and the original version 0 saves must
+# load with their species' stat caps.
+# Import os and sys to put the flat src/ modules on the import path
+import os
+import sys
+# Import json to write a version 0 document
+import json
+# Import unittest for the test case (pytest collects it too)
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+# Import the save format and the game it stores
+from game_session import PET_PROFILES, GameSession
+from save_game import SAVE_VERSION, decode_game, encode_game
+
+# A save in the original format, like the root save.json
+VERSION_0 = {
+    "pet": {"name": "d", "pet_type": "dog", "age_days": 0, "hunger": 10, "happiness": 80,
+            "health": 70, "energy": 90, "cleanliness": 100},
+    "economy": {"balance": 990, "expenses": {"food": 10, "clothing": 0, "entertainment": 0,
+                                             "toys": 0, "vet": 0, "other": 0}},
+}
+
+
+# Define the save format checks
+class SaveGameTest(unittest.TestCase):
+    # Version 0 saves only name the species, which selects its profile
+    def test_version_0_uses_species_profile(self):
+        game = decode_game(json.dumps(VERSION_0).encode("utf-8"))
+        self.assertIs(game.pet.pet_profile, PET_PROFILES["dog"])
+        self.assertEqual(game.pet.hunger, 10)
+        self.assertEqual(game.economy.balance, 990)
+        self.assertIsNone(game.market)
+
+    # JSON and binary saves restore the pet, the economy and the market's next move
+    def test_round_trip(self):
+        session = GameSession("Rex", "cat", seed=4)
+        for _ in range(50):
+            session.advance_day()
+        session.buy_stock(session.stock_market.symbols[0], 2)
+        games = {binary: decode_game(encode_game(session.pet, session.economy, session.stock_market, binary))
+                 for binary in (False, True)}
+        self.assertEqual(json.loads(encode_game(session.pet, session.economy))["version"], SAVE_VERSION)
+        expected = dict(session.stock_market.tick())
+        for binary, game in games.items():
+            with self.subTest(binary=binary):
+                self.assertIs(game.pet.pet_profile, session.pet.pet_profile)
+                self.assertEqual(game.economy.balance, session.economy.balance)
+                self.assertEqual(dict(game.market.holdings), dict(session.stock_market.holdings))
+                self.assertEqual(dict(game.market.tick()), expected)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+# Test_session_farm.py
+# Farm sessions must differ from seed to seed, replay exactly for one seed,
+# and give the same aggregate whatever the number of worker processes.
+# Import os and sys to put the flat src/ modules on the import path
+import os
+import sys
+# Import unittest for the test case (pytest collects it too)
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+# Import the farm and the session core it runs
+from game_session import GameSession, run_session, scripted_player_policy
+from session_farm import run_farm
+
+# Days per session (long enough for care to run out and trades to close)
+DAYS = 200
+
+
+# Function to play one session the way a farm shard does
+def play(seed: int) -> dict:
+    session = GameSession("pet", "dog", 1000, seed)
+    return run_session(session, DAYS, scripted_player_policy(seed)).summary()
+
+
+# Define the seeding checks
+class SessionFarmTest(unittest.TestCase):
+    # Different seeds play different games
+    def test_different_seeds_differ(self):
+        outcomes = {(summary["days"], summary["balance"]) for summary in map(play, range(8))}
+        self.assertGreater(len(outcomes), 1)
+
+    # One seed always plays the same game
+    def test_same_seed_replays(self):
+        self.assertEqual(play(5), play(5))
+
+    # The aggregate has a spread and does not depend on the worker count
+    def test_aggregate_independent_of_workers(self):
+        serial = run_farm(16, DAYS, seed=3, workers=1, shard_size=4)
+        pooled = run_farm(16, DAYS, seed=3, workers=2, shard_size=4)
+        self.assertGreater(serial.balance_std, 0)
+        self.assertEqual((serial.total_days, serial.outcomes), (pooled.total_days, pooled.outcomes))
+        self.assertAlmostEqual(serial.balance_mean, pooled.balance_mean, places=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+# Test_sim_worker.py
+# Snapshots carry only the price history changes since the previous one, so the
+# UI's copy must still match the worker's history after snapshots are dropped.
+# Import os and sys to put the flat src/ modules on the import path
+import os
+import sys
+# Import time to let the worker run between polls
+import time
+# Import unittest for the test case (pytest collects it too)
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+# Import the worker, its clock and the models it runs
+from economy import Economy
+from game_session import GameSession
+from pet import Pet
+from price_history import RetentionPolicy
+from sim_clock import SimulationClock
+from sim_worker import SimulationWorker
+from stock_market import StockMarket
+
+# A short retention window, so the run compacts many times
+RETENTION = RetentionPolicy(20, ((4, 10), (4, 5)))
+# Days to run before checking (the unfed cat lasts a little longer)
+DAYS = 40
+# Time between UI polls; the worker publishes several snapshots in between
+POLL_SECONDS = 0.1
+
+
+# Define the history mirroring checks
+class SimulationWorkerHistoryTest(unittest.TestCase):
+    # Build a session whose market compacts quickly
+    def setUp(self):
+        economy = Economy(100000)
+        self.session = GameSession.from_models(Pet("pet", "cat"), economy, StockMarket(economy, 5, RETENTION))
+        self.worker = SimulationWorker(self.session, SimulationClock(0.001, max_batch=2), queue_size=2)
+
+    # Run the worker until DAYS have passed, polling only now and then
+    def _run(self):
+        self.worker.start()
+        snapshot = None
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            time.sleep(POLL_SECONDS)
+            snapshot = self.worker.latest() or snapshot
+            if snapshot is not None and (snapshot.day >= DAYS or snapshot.loss_reason):
+                break
+        self.worker.stop()
+        return self.worker.latest() or snapshot
+
+    # After dropped and skipped snapshots, the UI copy equals the worker's history
+    def test_ui_history_matches_worker(self):
+        snapshot = self._run()
+        history = self.session.stock_market.price_history()
+        self.assertGreaterEqual(snapshot.day, DAYS)
+        self.assertEqual(snapshot.day, self.session.stock_market.day)
+        self.assertGreater(history.compactions, 0)
+        self.assertGreater(self.worker.dropped_snapshots, 0)
+        self.assertEqual(self.worker.history.compactions, history.compactions)
+        for symbol in history:
+            self.assertEqual(list(self.worker.history[symbol]), list(history[symbol]))
+
+    # Snapshots hold only the newest changes, never a copy of the whole history
+    def test_snapshots_carry_changes_only(self):
+        snapshot = self._run()
+        self.assertLess(len(snapshot.market.history_changes), DAYS)
+
+
+if __name__ == "__main__":
+    unittest.main()